@@ -1,5 +1,5 @@
 import plotly.graph_objects as go
-import pandas as pd
+from data_processor import get_time_index
 
 class BaseChart:
     """チャート作成の基本クラス"""
@@ -18,12 +18,12 @@ class BaseChart:
     def filter_data_by_date(self, df, start_date=None, end_date=None):
         """日付範囲でデータをフィルタ"""
         if start_date and end_date:
-            start_datetime = pd.to_datetime(start_date)
-            end_datetime = pd.to_datetime(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-            mask = (df['datetime'] >= start_datetime) & (df['datetime'] <= end_datetime)
-            chart_df = df[mask].copy()
+            # 日付をデータのタイムゾーンの日時に変換し、時刻インデックスの二分探索で期間の行のみを切り出す
+            time_index = get_time_index(df)
+            start_datetime, end_datetime = time_index.day_range(start_date, end_date)
+            chart_df = time_index.slice(df, start_datetime, end_datetime)
         else:
-            chart_df = df.copy()
+            chart_df = df
         
         # インデックスをリセットして単位として使用
         return chart_df.reset_index(drop=True)
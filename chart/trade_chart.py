@@ -1,25 +1,26 @@
 import plotly.graph_objects as go
 import pandas as pd
 from chart.base_chart import BaseChart
+from data_processor import get_time_index
 
 class TradeDetailChart(BaseChart):
     """取引詳細チャート作成クラス"""
     
     def create_chart(self, df, trade, buffer_hours=4):
         """特定のトレード期間の詳細チャートを作成"""
-        # トレード期間の前後4時間をバッファとして追加
-        start_time = trade['entry_date'] - pd.Timedelta(hours=buffer_hours)
-        end_time = trade['exit_date'] + pd.Timedelta(hours=buffer_hours)
+        # トレード期間の前後4時間をバッファとして追加（データのタイムゾーンに合わせる）
+        time_index = get_time_index(df)
+        start_time = time_index.localize(trade['entry_date']) - pd.Timedelta(hours=buffer_hours)
+        end_time = time_index.localize(trade['exit_date']) + pd.Timedelta(hours=buffer_hours)
         
-        # 期間のデータを抽出
-        mask = (df['datetime'] >= start_time) & (df['datetime'] <= end_time)
-        chart_df = df[mask].copy()
+        # 期間のデータを時刻インデックスの二分探索で抽出
+        lo, hi = time_index.locate(start_time, end_time)
         
         # インデックスをリセットして単位として使用
-        chart_df = chart_df.reset_index(drop=True)
+        chart_df = df.iloc[lo:hi].reset_index(drop=True)
         
         # エントリー・エグジットのインデックスを取得
-        entry_idx, exit_idx = self._get_trade_indices(chart_df, trade)
+        entry_idx, exit_idx = self._get_trade_indices(time_index, lo, hi, trade)
         
         fig = go.Figure()
         
@@ -42,18 +43,18 @@ class TradeDetailChart(BaseChart):
         
         return fig
     
-    def _get_trade_indices(self, chart_df, trade):
-        """取引のインデックスを取得"""
-        entry_idx = chart_df[chart_df['datetime'] == trade['entry_date']].index
-        exit_idx = chart_df[chart_df['datetime'] == trade['exit_date']].index
+    def _get_trade_indices(self, time_index, lo, hi, trade):
+        """取引のインデックスを取得（抽出範囲 [lo, hi) 内の位置）"""
+        entry_pos = time_index.find(trade['entry_date'])
+        exit_pos = time_index.find(trade['exit_date'])
         
-        if len(entry_idx) == 0 or len(exit_idx) == 0:
+        if entry_pos is None or exit_pos is None or not (lo <= entry_pos < hi and lo <= exit_pos < hi):
             # 該当するインデックスが見つからない場合は近似値を使用
-            entry_idx = [chart_df.index[0]]
-            exit_idx = [chart_df.index[-1]]
+            entry_idx = [0]
+            exit_idx = [hi - lo - 1]
         else:
-            entry_idx = [entry_idx[0]]
-            exit_idx = [exit_idx[0]]
+            entry_idx = [entry_pos - lo]
+            exit_idx = [exit_pos - lo]
         
         return entry_idx, exit_idx
     
@@ -0,0 +1,357 @@
+import argparse
+import glob
+import os
+import sys
+
+def rebuild_cache(args):
+    """データキャッシュを一括で再構築"""
+    from data_processor import rebuild_data_cache, clear_data_cache
+    
+    file_paths = sorted(glob.glob(os.path.join(args.data_dir, "*.csv")))
+    if not file_paths:
+        print(f"CSVファイルが見つかりません: {args.data_dir}")
+        return 1
+    
+    if args.clear:
+        clear_data_cache()
+    
+    results = rebuild_data_cache(file_paths)
+    failed = 0
+    for file_path, rows in results.items():
+        if rows is None:
+            failed += 1
+            print(f"❌ {file_path}: 読み込み失敗")
+        else:
+            print(f"✅ {file_path}: {rows:,}件")
+    return 1 if failed else 0
+
+def show_catalog(args):
+    """データセットカタログを更新して一覧表示"""
+    from data_processor import get_dataset_catalog
+    from data_processor.column_store import int64_to_datetime, deserialize_tz
+    
+    for partition in get_dataset_catalog().refresh():
+        tz = deserialize_tz(partition['tz'])
+        start, end = int64_to_datetime([partition['min_timestamp'], partition['max_timestamp']], tz)
+        print(f"{partition['symbol']} {partition['timeframe']} {partition['period']}: "
+              f"{partition['rows']:,}件 {start} 〜 {end} ({partition['path']})")
+    return 0
+
+def ingest(args):
+    """新しいバーのみを全期間データストアに差分取り込み"""
+    from core.data_manager import DataManager
+    from data_processor import ingest_fx_data
+    
+    data_manager = DataManager()
+    file_paths = args.files or data_manager.get_source_files(args.symbol, args.timeframe)
+    store_dir = args.store_dir or data_manager.get_store_dir(args.symbol, args.timeframe)
+    result = ingest_fx_data(store_dir, file_paths)
+    for file_path in result['ingested']:
+        print(f"📥 {file_path}")
+    for file_path in result['skipped']:
+        print(f"⏭️ {file_path}: 変更なし")
+    print(f"追加 {result['appended']:,}件 / 重複除外 {result['duplicates']:,}件 / 合計 {result['rows']:,}件")
+    return 0
+
+def benchmark_indicators(args):
+    """pandasのrolling()による計算と融合カーネル（指標レジストリ）の指標計算時間を比較"""
+    import time
+    import numpy as np
+    from indicator.technical_analysis import calculate_technical_indicators
+    from tests.helpers import random_ohlc, rolling_indicators
+    
+    print(f"{'バー数':>12} {'pandas':>10} {'融合カーネル':>12} {'高速化':>8} {'最大誤差':>10}")
+    for bars in args.bars:
+        # 1000万バーでも日時の範囲に収まるよう1分足で生成
+        df = random_ohlc(bars, args.seed, freq='1min')
+        
+        start = time.perf_counter()
+        expected = rolling_indicators(df)
+        legacy_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        actual = calculate_technical_indicators(df)
+        fused_seconds = time.perf_counter() - start
+        
+        max_error = max(
+            np.nanmax(np.abs(expected[column].to_numpy() - actual[column].to_numpy()))
+            for column in ['MA25', 'MA75', 'MA200', 'RSI', 'ATR']
+        )
+        del expected, actual
+        print(f"{bars:>12,} {legacy_seconds:>9.3f}s {fused_seconds:>11.3f}s {legacy_seconds / fused_seconds:>7.1f}x {max_error:>10.1e}")
+    return 0
+
+def benchmark_smoothing(args):
+    """RSI・ATRの単純移動平均とWilder平滑化・指数移動平均（線形フィルタ）の計算時間を比較"""
+    import time
+    import numpy as np
+    from indicator.technical_analysis import calculate_rsi, calculate_atr
+    from indicator.indicator_registry import _recursive_smooth
+    from tests.helpers import random_ohlc
+    
+    print(
+        f"{'バー数':>12} {'単純移動平均':>12} {'Wilder':>10} {'EMA':>10} "
+        f"{'ループ':>10} {'線形フィルタ':>10} {'ループ比誤差':>12}"
+    )
+    for bars in args.bars:
+        df = random_ohlc(bars, args.seed, freq='1min')
+        seconds = {}
+        for smoothing in ['sma', 'wilder', 'ema']:
+            start = time.perf_counter()
+            calculate_atr(calculate_rsi(df, smoothing=smoothing), smoothing=smoothing)
+            seconds[smoothing] = time.perf_counter() - start
+        
+        # 1バーずつの再帰計算（先頭の一部）と比較
+        values = np.abs(np.diff(df['Close'].to_numpy()[:args.loop_bars + 1]))
+        period = 14
+        start = time.perf_counter()
+        expected = np.full(len(values), np.nan)
+        if len(values) >= period:
+            expected[period - 1] = values[:period].mean()
+            for i in range(period, len(values)):
+                expected[i] = expected[i - 1] + (values[i] - expected[i - 1]) / period
+        loop_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = _recursive_smooth(values, period, 'wilder')
+        filter_seconds = time.perf_counter() - start
+        max_error = np.nanmax(np.abs(actual - expected), initial=0.0)
+        print(
+            f"{bars:>12,} {seconds['sma']:>11.3f}s {seconds['wilder']:>9.3f}s {seconds['ema']:>9.3f}s "
+            f"{loop_seconds:>9.3f}s {filter_seconds:>9.4f}s {max_error:>12.1e}"
+        )
+    return 0
+
+def check_rolling_precision(args):
+    """刻みに乗らない価格で、累積和と一定間隔で取り直した累積和の窓合計の丸め誤差を表示（上限以内かはtests/test_rolling_precision.pyで確認）"""
+    import numpy as np
+    from indicator.indicator_registry import ROLLING_ANCHOR_BARS, _cumsum, _window_sum, _rolling_sum
+    from tests.helpers import random_ohlc
+    
+    print(f"{'バー数':>12} {'窓':>5} {'累積和の誤差':>12} {'取り直しの誤差':>14} {'上限':>10}")
+    for bars in args.bars:
+        # 刻みに乗らない価格（整数化されず小数のまま合計される）
+        df = random_ohlc(bars, args.seed, decimals=None, freq='1min')
+        close = df['Close'].to_numpy()
+        for window in [25, 75, 200]:
+            # pandasのrolling().mean()は補正付きの加減算のため基準として使用
+            expected = df['Close'].rolling(window).mean().to_numpy()[window - 1:]
+            naive = (_window_sum(_cumsum(close), window, np.empty(bars)) / window)[window - 1:]
+            anchored = (_rolling_sum(close, window, np.empty(bars)) / window)[window - 1:]
+            naive_error = np.abs(naive - expected).max(initial=0.0)
+            anchored_error = np.abs(anchored - expected).max(initial=0.0)
+            # 累積和を取り直す区間の長さで決まる上限（データ全体の長さに依存しない）
+            terms = ROLLING_ANCHOR_BARS + window
+            bound = 2 * terms * terms * np.finfo(np.float64).eps * np.abs(close).max() / window
+            print(f"{bars:>12,} {window:>5} {naive_error:>12.1e} {anchored_error:>14.1e} {bound:>10.1e}")
+    return 0
+
+def benchmark_trades(args):
+    """配列版と1行ずつ処理する従来の取引シミュレーションの計算時間と結果の一致を確認"""
+    import contextlib
+    import io
+    import time
+    import pandas as pd
+    from data_processor import load_fx_data
+    from indicator.technical_analysis import calculate_indicators_cached
+    from strategy import detect_perfect_order, analyze_trading_signals, calculate_strategy_performance
+    
+    failed = False
+    print(f"{'ファイル':<36} {'連続回数':>8} {'取引数':>6} {'従来':>8} {'配列版':>8} {'高速化':>8} {'一致':>4}")
+    for file_path in args.files:
+        df = calculate_indicators_cached(load_fx_data(file_path))
+        for n_continued in args.n_continued:
+            with contextlib.redirect_stdout(io.StringIO()):
+                signals = analyze_trading_signals(detect_perfect_order(df), n_continued)
+                start = time.perf_counter()
+                expected = calculate_strategy_performance(signals, reference=True)
+                reference_seconds = time.perf_counter() - start
+                start = time.perf_counter()
+                actual = calculate_strategy_performance(signals)
+                vectorized_seconds = time.perf_counter() - start
+            try:
+                pd.testing.assert_frame_equal(expected, actual)
+                matched = True
+            except AssertionError:
+                matched = False
+                failed = True
+            print(
+                f"{file_path:<36} {n_continued:>8} {len(actual):>6} {reference_seconds:>7.3f}s {vectorized_seconds:>7.4f}s "
+                f"{reference_seconds / vectorized_seconds:>7.0f}x {'OK' if matched else 'NG':>4}"
+            )
+    return 1 if failed else 0
+
+def sweep(args):
+    """パラメータの組み合わせごとに戦略を並列で評価し、統計の表を出力"""
+    import time
+    from data_processor import load_fx_data
+    from strategy import run_parameter_sweep
+    
+    grid = _build_grid(args)
+    df = load_fx_data(args.file)
+    start = time.perf_counter()
+    results = run_parameter_sweep(df, grid, args.workers)
+    seconds = time.perf_counter() - start
+    
+    if args.output:
+        results.to_csv(args.output, index=False)
+    columns = ['ma_short', 'ma_medium', 'ma_long', 'n_continued', 'rsi_lower', 'rsi_upper', 'leverage', 'stop_rule',
+               'total_trades', 'win_rate', 'total_profit_loss']
+    print(results.sort_values('total_profit_loss', ascending=False)[columns].head(args.top).to_string(index=False))
+    print(f"{len(results)}通りを{seconds:.1f}秒で評価（{len(results) / seconds:.1f}通り/秒）")
+    return 0
+
+def walk_forward(args):
+    """学習期間で最適化したパラメータを直後の検証期間で評価し、期間ごとの結果と検証期間の損益を出力"""
+    import time
+    from data_processor import load_fx_data
+    from strategy import run_walk_forward
+    
+    grid = _build_grid(args)
+    df = load_fx_data(args.file)
+    start = time.perf_counter()
+    result = run_walk_forward(df, grid, args.train_months, args.test_months, args.anchored, args.objective, args.workers)
+    seconds = time.perf_counter() - start
+    
+    windows = result['windows']
+    if args.output:
+        result['trades'].to_csv(args.output, index=False)
+    columns = ['window', 'test_start', 'test_end', 'ma_short', 'ma_medium', 'ma_long', 'n_continued', 'rsi_lower', 'rsi_upper',
+               'stop_rule', f'train_{args.objective}', 'test_total_trades', 'test_total_profit_loss']
+    print(windows[columns].to_string(index=False))
+    equity = result['equity']
+    print(f"検証期間の取引: {len(result['trades'])}回 / 最終資産: {equity.iloc[-1]:,.0f}円")
+    print(f"{len(windows)}期間を{seconds:.1f}秒で評価")
+    return 0
+
+def monte_carlo(args):
+    """取引の損益の並びを再標本化し、最終損益・最大ドローダウン・最大連敗数のパーセンタイルを出力"""
+    import contextlib
+    import io
+    import time
+    from config.settings import INDICATOR_SMOOTHING
+    from data_processor import load_fx_data
+    from indicator.technical_analysis import calculate_indicators_cached
+    from strategy import detect_perfect_order, analyze_trading_signals, calculate_strategy_performance, run_monte_carlo
+    
+    df = calculate_indicators_cached(load_fx_data(args.file), smoothing=INDICATOR_SMOOTHING)
+    with contextlib.redirect_stdout(io.StringIO()):
+        trades_df = calculate_strategy_performance(analyze_trading_signals(detect_perfect_order(df), args.n_continued))
+    if trades_df.empty:
+        print("取引がないため再標本化できません")
+        return 1
+    
+    start = time.perf_counter()
+    result = run_monte_carlo(trades_df, args.paths, args.method, args.seed)
+    seconds = time.perf_counter() - start
+    
+    print(result['percentiles'].round(1).to_string())
+    print(f"{len(trades_df)}取引 × {args.paths:,}経路（{args.method}）を{seconds:.2f}秒で計算")
+    return 0
+
+def _build_grid(args):
+    """コマンドライン引数からパラメータごとの候補を作成（sweep・walk-forwardで共通）"""
+    return {
+        'ma_periods': [_parse_ints(value) for value in args.ma_periods],
+        'rsi_period': args.rsi_period,
+        'n_continued': args.n_continued,
+        'rsi_band': [_parse_ints(value) for value in args.rsi_band],
+        'leverage': args.leverage,
+        'stop_rule': args.stop_rule
+    }
+
+def _add_grid_arguments(parser):
+    """パラメータごとの候補の引数を追加（sweep・walk-forwardで共通）"""
+    parser.add_argument("--ma-periods", nargs="+", default=["25,75,200"], help="短期,中期,長期の移動平均線の期間")
+    parser.add_argument("--rsi-period", type=int, nargs="+", default=[14], help="RSIの期間")
+    parser.add_argument("--n-continued", type=int, nargs="+", default=[1, 2, 3, 4, 5], help="パーフェクトオーダー連続回数")
+    parser.add_argument("--rsi-band", nargs="+", default=["30,70"], help="エントリーを許可するRSIの下限,上限")
+    parser.add_argument("--leverage", type=int, nargs="+", default=[25], help="レバレッジ")
+    parser.add_argument("--stop-rule", nargs="+", default=["ma200"], choices=["ma200", "none"], help="ストップロスの方法")
+
+def _parse_ints(value):
+    """カンマ区切りの整数を組に変換"""
+    return tuple(int(part) for part in value.split(','))
+
+def build_parser():
+    """コマンドライン引数の定義"""
+    parser = argparse.ArgumentParser(description="FX移動平均線戦略分析のコマンドラインツール")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    cache_parser = subparsers.add_parser("rebuild-cache", help="データキャッシュを一括で再構築")
+    cache_parser.add_argument("--data-dir", default="data", help="CSVデータのディレクトリ")
+    cache_parser.add_argument("--clear", action="store_true", help="再構築前にキャッシュをすべて削除")
+    cache_parser.set_defaults(func=rebuild_cache)
+    
+    catalog_parser = subparsers.add_parser("catalog", help="データセットカタログを更新して一覧表示")
+    catalog_parser.set_defaults(func=show_catalog)
+    
+    ingest_parser = subparsers.add_parser("ingest", help="新しいバーのみを全期間データストアに差分取り込み")
+    ingest_parser.add_argument("files", nargs="*", help="取り込むCSVファイル（省略時はカタログの該当パーティション）")
+    ingest_parser.add_argument("--symbol", default="USDJPY", help="通貨ペア")
+    ingest_parser.add_argument("--timeframe", default="15min", help="時間足")
+    ingest_parser.add_argument("--store-dir", default=None, help="ストアのディレクトリ")
+    ingest_parser.set_defaults(func=ingest)
+    
+    benchmark_parser = subparsers.add_parser("benchmark-indicators", help="pandasの計算と融合カーネルの指標計算時間を比較")
+    benchmark_parser.add_argument("--bars", type=int, nargs="+", default=[100000, 1000000, 10000000], help="バー数")
+    benchmark_parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    benchmark_parser.set_defaults(func=benchmark_indicators)
+    
+    smoothing_parser = subparsers.add_parser("benchmark-smoothing", help="RSI・ATRの平滑化方法ごとの計算時間を比較")
+    smoothing_parser.add_argument("--bars", type=int, nargs="+", default=[100000, 1000000, 10000000], help="バー数")
+    smoothing_parser.add_argument("--loop-bars", type=int, default=100000, help="1バーずつの再帰計算と比較するバー数")
+    smoothing_parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    smoothing_parser.set_defaults(func=benchmark_smoothing)
+    
+    precision_parser = subparsers.add_parser("check-rolling-precision", help="窓合計の丸め誤差を累積和と取り直しで比較")
+    precision_parser.add_argument("--bars", type=int, nargs="+", default=[1000000, 10000000], help="バー数")
+    precision_parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    precision_parser.set_defaults(func=check_rolling_precision)
+    
+    trades_parser = subparsers.add_parser("benchmark-trades", help="配列版と従来の取引シミュレーションを比較")
+    trades_parser.add_argument(
+        "files", nargs="*", default=["data/USDJPY_2022_15min.csv", "data/USDJPY_2023_15min.csv", "data/USDJPY_all_years_15min.csv"],
+        help="CSVファイル"
+    )
+    trades_parser.add_argument("--n-continued", type=int, nargs="+", default=[1, 4], help="パーフェクトオーダー連続回数")
+    trades_parser.set_defaults(func=benchmark_trades)
+    
+    sweep_parser = subparsers.add_parser("sweep", help="パラメータの組み合わせごとに戦略を並列で評価")
+    sweep_parser.add_argument("--file", default="data/USDJPY_all_years_15min.csv", help="CSVファイル")
+    _add_grid_arguments(sweep_parser)
+    sweep_parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（省略時はCPUコア数）")
+    sweep_parser.add_argument("--output", default=None, help="結果を保存するCSVファイル")
+    sweep_parser.add_argument("--top", type=int, default=10, help="表示する上位の組み合わせ数")
+    sweep_parser.set_defaults(func=sweep)
+    
+    walk_forward_parser = subparsers.add_parser("walk-forward", help="学習期間で最適化したパラメータを直後の検証期間で評価")
+    walk_forward_parser.add_argument("--file", default="data/USDJPY_all_years_15min.csv", help="CSVファイル")
+    walk_forward_parser.add_argument("--train-months", type=int, default=12, help="学習期間（月）")
+    walk_forward_parser.add_argument("--test-months", type=int, default=3, help="検証期間（月）")
+    walk_forward_parser.add_argument("--anchored", action="store_true", help="学習期間の開始をデータの先頭に固定")
+    walk_forward_parser.add_argument(
+        "--objective", default="total_profit_loss", choices=["total_profit_loss", "win_rate", "avg_profit_loss", "total_return_pct"],
+        help="学習期間で最大化する統計"
+    )
+    _add_grid_arguments(walk_forward_parser)
+    walk_forward_parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（省略時はCPUコア数）")
+    walk_forward_parser.add_argument("--output", default=None, help="検証期間の取引を保存するCSVファイル")
+    walk_forward_parser.set_defaults(func=walk_forward)
+    
+    monte_carlo_parser = subparsers.add_parser("monte-carlo", help="取引の損益の並びを再標本化してリスクの分布を計算")
+    monte_carlo_parser.add_argument("--file", default="data/USDJPY_all_years_15min.csv", help="CSVファイル")
+    monte_carlo_parser.add_argument("--n-continued", type=int, default=1, help="パーフェクトオーダー連続回数")
+    monte_carlo_parser.add_argument("--paths", type=int, default=100000, help="経路数")
+    monte_carlo_parser.add_argument("--method", default="bootstrap", choices=["bootstrap", "shuffle"], help="再標本化の方法（復元抽出・順序の入れ替え）")
+    monte_carlo_parser.add_argument("--seed", type=int, default=None, help="乱数のシード")
+    monte_carlo_parser.set_defaults(func=monte_carlo)
+    
+    return parser
+
+def main(argv=None):
+    """コマンドラインのエントリーポイント"""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
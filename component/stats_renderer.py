@@ -1,5 +1,5 @@
 import streamlit as st
-import pandas as pd
+from data_processor import get_time_index
 
 class StatsRenderer:
     """統計表示クラス"""
@@ -18,10 +18,10 @@ class StatsRenderer:
     
     def render_trend_analysis(self, df, start_date, end_date):
         """トレンド分析をレンダリング"""
-        # date型をdatetime型に変換
-        start_datetime = pd.to_datetime(start_date)
-        end_datetime = pd.to_datetime(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-        filtered_df = df[(df['datetime'] >= start_datetime) & (df['datetime'] <= end_datetime)]
+        # date型をデータのタイムゾーンのdatetime型に変換
+        time_index = get_time_index(df)
+        start_datetime, end_datetime = time_index.day_range(start_date, end_date)
+        filtered_df = time_index.slice(df, start_datetime, end_datetime)
         
         if not filtered_df.empty:
             trend_info = self._analyze_trend(filtered_df)
@@ -1,11 +1,28 @@
 # アプリケーション設定
 
-# データファイルマッピング
-DATA_MAPPING = {
-    "2024年": "data/USDJPY_2024_15min.csv",
-    "2023年": "data/USDJPY_2023_15min.csv", 
-    "2022年": "data/USDJPY_2022_15min.csv"
-}
+# データディレクトリ（{通貨ペア}_{期間}_{時間足}.csv をカタログで管理）
+DATA_ROOT = "data"
+
+# セッションに保持する処理済みデータを省メモリ形式（float32・シグナル条件のビットマスク）にする
+COMPACT_PROCESSED_FRAME = True
+
+# 指標計算・戦略分析の各段階でデータフレームをコピーせず、1つのデータフレームに列を追加する
+COPY_FREE_PIPELINE = True
+
+# MAの傾きを横ばいとみなす幅（MAの値に対する比、計算方法による1e-14程度の丸め誤差で傾きの向きが変わらないようにする）
+MA_SLOPE_TOLERANCE = 1e-10
+
+# RSI・ATRの平滑化方法（'sma': 単純移動平均、'wilder': Wilder平滑化、'ema': 指数移動平均）
+INDICATOR_SMOOTHING = 'sma'
+
+# 取引シミュレーションを配列上で行う（Falseの場合は1行ずつ処理する従来の方法）
+VECTORIZED_TRADE_SIMULATOR = True
+
+# 指標キャッシュ（プロセス全体で共有）の容量（MB、0で無効）
+INDICATOR_CACHE_MAX_MB = 256
+
+# 上位足のキャッシュ（プロセス全体で共有）の容量（MB、0で無効）
+RESAMPLE_CACHE_MAX_MB = 64
 
 # チャート設定
 CHART_CONFIG = {
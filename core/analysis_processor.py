@@ -1,7 +1,30 @@
 import streamlit as st
 import pandas as pd
 from strategy import detect_perfect_order, analyze_trading_signals, calculate_strategy_performance, get_strategy_statistics
-from indicator.technical_analysis import calculate_moving_averages, calculate_rsi, calculate_atr, calculate_cross_signals
+from strategy.perfect_order_detector import PerfectOrderDetector
+from strategy.signal_analyzer import SignalAnalyzer
+from strategy.performance_calculator import PerformanceCalculator
+from data_processor import get_time_index, compact_frame
+from config.settings import COMPACT_PROCESSED_FRAME, COPY_FREE_PIPELINE, INDICATOR_SMOOTHING
+from config.settings import VECTORIZED_TRADE_SIMULATOR
+from indicator.technical_analysis import INDICATOR_INPUT_COLUMNS
+from indicator.technical_analysis import calculate_indicators_cached, get_cached_indicator_arrays
+from indicator.indicator_registry import get_indicator_registry
+from core.stage_cache import PipelineStageCache
+
+# サイドバーに表示する段階名
+PIPELINE_STAGE_LABELS = {
+    'indicators': '指標',
+    'perfect_order': 'パーフェクトオーダー',
+    'rsi_condition': 'RSI条件',
+    'continuation': '継続条件',
+    'entry_signals': 'エントリー',
+    'exit_signals': '決済',
+    'debug': 'デバッグ情報',
+    'performance': '取引・統計'
+}
+# 出力をセッションに保持しない段階（省メモリ形式では削除される列で、再計算も軽い）
+UNCACHED_PIPELINE_STAGES = ('debug',)
 
 class AnalysisProcessor:
     """分析処理クラス"""
@@ -11,14 +34,18 @@ class AnalysisProcessor:
     
     def load_and_process_data(self, data_manager):
         """データ読み込みと処理を一括で実行（セッション状態に保存）"""
-        # セッション状態のキーを生成
-        selected_year = st.session_state.get('selected_year', '全期間')
-        n_continued = st.session_state.get('n_continued', 1)
+        # サイドバーの選択内容（キャッシュ使用時も選択を変更できるよう毎回描画）
+        selection = data_manager.select_data()
+        if selection is None:
+            return None, None, None
+        n_continued = selection['n_continued']
         
         # セッション状態のキー
-        data_key = f"processed_data_{selected_year}_{n_continued}"
-        trades_key = f"trades_data_{selected_year}_{n_continued}"
-        stats_key = f"performance_stats_{selected_year}_{n_continued}"
+        dataset_key = f"{selection['symbol']}_{selection['timeframe']}_{selection['analysis_timeframe']}_{selection['year']}"
+        data_key = f"processed_data_{dataset_key}_{n_continued}"
+        trades_key = f"trades_data_{dataset_key}_{n_continued}"
+        stats_key = f"performance_stats_{dataset_key}_{n_continued}"
+        stages_key = f"pipeline_stages_{dataset_key}"
         
         # セッション状態にデータがある場合はそれを返す
         if (data_key in st.session_state and 
@@ -33,7 +60,7 @@ class AnalysisProcessor:
         st.sidebar.info("🔄 データを処理中...")
         
         # データ読み込み
-        result = data_manager.load_data()
+        result = data_manager.load_data(selection)
         if result[0] is None:
             return None, None, None
         df, n_continued = result
@@ -41,11 +68,24 @@ class AnalysisProcessor:
         if df is None or df.empty:
             return None, None, None
         
-        # テクニカル指標計算
-        df = self.calculate_technical_indicators(df)
+        if COPY_FREE_PIPELINE:
+            # 1つのデータフレームに各段階の列を追加していく（パラメータが変わった段階とその後の段階のみ再計算）
+            stage_cache = st.session_state.setdefault(stages_key, PipelineStageCache())
+            df, trades_df, performance_stats = self.run_pipeline(df, n_continued, stage_cache)
+            self.show_stage_summary(stage_cache)
+        else:
+            # テクニカル指標計算
+            df = self.calculate_technical_indicators(df)
+            
+            # 戦略分析
+            trades_df, performance_stats = self.analyze_strategy(df, n_continued)
+        
+        # セッションに保持するデータを省メモリ形式に変換
+        if COMPACT_PROCESSED_FRAME:
+            df = compact_frame(df)
         
-        # 戦略分析
-        trades_df, performance_stats = self.analyze_strategy(df, n_continued)
+        # チャート・統計の期間抽出用に時刻インデックスを作成
+        get_time_index(df)
         
         # セッション状態に保存
         st.session_state[data_key] = df
@@ -57,12 +97,81 @@ class AnalysisProcessor:
         return df, trades_df, performance_stats
     
     def calculate_technical_indicators(self, df):
-        """テクニカル指標を計算"""
-        df = calculate_moving_averages(df)
-        df = calculate_rsi(df)
-        df = calculate_atr(df)
-        df = calculate_cross_signals(df)
-        return df
+        """テクニカル指標を計算（計算済みの指標はプロセス共有のキャッシュから取得）"""
+        return calculate_indicators_cached(df, outputs=self.get_required_indicators(), smoothing=INDICATOR_SMOOTHING)
+    
+    def get_required_indicators(self):
+        """戦略分析の各段階が読み込む列のうち、指標として計算する列"""
+        registry = get_indicator_registry()
+        input_columns = PerfectOrderDetector.INPUT_COLUMNS + SignalAnalyzer.INPUT_COLUMNS + PerformanceCalculator.INPUT_COLUMNS
+        return [column for column in dict.fromkeys(input_columns) if registry.produces(column)]
+    
+    def get_pipeline_stages(self, n_continued=1):
+        """パイプラインの段階（段階名, 読み込む列, 出力が依存するパラメータ, 列を直接追加する処理）"""
+        indicator_outputs = self.get_required_indicators()
+        
+        def add_indicators(df):
+            # 指標キャッシュの配列を返し、段階のキャッシュでは複製せずに参照する
+            arrays = get_cached_indicator_arrays(df, outputs=indicator_outputs, smoothing=INDICATOR_SMOOTHING)
+            for column, values in arrays.items():
+                df[column] = values
+            return arrays
+        
+        stages = [
+            ('indicators', INDICATOR_INPUT_COLUMNS['indicators'], (), add_indicators),
+            ('perfect_order', PerfectOrderDetector.INPUT_COLUMNS, (), lambda df: detect_perfect_order(df, inplace=True))
+        ]
+        # シグナル分析は段階ごとに分け、n_continuedに依存する段階のみ再計算できるようにする
+        signal_stages = SignalAnalyzer().get_stages(n_continued)
+        for index, (stage_name, stage_params, stage) in enumerate(signal_stages):
+            input_columns = SignalAnalyzer.INPUT_COLUMNS if index == 0 else []
+            stages.append((stage_name, input_columns, stage_params, stage))
+        return stages
+    
+    def run_pipeline(self, df, n_continued=1, stage_cache=None):
+        """指標計算から戦略分析までを1つのデータフレーム上で実行（各段階は新しい列のみ追加、stage_cache指定時は依存するパラメータが同じ段階の出力を再利用）"""
+        # 各段階は列を追加するのみのため、呼び出し元のデータを変更しないよう列の参照のみコピー（メモリマップ上の列は複製しない）
+        frame = df.copy(deep=False)
+        params = {'n_continued': n_continued}
+        if stage_cache is None:
+            stage_cache = PipelineStageCache()
+        stage_cache.start_run()
+        
+        for stage_name, input_columns, stage_params, stage in self.get_pipeline_stages(n_continued):
+            key = stage_cache.key(stage_name, stage_params, params)
+            if stage_cache.get_columns(key, frame):
+                continue
+            missing_columns = [column for column in input_columns if column not in frame.columns]
+            if missing_columns:
+                raise ValueError(f"{stage_name}の入力列がありません: {missing_columns}")
+            if stage_name in UNCACHED_PIPELINE_STAGES:
+                stage(frame)
+                stage_cache.skip(stage_name)
+                continue
+            previous_columns = set(frame.columns)
+            outputs = stage(frame)
+            # 処理が列名 -> 配列を返す場合はその配列を参照（bool列はビットマスクで保持）
+            stage_cache.put_columns(key, frame, previous_columns, outputs if isinstance(outputs, dict) else None)
+        
+        # パフォーマンス計算・統計計算はデータフレームを読み込むのみ
+        key = stage_cache.key('performance', ('n_continued',), params)
+        performance = stage_cache.get(key)
+        if performance is None:
+            missing_columns = [column for column in PerformanceCalculator.INPUT_COLUMNS if column not in frame.columns]
+            if missing_columns:
+                raise ValueError(f"performanceの入力列がありません: {missing_columns}")
+            trades_df = calculate_strategy_performance(frame, reference=not VECTORIZED_TRADE_SIMULATOR)
+            performance = stage_cache.put(key, (trades_df, get_strategy_statistics(trades_df)))
+        trades_df, performance_stats = performance
+        
+        return frame, trades_df, performance_stats
+    
+    def show_stage_summary(self, stage_cache):
+        """直前の処理で再計算・再利用した段階をサイドバーに表示"""
+        recomputed = '・'.join(PIPELINE_STAGE_LABELS.get(name, name) for name in stage_cache.recomputed) or 'なし'
+        reused = '・'.join(PIPELINE_STAGE_LABELS.get(name, name) for name in stage_cache.reused) or 'なし'
+        st.sidebar.caption(f"再計算した段階: {recomputed}")
+        st.sidebar.caption(f"再利用した段階: {reused}")
     
     def analyze_strategy(self, df, n_continued=1):
         """戦略分析を実行"""
@@ -73,7 +182,7 @@ class AnalysisProcessor:
         df = analyze_trading_signals(df, n_continued=n_continued)
         
         # パフォーマンス計算
-        trades_df = calculate_strategy_performance(df)
+        trades_df = calculate_strategy_performance(df, reference=not VECTORIZED_TRADE_SIMULATOR)
         
         # 統計計算
         performance_stats = get_strategy_statistics(trades_df)
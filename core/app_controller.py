@@ -24,6 +24,9 @@ class FXAnalysisApp:
         # データ読み込みと処理（セッション状態に保存）
         df, trades_df, performance_stats = self.analysis_processor.load_and_process_data(self.data_manager)
         
+        # 指標キャッシュの統計は処理後の値を表示
+        self.data_manager.show_cache_stats()
+        
         if df is None or df.empty:
             st.error("データが見つかりません")
             return
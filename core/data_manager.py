@@ -1,20 +1,59 @@
 import streamlit as st
 import pandas as pd
 import os
-from data_processor import load_fx_data
+import shutil
+from data_processor import (
+    load_fx_data, load_fx_partitions, merge_partitions, ingest_fx_data, load_store_data,
+    get_dataset_catalog, resample_fx_data, STORE_DIR, ANALYSIS_TIMEFRAMES
+)
+from config.settings import DATA_ROOT
+from indicator.indicator_cache import get_indicator_cache
+
+# デフォルトの通貨ペア・時間足
+DEFAULT_SYMBOL = "USDJPY"
+DEFAULT_TIMEFRAME = "15min"
 
 class DataManager:
     """データ管理クラス"""
     
     def __init__(self):
-        pass
+        # 指標キャッシュの統計の表示位置（処理後に表示するため、選択時に場所のみ確保）
+        self.cache_stats_placeholder = None
     
-    def load_data(self):
-        """データを読み込み"""
+    def select_data(self):
+        """サイドバーでデータを選択し、選択内容をセッション状態に保存"""
+        # カタログから存在するデータのみを選択肢に表示
+        catalog = get_dataset_catalog()
+        catalog.refresh()
+        symbols = catalog.list_symbols()
+        if not symbols:
+            st.error(f"データが見つかりません: {DATA_ROOT}")
+            return None
+        
+        selected_symbol = st.sidebar.selectbox(
+            "通貨ペアを選択", symbols,
+            index=symbols.index(DEFAULT_SYMBOL) if DEFAULT_SYMBOL in symbols else 0
+        )
+        timeframes = catalog.list_timeframes(selected_symbol)
+        selected_timeframe = st.sidebar.selectbox(
+            "時間足を選択", timeframes,
+            index=timeframes.index(DEFAULT_TIMEFRAME) if DEFAULT_TIMEFRAME in timeframes else 0
+        )
+        
         # サイドバーから年選択
-        years = ["全期間", "2022", "2023", "2024"]
+        years = ["全期間"] + catalog.list_periods(selected_symbol, selected_timeframe)
         selected_year = st.sidebar.selectbox("年を選択", years, index=0)
         
+        # 分析時間足（データの時間足以上のみ）
+        analysis_timeframes = [
+            timeframe for timeframe in ANALYSIS_TIMEFRAMES
+            if pd.Timedelta(timeframe) >= pd.Timedelta(selected_timeframe)
+        ]
+        analysis_timeframe = st.sidebar.selectbox(
+            "分析時間足を選択", analysis_timeframes, index=0,
+            help="データの時間足から上位足を作成して分析します"
+        )
+        
         # パーフェクトオーダー連続回数設定
         st.sidebar.markdown("### 📊 パーフェクトオーダー設定")
         n_continued = st.sidebar.slider(
@@ -27,14 +66,21 @@ class DataManager:
         )
         
         # セッション状態に保存
+        st.session_state['selected_symbol'] = selected_symbol
+        st.session_state['selected_timeframe'] = selected_timeframe
+        st.session_state['analysis_timeframe'] = analysis_timeframe
         st.session_state['selected_year'] = selected_year
         st.session_state['n_continued'] = n_continued
         
         # 全期間データ再生成ボタン
         if selected_year == "全期間":
             st.sidebar.markdown("### 🔄 全期間データ管理")
+            if st.sidebar.button("📥 新しいデータを差分取り込み"):
+                self.ingest_new_data(selected_symbol, selected_timeframe)
+                # キャッシュをクリア
+                self.clear_cache()
             if st.sidebar.button("🔄 全期間データを再生成"):
-                self.regenerate_all_years_data()
+                self.regenerate_all_years_data(selected_symbol, selected_timeframe)
                 # キャッシュをクリア
                 self.clear_cache()
         
@@ -42,25 +88,69 @@ class DataManager:
         st.sidebar.markdown("### ⚡ キャッシュ管理")
         if st.sidebar.button("🗑️ キャッシュをクリア"):
             self.clear_cache()
+        self.cache_stats_placeholder = st.sidebar.empty()
+        
+        return {
+            'symbol': selected_symbol,
+            'timeframe': selected_timeframe,
+            'analysis_timeframe': analysis_timeframe,
+            'year': selected_year,
+            'n_continued': n_continued
+        }
+    
+    def show_cache_stats(self):
+        """指標キャッシュの統計をサイドバーに表示（パイプラインの実行後に呼び出し、今回のヒット・ミスを含める）"""
+        cache_stats = get_indicator_cache().stats()
+        target = self.cache_stats_placeholder or st.sidebar
+        target.caption(
+            f"指標キャッシュ: ヒット {cache_stats['hits']}回 / ミス {cache_stats['misses']}回 / "
+            f"{cache_stats['bytes'] / 1024 / 1024:.1f}MB（上限 {cache_stats['max_bytes'] / 1024 / 1024:.0f}MB）"
+        )
+    
+    def load_data(self, selection=None):
+        """データを読み込み"""
+        if selection is None:
+            selection = self.select_data()
+            if selection is None:
+                return None, None
+        selected_symbol = selection['symbol']
+        selected_timeframe = selection['timeframe']
+        analysis_timeframe = selection['analysis_timeframe']
+        selected_year = selection['year']
+        n_continued = selection['n_continued']
         
         try:
             if selected_year == "全期間":
                 # 全期間のデータを結合
-                df = self.load_all_years_data()
+                df = self.load_all_years_data(selected_symbol, selected_timeframe)
             else:
-                # 単一年のデータを読み込み
-                file_path = f"data/USDJPY_{selected_year}_15min.csv"
-                df = load_fx_data(file_path)
+                # 単一期間のパーティションを読み込み
+                partition = get_dataset_catalog().get_partitions(selected_symbol, selected_timeframe, selected_year)[0]
+                df = load_fx_data(partition['path'])
+            
+            # 上位足で分析する場合は集計（時間足ごとにキャッシュ）
+            if df is not None and not df.empty and analysis_timeframe != selected_timeframe:
+                dataset_key = f"{selected_symbol}_{selected_timeframe}_{selected_year}"
+                df = resample_fx_data(df, analysis_timeframe, dataset_key)
             
             return df, n_continued
         except Exception as e:
             st.error(f"データ読み込みエラー: {e}")
             return None, None
     
-    def load_all_years_data(self):
+    def load_all_years_data(self, symbol=DEFAULT_SYMBOL, timeframe=DEFAULT_TIMEFRAME):
         """全期間のデータを結合して読み込み"""
-        # まず保存済みの全期間データがあるかチェック
-        combined_file_path = "data/USDJPY_all_years_15min.csv"
+        # 差分取り込み済みのストアがあれば優先して使用
+        try:
+            store_df = load_store_data(self.get_store_dir(symbol, timeframe))
+            if store_df is not None:
+                st.sidebar.success(f"📊 全期間データ読み込み完了: {len(store_df):,}件")
+                return store_df
+        except Exception as e:
+            st.sidebar.warning(f"⚠️ ストア読み込みエラー: {e}")
+        
+        # 次に保存済みの全期間データがあるかチェック
+        combined_file_path = self.get_combined_file_path(symbol, timeframe)
         
         try:
             # 保存済みの全期間データを読み込み
@@ -72,28 +162,32 @@ class DataManager:
         except Exception as e:
             st.sidebar.warning(f"⚠️ 保存済みデータ読み込みエラー: {e}")
         
-        # 保存済みデータがない場合は各年データを結合
-        years = ["2022", "2023", "2024"]
+        # 保存済みデータがない場合はカタログの各期間データを並列に読み込んで結合
+        partitions = get_dataset_catalog().get_partitions(symbol, timeframe)
+        file_paths = {partition['period']: partition['path'] for partition in partitions}
         all_data = []
         
         st.sidebar.info("🔄 各年データを結合中...")
-        for year in years:
-            try:
-                file_path = f"data/USDJPY_{year}_15min.csv"
-                year_data = load_fx_data(file_path)
-                if not year_data.empty:
-                    all_data.append(year_data)
-                    st.sidebar.success(f"✅ {year}年データ読み込み完了")
-            except Exception as e:
-                st.sidebar.warning(f"⚠️ {year}年データ読み込みエラー: {e}")
+        try:
+            partitions = load_fx_partitions(list(file_paths.values()))
+        except Exception as e:
+            st.error(f"全期間のデータが読み込めませんでした: {e}")
+            return pd.DataFrame()
+        
+        for year, file_path in file_paths.items():
+            year_data = partitions.get(file_path)
+            if year_data is None:
+                st.sidebar.warning(f"⚠️ {year}年データ読み込みエラー")
+            elif not year_data.empty:
+                all_data.append(year_data)
+                st.sidebar.success(f"✅ {year}年データ読み込み完了")
         
         if not all_data:
             st.error("全期間のデータが読み込めませんでした")
             return pd.DataFrame()
         
-        # データを結合（日時順にソート）
-        combined_df = pd.concat(all_data, ignore_index=True)
-        combined_df = combined_df.sort_values('datetime').reset_index(drop=True)
+        # データを結合（各年は時刻順のため境界のみ確認して連結）
+        combined_df = merge_partitions(all_data)
         
         # 結合したデータを保存
         try:
@@ -105,28 +199,62 @@ class DataManager:
         st.sidebar.success(f"📊 全期間データ結合完了: {len(combined_df):,}件")
         return combined_df
     
-    def regenerate_all_years_data(self):
+    def ingest_new_data(self, symbol=DEFAULT_SYMBOL, timeframe=DEFAULT_TIMEFRAME):
+        """各ソースファイルから最終時刻より新しいバーのみをストアに追記"""
+        file_paths = self.get_source_files(symbol, timeframe)
+        try:
+            result = ingest_fx_data(self.get_store_dir(symbol, timeframe), file_paths)
+        except Exception as e:
+            st.sidebar.error(f"❌ 差分取り込みエラー: {e}")
+            return None
+        
+        st.sidebar.success(
+            f"📥 差分取り込み完了: {result['appended']:,}件追加 "
+            f"（重複 {result['duplicates']:,}件除外、変更なし {len(result['skipped'])}ファイル、合計 {result['rows']:,}件）"
+        )
+        return result
+    
+    def get_source_files(self, symbol=DEFAULT_SYMBOL, timeframe=DEFAULT_TIMEFRAME):
+        """取り込み対象のソースファイル一覧を取得（カタログのパーティションを開始時刻順に）"""
+        catalog = get_dataset_catalog()
+        catalog.refresh()
+        return [partition['path'] for partition in catalog.find_partitions(symbol, timeframe)]
+    
+    def get_store_dir(self, symbol=DEFAULT_SYMBOL, timeframe=DEFAULT_TIMEFRAME):
+        """全期間データストアのディレクトリ"""
+        return os.path.join(STORE_DIR, f"{symbol}_{timeframe}")
+    
+    def get_combined_file_path(self, symbol=DEFAULT_SYMBOL, timeframe=DEFAULT_TIMEFRAME):
+        """結合済み全期間データのファイルパス"""
+        return os.path.join(DATA_ROOT, f"{symbol}_all_years_{timeframe}.csv")
+    
+    def regenerate_all_years_data(self, symbol=DEFAULT_SYMBOL, timeframe=DEFAULT_TIMEFRAME):
         """全期間データを再生成"""
-        combined_file_path = "data/USDJPY_all_years_15min.csv"
+        combined_file_path = self.get_combined_file_path(symbol, timeframe)
+        store_dir = self.get_store_dir(symbol, timeframe)
         
-        # 既存のファイルを削除
+        # 既存のファイル・ストアを削除
         if os.path.exists(combined_file_path):
             os.remove(combined_file_path)
             st.sidebar.success("🗑️ 既存の全期間データを削除しました")
+        if os.path.exists(store_dir):
+            shutil.rmtree(store_dir)
         
         # 新しいデータを生成
         st.sidebar.info("🔄 全期間データを再生成中...")
-        self.load_all_years_data()
+        self.load_all_years_data(symbol, timeframe)
+        self.ingest_new_data(symbol, timeframe)
         st.sidebar.success("✅ 全期間データの再生成が完了しました")
     
     def clear_cache(self):
         """セッション状態のキャッシュをクリア"""
         keys_to_remove = []
         for key in st.session_state.keys():
-            if key.startswith('processed_data_') or key.startswith('trades_data_') or key.startswith('performance_stats_'):
+            if (key.startswith('processed_data_') or key.startswith('trades_data_') or key.startswith('performance_stats_') or
+                    key.startswith('pipeline_stages_')):
                 keys_to_remove.append(key)
         
         for key in keys_to_remove:
             del st.session_state[key]
         
-        st.sidebar.info("��️ キャッシュをクリアしました") 
\ No newline at end of file
+        st.sidebar.info("��️ キャッシュをクリアしました")
\ No newline at end of file
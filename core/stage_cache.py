@@ -0,0 +1,76 @@
+import numpy as np
+
+class PackedBits:
+    """bool列をビットマスク（1バーあたり1ビット）で保持するクラス"""
+    
+    def __init__(self, values):
+        self.length = len(values)
+        self.bits = np.packbits(values)
+        self.bits.flags.writeable = False
+    
+    def unpack(self):
+        """bool配列に戻す"""
+        return np.unpackbits(self.bits, count=self.length).view(bool)
+
+class PipelineStageCache:
+    """パイプラインの段階ごとの出力を、段階が依存するパラメータのみから作成したキーで保持するクラス（データセットごとに1つ）"""
+    
+    def __init__(self):
+        self._entries = {}
+        self.recomputed = []
+        self.reused = []
+    
+    def key(self, stage_name, stage_params, params):
+        """段階のキー（段階名と、依存するパラメータの値のみ）"""
+        return (stage_name,) + tuple((name, params[name]) for name in stage_params)
+    
+    def start_run(self):
+        """再計算・再利用した段階の記録をリセット"""
+        self.recomputed = []
+        self.reused = []
+    
+    def get(self, key):
+        """段階の出力を取得（ない場合はNone）"""
+        outputs = self._entries.get(key)
+        if outputs is not None:
+            self.reused.append(key[0])
+        return outputs
+    
+    def put(self, key, outputs):
+        """段階の出力を保存"""
+        self.recomputed.append(key[0])
+        self._entries[key] = outputs
+        return outputs
+    
+    def skip(self, stage_name):
+        """出力を保持しない段階を再計算したことを記録"""
+        self.recomputed.append(stage_name)
+    
+    def get_columns(self, key, frame):
+        """段階が追加した列をデータフレームに戻す（キャッシュにない場合はFalse）"""
+        columns = self.get(key)
+        if columns is None:
+            return False
+        for column, values in columns.items():
+            frame[column] = values.unpack() if isinstance(values, PackedBits) else values
+        return True
+    
+    def put_columns(self, key, frame, previous_columns, references=None):
+        """段階で追加された列を保存（bool列はビットマスク、referencesの列は複製せずその書き込み不可の配列を参照）"""
+        references = references or {}
+        columns = {}
+        for column in frame.columns:
+            if column in previous_columns:
+                continue
+            if column in references:
+                columns[column] = references[column]
+                continue
+            values = frame[column].to_numpy()
+            if values.dtype == bool:
+                columns[column] = PackedBits(values)
+            else:
+                values = values.copy()
+                values.flags.writeable = False
+                columns[column] = values
+        return self.put(key, columns)
+
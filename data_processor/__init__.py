@@ -1,11 +1,97 @@
 from data_processor.fx_data_processor import FXDataProcessor
+from data_processor.data_ingestor import STORE_DIR
+from data_processor.data_loader import DEFAULT_CHUNK_ROWS
+from data_processor.dataset_catalog import DatasetCatalog
+from data_processor.time_index import get_time_index
+from data_processor.frame_compactor import FrameCompactor
+from data_processor.timeframe_resampler import TimeframeResampler, ANALYSIS_TIMEFRAMES
+from data_processor.timeframe_projection import get_timeframe_projection
+from data_processor.shared_arrays import SharedArrays
+from config.settings import DATA_ROOT
 
 _fx_data_processor = FXDataProcessor()
+_dataset_catalog = DatasetCatalog(_fx_data_processor, DATA_ROOT)
+_timeframe_resampler = TimeframeResampler()
+_frame_compactor = FrameCompactor()
 
-def load_fx_data(file_path):
+def load_fx_data(file_path, start=None, end=None, use_cache=True):
     """FXデータを読み込み、市場クローズ中のデータを除外"""
-    return _fx_data_processor.load_fx_data(file_path)
+    return _fx_data_processor.load_fx_data(file_path, start, end, use_cache)
+
+def iter_fx_data(file_path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """FXデータを固定行数のチャンクごとに読み込み（市場クローズ中のデータは除外）"""
+    return _fx_data_processor.iter_fx_data(file_path, chunk_rows)
+
+def load_fx_arrays(file_path, start=None, end=None):
+    """日時範囲の時刻・OHLC列をコピーなしのNumPyビューとして取得"""
+    return _fx_data_processor.load_fx_arrays(file_path, start, end)
+
+def load_fx_partitions(file_paths):
+    """複数の期間ファイルを並列に読み込み（ファイルパス→データフレームの辞書）"""
+    return _fx_data_processor.load_fx_partitions(file_paths)
+
+def merge_partitions(frames):
+    """時刻順のパーティションを全体ソートせずに結合"""
+    return _fx_data_processor.merge_partitions(frames)
+
+def ingest_fx_data(store_dir, file_paths):
+    """ソースファイルの新しいバーのみをストアに差分取り込み"""
+    return _fx_data_processor.ingest_fx_data(store_dir, file_paths)
+
+def load_store_data(store_dir, start=None, end=None):
+    """ストアのデータを読み込み"""
+    return _fx_data_processor.load_store_data(store_dir, start, end)
+
+def rebuild_data_cache(file_paths):
+    """データキャッシュを一括で再構築"""
+    return _fx_data_processor.rebuild_cache(file_paths)
+
+def clear_data_cache():
+    """データキャッシュをすべて削除"""
+    _fx_data_processor.clear_cache()
+
+def get_dataset_catalog():
+    """データセットカタログを取得"""
+    return _dataset_catalog
+
+def query_fx_data(symbol, timeframe, start=None, end=None):
+    """通貨ペア・時間足・日時範囲のデータを重なるパーティションのみ開いて取得"""
+    return _dataset_catalog.query(symbol, timeframe, start, end)
+
+def resample_fx_data(df, timeframe, dataset_key=None):
+    """下位足を上位足に集計（dataset_key指定時は結果をキャッシュし、追加分のみ差分集計）"""
+    if dataset_key is None:
+        return _timeframe_resampler.resample(df, timeframe)
+    return _timeframe_resampler.get(dataset_key, df, timeframe)
+
+def update_resampled_data(dataset_key, new_base_bars, timeframe):
+    """新しい下位足のみでキャッシュ済みの上位足を更新"""
+    return _timeframe_resampler.update(dataset_key, new_base_bars, timeframe)
 
 def get_data_range(df):
     """データの範囲を取得"""
-    return _fx_data_processor.get_data_range(df) 
\ No newline at end of file
+    return _fx_data_processor.get_data_range(df)
+
+def compact_frame(df):
+    """処理済みデータを省メモリ形式（float32・シグナル条件のビットマスク・デバッグ列なし）に変換"""
+    return _frame_compactor.compact(df)
+
+def expand_frame(df):
+    """省メモリ形式のシグナル条件ビットマスクを通常のbool列に戻す"""
+    return _frame_compactor.expand(df)
+
+def get_signal_flag(df, name):
+    """シグナル条件を名前で取得（省メモリ形式のビットマスクにも対応）"""
+    return _frame_compactor.get_flag(df, name)
+
+def get_memory_per_bar(df):
+    """1バーあたりのメモリ使用量（バイト）を取得"""
+    return _frame_compactor.memory_per_bar(df)
+
+def publish_shared_arrays(df, columns=None):
+    """列を共有メモリに1回だけ書き込み（他のプロセスはmanifestで参照、作成したプロセスのclose()で削除）"""
+    return SharedArrays.publish(df, columns)
+
+def attach_shared_arrays(manifest):
+    """共有メモリの列を読み取り専用のNumPyビューとして参照"""
+    return SharedArrays.attach(manifest)
\ No newline at end of file
@@ -0,0 +1,202 @@
+import json
+import os
+import shutil
+from datetime import timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+HEADER_FILE = "header.json"
+TIMESTAMP_COLUMN = "timestamp"
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+class ColumnStore:
+    """時刻（int64）とOHLCを列ごとのメモリマップファイルで保持するストア"""
+    
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self._header = None
+    
+    def exists(self):
+        """ストアが存在するか"""
+        return os.path.exists(os.path.join(self.store_dir, HEADER_FILE))
+    
+    @property
+    def header(self):
+        """ヘッダー（行数・列の型・タイムゾーン・時刻範囲など）"""
+        if self._header is None:
+            with open(os.path.join(self.store_dir, HEADER_FILE), encoding='utf-8') as f:
+                self._header = json.load(f)
+        return self._header
+    
+    @property
+    def rows(self):
+        """行数"""
+        return self.header['rows']
+    
+    @property
+    def tz(self):
+        """時刻列のタイムゾーン"""
+        return deserialize_tz(self.header['tz'])
+    
+    def write(self, df, extra_header=None):
+        """datetime列とOHLC列を書き込み（一時ディレクトリ経由で置き換え）"""
+        arrays, tz = frame_to_arrays(df)
+        timestamps = arrays[TIMESTAMP_COLUMN]
+        
+        header = {
+            'rows': len(df),
+            'tz': serialize_tz(tz),
+            'columns': {name: values.dtype.str for name, values in arrays.items()},
+            'min_timestamp': int(timestamps[0]) if len(timestamps) else None,
+            'max_timestamp': int(timestamps[-1]) if len(timestamps) else None
+        }
+        header.update(extra_header or {})
+        
+        tmp_dir = f"{self.store_dir.rstrip(os.sep)}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            for name, values in arrays.items():
+                values.tofile(os.path.join(tmp_dir, f"{name}.bin"))
+            self._write_header(tmp_dir, header)
+            shutil.rmtree(self.store_dir, ignore_errors=True)
+            os.replace(tmp_dir, self.store_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._header = header
+    
+    def append(self, df, extra_header=None):
+        """最終時刻より新しいバーのみを末尾に追記（既存部分は書き換えない）"""
+        if not self.exists():
+            self.write(df, extra_header)
+            return len(df)
+        
+        timestamps, tz = datetime_to_int64(df['datetime'])
+        header = dict(self.header)
+        if serialize_tz(tz) != header['tz']:
+            raise ValueError("追記データのタイムゾーンがストアと一致しません")
+        if len(timestamps) > 1 and not (timestamps[1:] > timestamps[:-1]).all():
+            raise ValueError("追記データは時刻順（重複なし）である必要があります")
+        if len(timestamps) and header['max_timestamp'] is not None and timestamps[0] <= header['max_timestamp']:
+            raise ValueError("追記データはストアの最終時刻より新しい必要があります")
+        
+        rows = header['rows']
+        for name, dtype in header['columns'].items():
+            values = timestamps if name == TIMESTAMP_COLUMN else df[name].to_numpy()
+            values = np.ascontiguousarray(values, dtype=dtype)
+            with open(os.path.join(self.store_dir, f"{name}.bin"), 'r+b') as f:
+                # 前回の追記が途中で失敗していた場合に備えてヘッダーの行数に合わせる
+                f.truncate(rows * values.dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                values.tofile(f)
+        
+        header['rows'] = rows + len(timestamps)
+        if len(timestamps):
+            if header['min_timestamp'] is None:
+                header['min_timestamp'] = int(timestamps[0])
+            header['max_timestamp'] = int(timestamps[-1])
+        header.update(extra_header or {})
+        
+        # ヘッダーは最後に置き換え、読み込み側からは追記完了まで旧行数に見えるようにする
+        self._write_header(self.store_dir, header)
+        self._header = header
+        return len(timestamps)
+    
+    def open(self):
+        """全列を読み取り専用のメモリマップとして開く"""
+        arrays = {}
+        for name, dtype in self.header['columns'].items():
+            path = os.path.join(self.store_dir, f"{name}.bin")
+            if self.rows == 0:
+                arrays[name] = np.empty(0, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', shape=(self.rows,))
+        return arrays
+    
+    def locate(self, start=None, end=None):
+        """日時範囲 [start, end] に対応する行範囲を二分探索で取得"""
+        timestamps = self.open()[TIMESTAMP_COLUMN]
+        tz = self.tz
+        lo = 0 if start is None else int(np.searchsorted(timestamps, to_int64(start, tz), side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, to_int64(end, tz), side='right'))
+        return lo, max(lo, hi)
+    
+    def slice(self, start=None, end=None):
+        """日時範囲の列をコピーせずにNumPyビューとして取得"""
+        lo, hi = self.locate(start, end)
+        return {name: values[lo:hi] for name, values in self.open().items()}
+    
+    def to_frame(self, start=None, end=None):
+        """日時範囲をメモリマップのビューを参照するデータフレームとして取得"""
+        return arrays_to_frame(self.slice(start, end), self.tz)
+    
+    def _write_header(self, directory, header):
+        """ヘッダーを書き込み（一時ファイル経由で置き換え）"""
+        tmp_path = os.path.join(directory, f"{HEADER_FILE}.tmp{os.getpid()}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(header, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(directory, HEADER_FILE))
+
+def datetime_to_int64(series):
+    """datetime列をUTC基準のint64（ナノ秒）とタイムゾーンに変換"""
+    tz = getattr(series.dtype, 'tz', None)
+    if tz is not None:
+        series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+    return series.to_numpy('datetime64[ns]').view('int64'), tz
+
+def frame_to_arrays(df):
+    """datetime列とOHLC列をストアと同じ形式の配列（時刻はUTC基準のint64）とタイムゾーンに変換"""
+    timestamps, tz = datetime_to_int64(df['datetime'])
+    arrays = {TIMESTAMP_COLUMN: timestamps}
+    for column in PRICE_COLUMNS:
+        arrays[column] = df[column].to_numpy(dtype=np.float64)
+    return arrays, tz
+
+def arrays_to_frame(arrays, tz):
+    """時刻・OHLC列のビューからデータフレームを作成（価格列はコピーせずに参照し、タイムゾーン付きの時刻列のみ変換時にコピー）"""
+    data = {'datetime': int64_to_datetime(arrays[TIMESTAMP_COLUMN], tz)}
+    for column in PRICE_COLUMNS:
+        data[column] = arrays[column]
+    return pd.DataFrame(data, copy=False)
+
+def int64_to_datetime(values, tz):
+    """UTC基準のint64（ナノ秒）をdatetime列に変換（タイムゾーンなしの場合はコピーしない）"""
+    parsed = pd.to_datetime(np.asarray(values).view('datetime64[ns]'))
+    if tz is None:
+        return parsed
+    return parsed.tz_localize('UTC').tz_convert(tz)
+
+def is_memory_mapped(values):
+    """配列がメモリマップ（またはそのビュー）か"""
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = getattr(values, 'base', None)
+    return False
+
+def to_int64(value, tz):
+    """日時（date・文字列・Timestampなど）をストアの時刻と比較できるint64に変換"""
+    timestamp = pd.Timestamp(value)
+    if tz is not None:
+        timestamp = timestamp.tz_localize(tz) if timestamp.tzinfo is None else timestamp.tz_convert(tz)
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    elif timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_localize(None)
+    return timestamp.as_unit('ns').value
+
+def serialize_tz(tz):
+    """タイムゾーンをJSONに保存できる形に変換"""
+    if tz is None:
+        return None
+    if isinstance(tz, timezone):
+        return {'offset_seconds': int(tz.utcoffset(None).total_seconds())}
+    return {'name': str(tz)}
+
+def deserialize_tz(tz_info):
+    """保存したタイムゾーン情報を復元"""
+    if tz_info is None:
+        return None
+    if 'offset_seconds' in tz_info:
+        return timezone(timedelta(seconds=tz_info['offset_seconds']))
+    return tz_info['name']
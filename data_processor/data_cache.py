@@ -0,0 +1,83 @@
+import hashlib
+import os
+import shutil
+
+from data_processor.data_loader import LOADER_VERSION
+from data_processor.column_store import ColumnStore, PRICE_COLUMNS
+
+# キャッシュ保存先
+CACHE_DIR = "data/cache"
+
+class DataCache:
+    """読み込み・フィルタ済みFXデータの列指向バイナリキャッシュ（列ごとのメモリマップファイルで保存）"""
+    
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+    
+    def make_key(self, file_path):
+        """キャッシュキー（元ファイルのパス・サイズ・更新日時・ローダーバージョン）を生成"""
+        stat = os.stat(file_path)
+        return {
+            'source': os.path.abspath(file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'loader_version': LOADER_VERSION
+        }
+    
+    def get_entry_dir(self, file_path):
+        """元ファイルに対応するキャッシュディレクトリを取得"""
+        source = os.path.abspath(file_path)
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(self.cache_dir, f"{stem}-{digest}")
+    
+    def get_store(self, file_path):
+        """有効なキャッシュのストアを取得（存在しない・古い場合はNone）"""
+        store = ColumnStore(self.get_entry_dir(file_path))
+        try:
+            if not store.exists():
+                return None
+            # 元ファイルが更新されていればキャッシュを破棄
+            if not os.path.exists(file_path) or store.header.get('key') != self.make_key(file_path):
+                self.invalidate(file_path)
+                return None
+        except (OSError, ValueError):
+            self.invalidate(file_path)
+            return None
+        return store
+    
+    def load(self, file_path, start=None, end=None):
+        """キャッシュを読み込み（存在しない・古い場合はNone）"""
+        store = self.get_store(file_path)
+        if store is None:
+            return None
+        try:
+            return store.to_frame(start, end)
+        except (OSError, ValueError, KeyError):
+            self.invalidate(file_path)
+            return None
+    
+    def save(self, file_path, df):
+        """データフレームを列ごとのバイナリとして保存"""
+        if df is None or not os.path.exists(file_path):
+            return False
+        if list(df.columns) != ['datetime'] + PRICE_COLUMNS:
+            # 日時・OHLC以外の列を含む場合は対象外
+            return False
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            store = ColumnStore(self.get_entry_dir(file_path))
+            store.write(df, extra_header={'key': self.make_key(file_path)})
+        except OSError:
+            # 書き込めない場合はキャッシュなしで続行
+            return False
+        return True
+    
+    def invalidate(self, file_path):
+        """元ファイルに対応するキャッシュを削除"""
+        shutil.rmtree(self.get_entry_dir(file_path), ignore_errors=True)
+    
+    def clear(self):
+        """キャッシュをすべて削除"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
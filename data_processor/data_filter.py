@@ -1,25 +1,28 @@
 import pandas as pd
-import streamlit as st
+from data_processor.status_messages import show_message
 
 class DataFilter:
     """データフィルタリングクラス"""
     
     def remove_market_closed_data(self, df):
         """市場クローズ中のデータ（open=close=high=low）を除外"""
-        df = df.copy()
+        df_filtered, removed_count = self.filter_market_closed(df)
+        if removed_count > 0:
+            show_message('info', f"市場クローズ中データ {removed_count}件 を除外しました")
+        return df_filtered
+    
+    def filter_market_closed(self, df):
+        """市場クローズ中のデータを除外し、除外件数とともに返す（表示なし）"""
         market_closed = (
-            (df['Open'] == df['Close']) & 
-            (df['Close'] == df['High']) & 
+            (df['Open'] == df['Close']) &
+            (df['Close'] == df['High']) &
             (df['High'] == df['Low'])
         )
-        df_filtered = df[~market_closed].copy()
-        removed_count = len(df) - len(df_filtered)
-        if removed_count > 0:
-            st.info(f"市場クローズ中データ {removed_count}件 を除外しました")
-        return df_filtered.reset_index(drop=True)
+        df_filtered = df[~market_closed].reset_index(drop=True)
+        return df_filtered, len(df) - len(df_filtered)
     
     def get_data_range(self, df):
         """データの範囲を取得"""
         if df is None or df.empty:
             return None, None
-        return df['datetime'].min(), df['datetime'].max() 
\ No newline at end of file
+        return df['datetime'].min(), df['datetime'].max()
\ No newline at end of file
@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+from data_processor.column_store import ColumnStore, datetime_to_int64
+
+# 結合済みデータストアの保存先
+STORE_DIR = "data/store"
+
+class DataIngestor:
+    """新規・追記されたソースファイルから最終時刻より新しいバーのみをストアに追記するクラス"""
+    
+    def __init__(self, data_processor):
+        self.data_processor = data_processor
+    
+    def ingest(self, store_dir, file_paths):
+        """ソースファイルを差分取り込み"""
+        store = ColumnStore(store_dir)
+        header = store.header if store.exists() else {}
+        last_timestamp = header.get('max_timestamp')
+        sources = dict(header.get('sources', {}))
+        
+        result = {'appended': 0, 'duplicates': 0, 'skipped': [], 'ingested': []}
+        new_frames = []
+        for file_path in file_paths:
+            source = os.path.abspath(file_path)
+            source_key = self._make_source_key(file_path)
+            if sources.get(source) == source_key:
+                # 前回取り込み時から変更のないファイルは読み込まない
+                result['skipped'].append(file_path)
+                continue
+            
+            df = self.data_processor.load_fx_data(file_path)
+            if df is None:
+                raise ValueError(f"ソースファイルを読み込めません: {file_path}")
+            
+            # 最終時刻以前のバーは取り込み済みのため除外
+            if last_timestamp is not None:
+                timestamps, _ = datetime_to_int64(df['datetime'])
+                is_new = timestamps > last_timestamp
+                result['duplicates'] += int((~is_new).sum())
+                df = df[is_new]
+            new_frames.append(df)
+            sources[source] = source_key
+            result['ingested'].append(file_path)
+        
+        if new_frames:
+            new_df = pd.concat(new_frames, ignore_index=True)
+            # 新規バーのみを整列し、ソース間で重複するバーは先に取り込んだ方を残す
+            new_df = new_df.sort_values('datetime', kind='stable')
+            deduplicated = new_df.drop_duplicates(subset='datetime', keep='first')
+            result['duplicates'] += len(new_df) - len(deduplicated)
+            result['appended'] = store.append(deduplicated.reset_index(drop=True), extra_header={'sources': sources})
+        
+        result['rows'] = store.rows if store.exists() else 0
+        return result
+    
+    def _make_source_key(self, file_path):
+        """ソースファイルの変更検出用キー"""
+        stat = os.stat(file_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
@@ -1,9 +1,27 @@
+import re
+from datetime import timedelta, timezone
+
+import numpy as np
 import pandas as pd
-import streamlit as st
+from data_processor.status_messages import show_message
+
+# Dukascopy形式（例: 01.01.2022 00:00:00.000 GMT+0900）
+DUKASCOPY_DATETIME_FORMAT = '%d.%m.%Y %H:%M:%S.%f'
+GMT_OFFSET_PATTERN = re.compile(r' GMT([+-])(\d{2}):?(\d{2})$')
+
+# 読み込み・フィルタ処理を変更した場合は更新する（キャッシュ無効化用）
+LOADER_VERSION = 3
+
+# ストリーミング読み込みの1チャンクあたりの行数
+DEFAULT_CHUNK_ROWS = 100000
 
 class DataLoader:
     """データ読み込みの基本クラス"""
     
+    def __init__(self):
+        # 直近の読み込みで行単位パースにフォールバックした行数
+        self.last_fallback_count = 0
+    
     def load_data(self, file_path):
         """FXデータを読み込み"""
         try:
@@ -11,15 +29,30 @@ class DataLoader:
             df = self._set_column_names(df)
             df = self._parse_datetime(df)
             df = self._rename_datetime_column(df)
-            df = df.copy().sort_values('datetime').reset_index(drop=True)
+            df = df.sort_values('datetime').reset_index(drop=True)
             return df
         except Exception as e:
-            st.error(f"データ読み込みエラー: {e}")
+            show_message('error', f"データ読み込みエラー: {e}")
             return None
     
+    def iter_chunks(self, file_path, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """FXデータを固定行数のチャンクごとに読み込み（ファイルは時刻順であること）"""
+        last_datetime = None
+        with pd.read_csv(file_path, chunksize=chunk_rows) as reader:
+            for df in reader:
+                df = self._set_column_names(df)
+                df = self._parse_datetime(df)
+                df = self._rename_datetime_column(df)
+                
+                # ファイル全体のソートは行わないため、時刻順であることを確認
+                if not df['datetime'].is_monotonic_increasing or (
+                        last_datetime is not None and df['datetime'].iloc[0] <= last_datetime):
+                    raise ValueError(f"ストリーミング読み込みには時刻順のファイルが必要です: {file_path}")
+                last_datetime = df['datetime'].iloc[-1]
+                yield df
+    
     def _set_column_names(self, df):
         """カラム名を設定し、必要な列のみ抽出"""
-        df = df.copy()
         if len(df.columns) >= 6:
             df.columns = ['DateTime', 'Open', 'High', 'Low', 'Close', 'Volume']
             return df[['DateTime', 'Open', 'High', 'Low', 'Close']]
@@ -29,22 +62,89 @@ class DataLoader:
     
     def _rename_datetime_column(self, df):
         """DateTimeカラムをdatetimeにリネーム"""
-        df = df.copy()
         if 'DateTime' in df.columns:
             df = df.rename(columns={'DateTime': 'datetime'})
         return df
     
     def _parse_datetime(self, df):
-        """DateTimeをdatetime型に変換"""
-        def parse_datetime(date_str):
-            try:
-                if 'GMT' in str(date_str):
-                    date_part = str(date_str).split(' GMT')[0]
-                    return pd.to_datetime(date_part, format='%d.%m.%Y %H:%M:%S.%f')
-                else:
-                    return pd.to_datetime(date_str)
-            except:
-                return pd.to_datetime(date_str, errors='coerce')
+        """DateTimeをdatetime型に変換（GMTオフセットごとに列単位で一括変換し、失敗行のみ行単位で変換）"""
+        raw = df['DateTime'].astype(str)
+        # 夏時間の切り替えなどで行ごとにオフセットが異なるため、各行のオフセットで時刻を求めて先頭行のオフセットで表す
+        tz = self._detect_gmt_offset(raw)
+        
+        if tz is not None:
+            utc = np.full(len(raw), np.iinfo(np.int64).min, dtype=np.int64)
+            values = raw.to_numpy()
+            # 未変換の行の先頭のオフセットを取り出し、同じオフセットの行をまとめて変換（オフセットの種類の数だけ繰り返す）
+            pending = np.flatnonzero(raw.str.contains(' GMT', regex=False).to_numpy())
+            while len(pending) > 0:
+                first = values[pending[0]]
+                match = GMT_OFFSET_PATTERN.search(first)
+                if match is None:
+                    pending = pending[1:]
+                    continue
+                suffix = first[match.start():]
+                candidates = pd.Series(values[pending])
+                has_suffix = candidates.str.endswith(suffix).to_numpy()
+                positions = pending[has_suffix]
+                pending = pending[~has_suffix]
+                local = pd.to_datetime(
+                    candidates[has_suffix].str.slice(0, -len(suffix)).to_numpy(),
+                    format=DUKASCOPY_DATETIME_FORMAT, errors='coerce'
+                ).to_numpy()
+                valid = ~np.isnat(local)
+                offset = self._parse_gmt_offset(suffix).utcoffset(None) // pd.Timedelta(1, 'ns')
+                utc[positions[valid]] = local[valid].astype(np.int64) - offset
+            parsed = pd.Series(pd.to_datetime(utc, utc=True).tz_convert(tz), index=df.index)
+        else:
+            parsed = pd.to_datetime(raw, errors='coerce')
+        
+        # 一括変換に失敗した行（オフセットのない行を含む）のみ従来の行単位パースにフォールバック
+        failed = parsed.isna() & df['DateTime'].notna()
+        self.last_fallback_count = int(failed.sum())
+        if self.last_fallback_count > 0:
+            fallback = df.loc[failed, 'DateTime'].apply(self._parse_datetime_row)
+            parsed = parsed.astype(object)
+            parsed[failed] = [self._align_timezone(value, tz) for value in fallback]
+            parsed = pd.to_datetime(parsed)
+            show_message('info', f"日時の一括変換に失敗した {self.last_fallback_count}件 を行単位で変換しました")
         
-        df['DateTime'] = df['DateTime'].apply(parse_datetime)
-        return df 
\ No newline at end of file
+        df['DateTime'] = parsed
+        return df
+    
+    def _detect_gmt_offset(self, raw):
+        """先頭行からGMTオフセットを検出し、タイムゾーンを返す"""
+        if raw.empty:
+            return None
+        return self._parse_gmt_offset(raw.iloc[0])
+    
+    def _parse_gmt_offset(self, value):
+        """日時文字列末尾のGMTオフセットをタイムゾーンに変換（ない場合はNone）"""
+        match = GMT_OFFSET_PATTERN.search(value)
+        if match is None:
+            return None
+        sign = 1 if match.group(1) == '+' else -1
+        offset = timedelta(hours=int(match.group(2)), minutes=int(match.group(3)))
+        return timezone(sign * offset)
+    
+    def _align_timezone(self, value, tz):
+        """フォールバック結果のタイムゾーンを一括変換結果に合わせる"""
+        if tz is None or pd.isna(value):
+            return value
+        if value.tzinfo is None:
+            return value.tz_localize(tz)
+        return value.tz_convert(tz)
+    
+    def _parse_datetime_row(self, date_str):
+        """1行分の日時文字列を変換（フォールバック用）"""
+        try:
+            if 'GMT' in str(date_str):
+                date_part = str(date_str).split(' GMT')[0]
+                tz = self._parse_gmt_offset(str(date_str))
+                parsed = pd.to_datetime(date_part, format=DUKASCOPY_DATETIME_FORMAT)
+                # 行のオフセットが読み取れる場合はその時刻として扱う
+                return parsed if tz is None else parsed.tz_localize(tz)
+            else:
+                return pd.to_datetime(date_str)
+        except:
+            return pd.to_datetime(date_str, dayfirst=True, errors='coerce')
@@ -0,0 +1,136 @@
+import json
+import os
+import re
+
+import pandas as pd
+from data_processor.column_store import datetime_to_int64, to_int64, serialize_tz, deserialize_tz
+
+# パーティションファイル名（例: USDJPY_2022_15min.csv）
+PARTITION_FILE_PATTERN = re.compile(r'^(?P<symbol>[A-Za-z]+)_(?P<period>[^_]+)_(?P<timeframe>\d+(?:min|h|d))\.csv$')
+# 各期間を結合済みのファイル（パーティションとは重複するため対象外）
+COMBINED_PERIOD = "all_years"
+CATALOG_FILE = "catalog.json"
+
+class DatasetCatalog:
+    """データディレクトリを走査し、通貨ペア・時間足・期間ごとのパーティションを管理するクラス"""
+    
+    def __init__(self, data_processor, data_root="data"):
+        self.data_processor = data_processor
+        self.data_root = data_root
+        self._partitions = None
+    
+    @property
+    def catalog_path(self):
+        """カタログ（メタデータ索引）の保存先"""
+        return os.path.join(self.data_root, CATALOG_FILE)
+    
+    def refresh(self):
+        """データディレクトリを走査し、追加・更新されたファイルのみメタデータを作り直す"""
+        known = {partition['path']: partition for partition in self._load_index()}
+        partitions = []
+        changed = False
+        
+        for file_name in sorted(os.listdir(self.data_root)) if os.path.isdir(self.data_root) else []:
+            match = PARTITION_FILE_PATTERN.match(file_name)
+            if match is None or match.group('period') == COMBINED_PERIOD:
+                continue
+            path = os.path.join(self.data_root, file_name)
+            stat = os.stat(path)
+            partition = known.get(path)
+            if partition is None or partition['size'] != stat.st_size or partition['mtime_ns'] != stat.st_mtime_ns:
+                partition = self._scan_partition(path, match, stat)
+                changed = True
+                if partition is None:
+                    continue
+            partitions.append(partition)
+        
+        if changed or len(partitions) != len(known):
+            self._save_index(partitions)
+        self._partitions = partitions
+        return partitions
+    
+    def get_partitions(self, symbol=None, timeframe=None, period=None):
+        """条件に合うパーティションを取得（カタログのみ参照し、データファイルは読まない）"""
+        if self._partitions is None:
+            self._partitions = self._load_index()
+        return [
+            partition for partition in self._partitions
+            if (symbol is None or partition['symbol'] == symbol)
+            and (timeframe is None or partition['timeframe'] == timeframe)
+            and (period is None or partition['period'] == period)
+        ]
+    
+    def list_symbols(self):
+        """通貨ペア一覧"""
+        return sorted({partition['symbol'] for partition in self.get_partitions()})
+    
+    def list_timeframes(self, symbol):
+        """通貨ペアの時間足一覧"""
+        return sorted({partition['timeframe'] for partition in self.get_partitions(symbol)})
+    
+    def list_periods(self, symbol, timeframe):
+        """通貨ペア・時間足の期間一覧（開始時刻順）"""
+        partitions = sorted(self.get_partitions(symbol, timeframe), key=lambda p: p['min_timestamp'])
+        return [partition['period'] for partition in partitions]
+    
+    def find_partitions(self, symbol, timeframe, start=None, end=None):
+        """日時範囲と重なるパーティションのみをメタデータで絞り込む"""
+        partitions = []
+        for partition in self.get_partitions(symbol, timeframe):
+            tz = deserialize_tz(partition['tz'])
+            if start is not None and partition['max_timestamp'] < to_int64(start, tz):
+                continue
+            if end is not None and partition['min_timestamp'] > to_int64(end, tz):
+                continue
+            partitions.append(partition)
+        return sorted(partitions, key=lambda p: p['min_timestamp'])
+    
+    def query(self, symbol, timeframe, start=None, end=None):
+        """通貨ペア・時間足・日時範囲のデータを、重なるパーティションのみ開いて取得"""
+        partitions = self.find_partitions(symbol, timeframe, start, end)
+        if not partitions:
+            return pd.DataFrame()
+        
+        file_paths = [partition['path'] for partition in partitions]
+        frames = self.data_processor.load_fx_partitions(file_paths)
+        sliced = [
+            self.data_processor.slice_frame(frames[path], start, end)
+            for path in file_paths if frames[path] is not None
+        ]
+        return self.data_processor.merge_partitions(sliced)
+    
+    def _scan_partition(self, path, match, stat):
+        """パーティションを読み込み、行数・時刻範囲を記録"""
+        df = self.data_processor.load_fx_data(path)
+        if df is None or df.empty:
+            return None
+        timestamps, tz = datetime_to_int64(df['datetime'])
+        return {
+            'path': path,
+            'symbol': match.group('symbol').upper(),
+            'period': match.group('period'),
+            'timeframe': match.group('timeframe'),
+            'rows': len(df),
+            'min_timestamp': int(timestamps.min()),
+            'max_timestamp': int(timestamps.max()),
+            'tz': serialize_tz(tz),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
+    
+    def _load_index(self):
+        """カタログを読み込み"""
+        if not os.path.exists(self.catalog_path):
+            return []
+        try:
+            with open(self.catalog_path, encoding='utf-8') as f:
+                return json.load(f)['partitions']
+        except (OSError, ValueError, KeyError):
+            return []
+    
+    def _save_index(self, partitions):
+        """カタログを保存"""
+        tmp_path = f"{self.catalog_path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'partitions': partitions}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.catalog_path)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from data_processor.column_store import is_memory_mapped
+
+# シグナル条件のビット位置（この順でビットを割り当てるため、追加は末尾に行う）
+SIGNAL_FLAGS = [
+    'MA25_above_MA75', 'Golden_Cross_25_75', 'Dead_Cross_25_75',
+    'MA25_slope_positive', 'MA75_slope_positive', 'MA200_slope_positive',
+    'bullish_perfect_order', 'bearish_perfect_order', 'perfect_order',
+    'perfect_order_start', 'perfect_order_end',
+    'price_breakout_bullish', 'price_breakout_bearish',
+    'rsi_in_range', 'perfect_order_continued', 'entry_signal',
+    'exit_signal_bullish', 'exit_signal_bearish', 'exit_signal'
+]
+SIGNAL_FLAGS_COLUMN = 'signal_flags'
+DEBUG_COLUMN_PREFIX = 'debug_'
+
+class FrameCompactor:
+    """処理済みデータフレームを省メモリ形式（float32・シグナル条件のビットマスク）に変換するクラス"""
+    
+    def __init__(self, float_dtype='float32'):
+        self.float_dtype = float_dtype
+    
+    def compact(self, df):
+        """価格・指標をfloat32に、シグナル条件を1列のビットマスクに変換し、デバッグ列を削除"""
+        columns = {}
+        flags = np.zeros(len(df), dtype=np.uint32)
+        packed = []
+        if SIGNAL_FLAGS_COLUMN in df.columns:
+            # 既にビットマスクを持つ場合は引き継ぐ
+            flags |= df[SIGNAL_FLAGS_COLUMN].to_numpy().astype(np.uint32)
+            packed = list(df.attrs.get(SIGNAL_FLAGS_COLUMN, SIGNAL_FLAGS))
+        
+        for column in df.columns:
+            if column.startswith(DEBUG_COLUMN_PREFIX) or column == SIGNAL_FLAGS_COLUMN:
+                continue
+            values = df[column]
+            if column in SIGNAL_FLAGS and values.dtype == bool:
+                flags |= values.to_numpy().astype(np.uint32) << np.uint32(SIGNAL_FLAGS.index(column))
+                if column not in packed:
+                    packed.append(column)
+            elif values.dtype == np.float64 and not is_memory_mapped(values.to_numpy()):
+                columns[column] = values.to_numpy().astype(self.float_dtype)
+            else:
+                # メモリマップ上の列は複製せずに参照（同じファイルを開く他のセッションとページキャッシュを共有）
+                columns[column] = values.to_numpy()
+        
+        compacted = pd.DataFrame(columns, index=df.index, copy=False)
+        if packed:
+            compacted[SIGNAL_FLAGS_COLUMN] = flags
+            # ビットマスクに含まれる条件名（expandで元の列を復元するために保持）
+            compacted.attrs[SIGNAL_FLAGS_COLUMN] = packed
+        return compacted
+    
+    def get_flag(self, df, name):
+        """シグナル条件を名前で取得（ビットマスク・通常の列のどちらにも対応）"""
+        if name in df.columns:
+            return df[name]
+        if SIGNAL_FLAGS_COLUMN not in df.columns or name not in SIGNAL_FLAGS:
+            raise KeyError(name)
+        bit = np.uint32(1 << SIGNAL_FLAGS.index(name))
+        return pd.Series((df[SIGNAL_FLAGS_COLUMN].to_numpy() & bit) != 0, index=df.index, name=name)
+    
+    def expand(self, df):
+        """ビットマスクを通常のbool列に戻す（float32の列はそのまま）"""
+        if SIGNAL_FLAGS_COLUMN not in df.columns:
+            return df
+        expanded = df.drop(columns=SIGNAL_FLAGS_COLUMN)
+        for name in df.attrs.get(SIGNAL_FLAGS_COLUMN, SIGNAL_FLAGS):
+            expanded[name] = self.get_flag(df, name).to_numpy()
+        expanded.attrs.pop(SIGNAL_FLAGS_COLUMN, None)
+        return expanded
+    
+    def memory_per_bar(self, df):
+        """1バーあたりのメモリ使用量（バイト）"""
+        if len(df) == 0:
+            return 0.0
+        return df.memory_usage(index=False, deep=True).sum() / len(df)
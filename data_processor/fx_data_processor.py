@@ -1,27 +1,112 @@
 import pandas as pd
-import streamlit as st
-from data_processor.data_loader import DataLoader
+from data_processor.status_messages import show_message
+from data_processor.data_loader import DataLoader, DEFAULT_CHUNK_ROWS
 from data_processor.data_filter import DataFilter
+from data_processor.data_cache import DataCache, CACHE_DIR
+from data_processor.data_ingestor import DataIngestor
+from data_processor.partition_loader import PartitionLoader
+from data_processor.column_store import ColumnStore, frame_to_arrays
+from data_processor.time_index import TimeIndex
 
 class FXDataProcessor:
     """FXデータ処理の統合クラス"""
     
-    def __init__(self):
+    def __init__(self, cache_dir=CACHE_DIR):
         self.data_loader = DataLoader()
         self.data_filter = DataFilter()
+        self.data_cache = DataCache(cache_dir)
+        self.data_ingestor = DataIngestor(self)
+        self.partition_loader = PartitionLoader(self)
     
-    def load_fx_data(self, file_path):
-        """FXデータを読み込み、市場クローズ中のデータを除外"""
+    def load_fx_data(self, file_path, start=None, end=None, use_cache=True):
+        """FXデータを読み込み、市場クローズ中のデータを除外（start・end指定時はその範囲のみ）"""
         try:
+            # キャッシュがあればCSV読み込みとフィルタ処理を省略し、メモリマップのビューを参照するデータフレームを返す
+            if use_cache:
+                df = self.data_cache.load(file_path, start, end)
+                if df is not None:
+                    return df
+            
             df = self.data_loader.load_data(file_path)
             if df is None:
                 return None
             df = self.data_filter.remove_market_closed_data(df)
-            return df
+            
+            # 保存できた場合は作成したストアのビューを返す（保存できない列構成の場合は読み込んだデータを切り出し）
+            if use_cache and self.data_cache.save(file_path, df):
+                cached = self.data_cache.load(file_path, start, end)
+                if cached is not None:
+                    return cached
+            return self.slice_frame(df, start, end)
         except Exception as e:
-            st.error(f"データ処理エラー: {e}")
+            show_message('error', f"データ処理エラー: {e}")
+            return None
+    
+    def iter_fx_data(self, file_path, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """FXデータをチャンクごとに読み込み、市場クローズ中のデータを除外して返すジェネレーター"""
+        removed_total = 0
+        for chunk in self.data_loader.iter_chunks(file_path, chunk_rows):
+            chunk, removed_count = self.data_filter.filter_market_closed(chunk)
+            removed_total += removed_count
+            if not chunk.empty:
+                yield chunk
+        if removed_total > 0:
+            show_message('info', f"市場クローズ中データ {removed_total}件 を除外しました")
+    
+    def load_fx_arrays(self, file_path, start=None, end=None):
+        """日時範囲の時刻（int64）・OHLC列をメモリマップ上のNumPyビューとして取得"""
+        store = self.data_cache.get_store(file_path)
+        if store is not None:
+            return store.slice(start, end)
+        
+        # キャッシュがなければ一度読み込んでストアを作成
+        df = self.load_fx_data(file_path, start, end)
+        if df is None:
             return None
+        store = self.data_cache.get_store(file_path)
+        if store is not None:
+            return store.slice(start, end)
+        # ストアを作成できない場合は読み込んだ範囲を同じ形式の配列に変換
+        return frame_to_arrays(df)[0]
+    
+    def load_fx_partitions(self, file_paths):
+        """複数の期間ファイルを並列に読み込み"""
+        return self.partition_loader.load_partitions(file_paths)
+    
+    def merge_partitions(self, frames):
+        """時刻順のパーティションを結合"""
+        return self.partition_loader.merge_ordered(frames)
+    
+    def ingest_fx_data(self, store_dir, file_paths):
+        """ソースファイルの新しいバーのみをストアに差分取り込み"""
+        return self.data_ingestor.ingest(store_dir, file_paths)
+    
+    def load_store_data(self, store_dir, start=None, end=None):
+        """ストアのデータを読み込み（存在しない場合はNone）"""
+        store = ColumnStore(store_dir)
+        if not store.exists():
+            return None
+        return store.to_frame(start, end)
+    
+    def rebuild_cache(self, file_paths):
+        """指定ファイルのキャッシュをすべて作り直す"""
+        results = {}
+        for file_path in file_paths:
+            self.data_cache.invalidate(file_path)
+            df = self.load_fx_data(file_path)
+            results[file_path] = None if df is None else len(df)
+        return results
+    
+    def clear_cache(self):
+        """キャッシュをすべて削除"""
+        self.data_cache.clear()
     
     def get_data_range(self, df):
         """データの範囲を取得"""
-        return self.data_filter.get_data_range(df) 
\ No newline at end of file
+        return self.data_filter.get_data_range(df)
+    
+    def slice_frame(self, df, start=None, end=None):
+        """日時範囲でデータを切り出し"""
+        if start is None and end is None:
+            return df
+        return TimeIndex(df['datetime']).slice(df, start, end).reset_index(drop=True)
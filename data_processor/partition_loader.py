@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+from data_processor.status_messages import record_messages, replay_messages, show_message
+
+def _load_partition(file_path):
+    """ワーカープロセスで1ファイルを読み込み、表示するメッセージ（ワーカーでは表示されない）とともに返す"""
+    from data_processor import load_fx_data
+    with record_messages() as messages:
+        df = load_fx_data(file_path)
+    return df, messages
+
+class PartitionLoader:
+    """期間ごとに分割されたファイルを並列に読み込み、時刻順に結合するクラス"""
+    
+    def __init__(self, data_processor, max_workers=None):
+        self.data_processor = data_processor
+        self.max_workers = max_workers
+    
+    def load_partitions(self, file_paths):
+        """複数ファイルを読み込み（キャッシュ未作成のファイルのみプロセスプールで並列にパース）"""
+        results = {}
+        pending = []
+        for file_path in file_paths:
+            if self.data_processor.data_cache.get_store(file_path) is not None:
+                # キャッシュ済みのファイルはプロセス起動の方が高くつくため直接読み込む
+                results[file_path] = self.data_processor.load_fx_data(file_path)
+            else:
+                pending.append(file_path)
+        
+        if len(pending) > 1:
+            max_workers = min(len(pending), self.max_workers or os.cpu_count() or 1)
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    for file_path, (df, messages) in zip(pending, executor.map(_load_partition, pending)):
+                        results[file_path] = df
+                        # ワーカーの状態・エラーは親プロセスで表示
+                        replay_messages(messages, f"{os.path.basename(file_path)}: ")
+                pending = []
+            except (BrokenProcessPool, OSError) as e:
+                # プロセスプールが使えない環境では逐次読み込みに切り替える
+                show_message('warning', f"並列読み込みに失敗したため逐次読み込みに切り替えます: {e}")
+                pending = [file_path for file_path in pending if file_path not in results]
+        
+        for file_path in pending:
+            results[file_path] = self.data_processor.load_fx_data(file_path)
+        
+        return {file_path: results[file_path] for file_path in file_paths}
+    
+    def merge_ordered(self, frames):
+        """時刻順・重複なしのパーティションを全体ソートせずに結合"""
+        frames = [df for df in frames if df is not None and not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        
+        for df in frames:
+            if not df['datetime'].is_monotonic_increasing:
+                raise ValueError("パーティション内のデータが時刻順になっていません")
+        
+        # パーティションを先頭時刻順に並べ、境界が重ならなければ連結のみで済ませる
+        frames = sorted(frames, key=lambda df: df['datetime'].iloc[0])
+        is_disjoint = all(
+            previous['datetime'].iloc[-1] < current['datetime'].iloc[0]
+            for previous, current in zip(frames, frames[1:])
+        )
+        combined_df = pd.concat(frames, ignore_index=True)
+        if not is_disjoint:
+            combined_df = combined_df.sort_values('datetime', kind='stable').reset_index(drop=True)
+        return combined_df
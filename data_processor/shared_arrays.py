@@ -0,0 +1,129 @@
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from data_processor.column_store import datetime_to_int64, int64_to_datetime
+
+# 各列の先頭位置の境界（バイト）
+SHARED_ARRAY_ALIGNMENT = 64
+
+class SharedArrays:
+    """データフレームの列を共有メモリに1回だけ書き込み、他のプロセスから列名で読み取り専用のビューとして参照するクラス"""
+    
+    def __init__(self, block, manifest, owner):
+        self._block = block
+        self.manifest = manifest
+        self.owner = owner
+        self._views = {}
+        # 作成したプロセスでは破棄時に共有メモリの名前を削除（メモリはビューがすべて破棄された時点で解放）
+        self._finalizer = weakref.finalize(self, _release_block, block, owner)
+    
+    @classmethod
+    def publish(cls, df, columns=None):
+        """列を共有メモリに書き込む（datetime列はUTC基準のint64として保存）"""
+        columns = list(df.columns if columns is None else columns)
+        arrays = {}
+        tz = None
+        for column in columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]):
+                arrays[column], tz = datetime_to_int64(df[column])
+            else:
+                arrays[column] = np.ascontiguousarray(df[column].to_numpy())
+            if arrays[column].dtype == object:
+                raise TypeError(f"共有メモリに保存できない列です: {column}")
+        
+        layout = []
+        size = 0
+        for column, values in arrays.items():
+            offset = -(-size // SHARED_ARRAY_ALIGNMENT) * SHARED_ARRAY_ALIGNMENT
+            layout.append((column, values.dtype.str, values.shape, offset))
+            size = offset + values.nbytes
+        
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for column, dtype, shape, offset in layout:
+            np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)[...] = arrays[column]
+        manifest = {'name': block.name, 'rows': len(df), 'columns': layout, 'tz': tz}
+        return cls(block, manifest, owner=True)
+    
+    @classmethod
+    def attach(cls, manifest):
+        """他のプロセスで作成された共有メモリを開く（削除は作成したプロセスが行う）"""
+        # multiprocessingで起動したプロセスは作成したプロセスとリソース管理を共有するため、登録の重複は問題ない
+        block = shared_memory.SharedMemory(name=manifest['name'])
+        return cls(block, manifest, owner=False)
+    
+    def __getitem__(self, column):
+        """列の読み取り専用ビュー（datetime列はUTC基準のint64）"""
+        view = self._views.get(column)
+        if view is None:
+            for name, dtype, shape, offset in self.manifest['columns']:
+                if name == column:
+                    view = np.asarray(_BlockView(self._block, dtype, shape, offset))
+                    self._views[column] = view
+                    break
+            else:
+                raise KeyError(column)
+        return view
+    
+    def __contains__(self, column):
+        return any(name == column for name, _, _, _ in self.manifest['columns'])
+    
+    def __len__(self):
+        return self.manifest['rows']
+    
+    def keys(self):
+        """列名の一覧"""
+        return [name for name, _, _, _ in self.manifest['columns']]
+    
+    def datetimes(self, column='datetime', positions=None):
+        """datetime列（または指定した行のみ）を元のタイムゾーンの日時に変換"""
+        values = self[column] if positions is None else self[column][positions]
+        return int64_to_datetime(values, self.manifest['tz'])
+    
+    def to_frame(self, columns=None):
+        """数値・bool列はコピーせずにデータフレームとして参照（datetime列のみ日時に変換）"""
+        columns = self.keys() if columns is None else columns
+        data = {}
+        for column in columns:
+            if column == 'datetime':
+                data[column] = pd.Series(self.datetimes(column))
+            else:
+                data[column] = self[column]
+        return pd.DataFrame(data, copy=False)
+    
+    def close(self):
+        """共有メモリへの参照を解放（作成したプロセスでは名前も削除し、取得済みのビューは破棄されるまで有効）"""
+        self._views.clear()
+        self._block = None
+        self._finalizer()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def as_frame(data, columns=None):
+    """共有メモリのビューの場合はコピーせずにデータフレームとして参照（データフレームはそのまま）"""
+    if isinstance(data, SharedArrays):
+        return data.to_frame(columns)
+    return data
+
+class _BlockView:
+    """共有メモリ上の1列を指す配列インターフェース（ビューが共有メモリを参照し続けることで、使用中のメモリが閉じられないようにする）"""
+    
+    def __init__(self, block, dtype, shape, offset):
+        self.block = block
+        address = np.frombuffer(block.buf, dtype=np.uint8).ctypes.data
+        self.__array_interface__ = {
+            'version': 3,
+            'shape': tuple(shape),
+            'typestr': dtype,
+            'data': (address + offset, True)
+        }
+
+def _release_block(block, owner):
+    """作成したプロセスの場合は共有メモリの名前を削除（メモリは参照がなくなった時点で閉じられる）"""
+    if owner:
+        block.unlink()
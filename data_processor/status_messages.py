@@ -0,0 +1,29 @@
+import contextlib
+
+import streamlit as st
+
+# 記録中のメッセージの一覧（Noneの場合はそのまま表示）
+_recorded = None
+
+def show_message(level, message):
+    """st.info・st.errorなどでメッセージを表示（record_messages()の中では表示せずに記録）"""
+    if _recorded is not None:
+        _recorded.append((level, message))
+    else:
+        getattr(st, level)(message)
+
+@contextlib.contextmanager
+def record_messages():
+    """表示するメッセージ（種類, 本文）を記録（ワーカープロセスのメッセージを親プロセスで表示する場合に使用）"""
+    global _recorded
+    previous = _recorded
+    _recorded = []
+    try:
+        yield _recorded
+    finally:
+        _recorded = previous
+
+def replay_messages(messages, prefix=''):
+    """記録したメッセージを表示"""
+    for level, message in messages:
+        show_message(level, f"{prefix}{message}")
@@ -0,0 +1,73 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+from data_processor.column_store import datetime_to_int64, to_int64
+
+class TimeIndex:
+    """datetime列の昇順int64インデックス（範囲・時刻の検索を二分探索で行う）"""
+    
+    def __init__(self, datetimes):
+        self.timestamps, self.tz = datetime_to_int64(datetimes)
+        if len(self.timestamps) > 1 and (np.diff(self.timestamps) < 0).any():
+            raise ValueError("日時列が昇順になっていません")
+    
+    def __len__(self):
+        return len(self.timestamps)
+    
+    def localize(self, value):
+        """日時をデータのタイムゾーンのTimestampに変換（タイムゾーンのない日時はデータの現地時刻とみなす）"""
+        timestamp = pd.Timestamp(value)
+        if self.tz is None:
+            return timestamp.tz_localize(None) if timestamp.tzinfo is not None else timestamp
+        return timestamp.tz_localize(self.tz) if timestamp.tzinfo is None else timestamp.tz_convert(self.tz)
+    
+    def day_range(self, start_date, end_date):
+        """開始日の0時から終了日の23:59:59までの範囲（データのタイムゾーンで比較できる日時）"""
+        start = self.localize(pd.Timestamp(start_date).normalize())
+        end = self.localize(pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))
+        return start, end
+    
+    def locate(self, start=None, end=None):
+        """日時範囲 [start, end] に対応する行範囲 [lo, hi) を取得"""
+        lo = 0 if start is None else int(self.timestamps.searchsorted(to_int64(start, self.tz), side='left'))
+        hi = len(self.timestamps) if end is None else int(self.timestamps.searchsorted(to_int64(end, self.tz), side='right'))
+        return lo, max(lo, hi)
+    
+    def find(self, value):
+        """日時と一致する行位置を取得（存在しない場合はNone）"""
+        timestamp = to_int64(value, self.tz)
+        position = int(self.timestamps.searchsorted(timestamp, side='left'))
+        if position < len(self.timestamps) and self.timestamps[position] == timestamp:
+            return position
+        return None
+    
+    def slice(self, df, start=None, end=None):
+        """日時範囲の行を切り出し"""
+        lo, hi = self.locate(start, end)
+        return df.iloc[lo:hi]
+    
+    def matches(self, df):
+        """データフレームの日時列と対応しているか（行数と先頭・末尾の時刻で確認）"""
+        if len(df) != len(self.timestamps):
+            return False
+        if len(df) == 0:
+            return True
+        first, last = df['datetime'].iloc[0], df['datetime'].iloc[-1]
+        return self.find(first) == 0 and to_int64(last, self.tz) == self.timestamps[-1]
+
+# データフレームごとのインデックス（データフレームが破棄されたら削除）
+_time_indexes = {}
+
+def get_time_index(df):
+    """データフレームの時刻インデックスを取得（同じデータフレームでは作成済みのものを再利用）"""
+    key = id(df)
+    time_index = _time_indexes.get(key)
+    if time_index is not None and time_index.matches(df):
+        return time_index
+    
+    time_index = TimeIndex(df['datetime'])
+    if key not in _time_indexes:
+        weakref.finalize(df, _time_indexes.pop, key, None)
+    _time_indexes[key] = time_index
+    return time_index
@@ -0,0 +1,62 @@
+import weakref
+
+import numpy as np
+from data_processor.column_store import datetime_to_int64
+from data_processor.timeframe_resampler import TimeframeResampler
+
+class TimeframeProjection:
+    """下位足の各バーから、その時点で確定済みの上位足のバー位置への対応表（先読みなし）"""
+    
+    def __init__(self, df, timeframe):
+        self.timeframe = timeframe
+        self.bars = TimeframeResampler().resample(df, timeframe)
+        self.base_rows = len(df)
+        self.first_datetime = df['datetime'].iloc[0] if len(df) else None
+        self.last_datetime = df['datetime'].iloc[-1] if len(df) else None
+        
+        # 下位足が属する上位足の位置（上位足はデータのある区間のみのため、区間の開始時刻で二分探索）
+        if len(df):
+            bucket_timestamps, _ = datetime_to_int64(df['datetime'].dt.floor(timeframe))
+            bar_timestamps, _ = datetime_to_int64(self.bars['datetime'])
+            buckets = bar_timestamps.searchsorted(bucket_timestamps)
+        else:
+            buckets = np.empty(0, dtype=np.int64)
+        # 属する上位足は下位足の時点では未確定のため、1つ前の上位足を参照（-1は参照できる上位足なし）
+        self.positions = buckets - 1
+    
+    def project(self, values):
+        """上位足の値を下位足に対応付け（確定済みの上位足がない行は欠損、boolの場合はFalse）"""
+        values = np.asarray(values)
+        if len(values) != len(self.bars):
+            raise ValueError(f"上位足のバー数と一致しません: {len(values)} != {len(self.bars)}")
+        if values.dtype.kind not in 'bf':
+            values = values.astype(np.float64)
+        if len(values) == 0:
+            return np.zeros(self.base_rows, dtype=values.dtype) if values.dtype == bool else np.full(self.base_rows, np.nan)
+        projected = values[np.maximum(self.positions, 0)]
+        projected[self.positions < 0] = False if values.dtype == bool else np.nan
+        return projected
+    
+    def matches(self, df):
+        """データフレームと対応しているか（行数と先頭・末尾の時刻で確認）"""
+        if len(df) != self.base_rows:
+            return False
+        if len(df) == 0:
+            return True
+        return df['datetime'].iloc[0] == self.first_datetime and df['datetime'].iloc[-1] == self.last_datetime
+
+# (データフレーム, 時間足)ごとの対応表（データフレームが破棄されたら削除）
+_projections = {}
+
+def get_timeframe_projection(df, timeframe):
+    """下位足から上位足への対応表を取得（同じデータフレーム・時間足では作成済みのものを再利用）"""
+    key = (id(df), timeframe)
+    projection = _projections.get(key)
+    if projection is not None and projection.matches(df):
+        return projection
+    
+    projection = TimeframeProjection(df, timeframe)
+    if key not in _projections:
+        weakref.finalize(df, _projections.pop, key, None)
+    _projections[key] = projection
+    return projection
@@ -0,0 +1,130 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from config.settings import RESAMPLE_CACHE_MAX_MB
+
+# 分析に使用できる時間足（pandasの周期文字列）
+ANALYSIS_TIMEFRAMES = ['15min', '1h', '4h', '1D']
+OHLC_AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}
+
+class TimeframeResampler:
+    """下位足から上位足を作成し、時間足ごとにキャッシュするクラス（LRUで容量を管理）"""
+    
+    def __init__(self, max_bytes=RESAMPLE_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        # (データセットキー, 時間足) -> {'bars': 上位足, 'base_rows': 集計済みの下位足行数, 'last_base_datetime': 最終下位足時刻}
+        self._cache = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+    
+    def resample(self, df, timeframe):
+        """下位足を上位足に集計（データのない区間のバーは作らない）"""
+        if df is None or df.empty:
+            return pd.DataFrame(columns=['datetime'] + list(OHLC_AGGREGATION))
+        # resample()は空の区間にNaNのバーを作るため、存在するバーのみで区間ごとに集計
+        buckets = df['datetime'].dt.floor(timeframe)
+        bars = df[list(OHLC_AGGREGATION)].groupby(buckets, sort=True).agg(OHLC_AGGREGATION)
+        bars.index.name = 'datetime'
+        return bars.reset_index()
+    
+    def get(self, dataset_key, df, timeframe):
+        """キャッシュ済みの上位足を取得（下位足が追加されていれば差分のみ集計して更新）"""
+        cache_key = (dataset_key, timeframe)
+        cached = self._lookup(cache_key)
+        
+        if cached is not None and self._is_extension(df, cached):
+            if len(df) > cached['base_rows']:
+                cached = self._merge(cached, df.iloc[cached['base_rows']:], timeframe)
+                self._store(cache_key, cached)
+            return cached['bars']
+        
+        bars = self.resample(df, timeframe)
+        self._store(cache_key, {
+            'bars': bars,
+            'base_rows': len(df),
+            'last_base_datetime': df['datetime'].iloc[-1] if not df.empty else None
+        })
+        return bars
+    
+    def update(self, dataset_key, new_base_bars, timeframe):
+        """新しい下位足のみを受け取り、キャッシュ済みの上位足を更新"""
+        cache_key = (dataset_key, timeframe)
+        cached = self._lookup(cache_key)
+        if cached is None or cached['last_base_datetime'] is None:
+            bars = self.resample(new_base_bars, timeframe)
+            self._store(cache_key, {
+                'bars': bars,
+                'base_rows': len(new_base_bars),
+                'last_base_datetime': new_base_bars['datetime'].iloc[-1] if not new_base_bars.empty else None
+            })
+            return bars
+        
+        # 集計済みの時刻以前のバーは無視
+        new_base_bars = new_base_bars[new_base_bars['datetime'] > cached['last_base_datetime']]
+        if not new_base_bars.empty:
+            cached = self._merge(cached, new_base_bars, timeframe)
+            self._store(cache_key, cached)
+        return cached['bars']
+    
+    def clear(self, dataset_key=None):
+        """キャッシュを削除"""
+        with self._lock:
+            for cache_key in [key for key in self._cache if dataset_key is None or key[0] == dataset_key]:
+                self._remove(cache_key)
+    
+    def _lookup(self, cache_key):
+        """キャッシュ済みの上位足を取得（ない場合はNone）"""
+        with self._lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+            return cached
+    
+    def _store(self, cache_key, entry):
+        """上位足を保存し、容量を超えた分は最も長く使われていないものから削除"""
+        size = int(entry['bars'].memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            if cache_key in self._cache:
+                self._remove(cache_key)
+            if size > self.max_bytes:
+                # 容量より大きい上位足は保存しない
+                return
+            self._cache[cache_key] = entry
+            self._sizes[cache_key] = size
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._cache)))
+    
+    def _remove(self, cache_key):
+        """キャッシュから1件削除（ロックを取得して呼び出す）"""
+        del self._cache[cache_key]
+        self.current_bytes -= self._sizes.pop(cache_key)
+    
+    def _is_extension(self, df, cached):
+        """データが集計済みの下位足の後ろに追加されただけか"""
+        base_rows = cached['base_rows']
+        if base_rows == 0 or len(df) < base_rows:
+            return False
+        return df['datetime'].iloc[base_rows - 1] == cached['last_base_datetime']
+    
+    def _merge(self, cached, new_base_bars, timeframe):
+        """新しい下位足の集計結果を既存の上位足に結合（最後の未確定バーのみ再集計）"""
+        bars = cached['bars']
+        new_bars = self.resample(new_base_bars, timeframe)
+        
+        if not bars.empty and new_bars['datetime'].iloc[0] == bars['datetime'].iloc[-1]:
+            # 最後のバーと同じ区間の場合は始値を維持し、高値・安値・終値を更新
+            last_bar = bars.iloc[-1]
+            first_new = new_bars.iloc[0]
+            new_bars.loc[new_bars.index[0], 'Open'] = last_bar['Open']
+            new_bars.loc[new_bars.index[0], 'High'] = max(last_bar['High'], first_new['High'])
+            new_bars.loc[new_bars.index[0], 'Low'] = min(last_bar['Low'], first_new['Low'])
+            bars = bars.iloc[:-1]
+        
+        return {
+            'bars': pd.concat([bars, new_bars], ignore_index=True),
+            'base_rows': cached['base_rows'] + len(new_base_bars),
+            'last_base_datetime': new_base_bars['datetime'].iloc[-1]
+        }
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from config.settings import INDICATOR_CACHE_MAX_MB
+
+class IndicatorCache:
+    """プロセス全体で共有する指標キャッシュ（データセットの指紋・指標名・パラメータごと、LRUで容量を管理）"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, fingerprint, name, params):
+        """キャッシュ済みの列（列名 -> 読み取り専用配列）を取得（ない場合はNone）"""
+        key = (fingerprint, name, params)
+        with self._lock:
+            columns = self._entries.get(key)
+            if columns is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return columns
+    
+    def put(self, fingerprint, name, params, columns):
+        """列を保存し、容量を超えた分は最も長く使われていないものから削除"""
+        key = (fingerprint, name, params)
+        columns = {column: _read_only(values) for column, values in columns.items()}
+        size = sum(values.nbytes for values in columns.values())
+        if size > self.max_bytes:
+            # 容量より大きい指標は保存しない
+            return columns
+        
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._size_of(self._entries.pop(key))
+            self._entries[key] = columns
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self._size_of(evicted)
+                self.evictions += 1
+        return columns
+    
+    def clear(self):
+        """キャッシュをすべて削除"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def stats(self):
+        """ヒット・ミス回数と使用量"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+    
+    def _size_of(self, columns):
+        """エントリのバイト数"""
+        return sum(values.nbytes for values in columns.values())
+
+def dataset_fingerprint(df, columns=('High', 'Low', 'Close')):
+    """指標計算に使う列の内容から指紋を作成（同じデータなら別セッション・別の読み込みでも一致）"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(df)).encode())
+    for column in columns:
+        digest.update(column.encode())
+        digest.update(np.ascontiguousarray(df[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+def _read_only(values):
+    """共有する配列を書き込み不可にする"""
+    values = np.asarray(values)
+    values.flags.writeable = False
+    return values
+
+_indicator_cache = IndicatorCache(INDICATOR_CACHE_MAX_MB * 1024 * 1024)
+
+def get_indicator_cache():
+    """プロセス全体で共有する指標キャッシュを取得"""
+    return _indicator_cache
@@ -0,0 +1,328 @@
+import re
+
+import numpy as np
+from scipy.signal import lfilter
+
+# 価格の刻み（小数点以下の桁数）として検出を試みる最大桁数
+MAX_PRICE_DECIMALS = 6
+# 刻みの候補を絞り込むために先頭から調べる値の数
+PRICE_SCALE_SAMPLE = 4096
+# 価格データとして読み込む列
+PRICE_COLUMNS = ['High', 'Low', 'Close']
+# 小数の窓合計で累積和を取り直す間隔（バー数、累積和の丸め誤差がデータ全体の長さに比例して増えるのを防ぐ）
+ROLLING_ANCHOR_BARS = 1 << 12
+# RSI・ATRの平滑化方法（'sma': 単純移動平均、'wilder': Wilder平滑化（α=1/期間）、'ema': 指数移動平均（α=2/(期間+1)））
+SMOOTHING_METHODS = ['sma', 'wilder', 'ema']
+
+class Indicator:
+    """登録された指標（入力・パラメータ・出力と計算処理）"""
+    
+    def __init__(self, name, inputs, outputs, compute, params=None):
+        self.name = name
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.compute = compute
+        self.params = dict(params or {})
+    
+    def evaluate(self, values, params=None):
+        """入力の値から出力の値（出力名 -> 配列）を計算"""
+        arguments = {**self.params, **(params or {})}
+        return self.compute(*[values[name] for name in self.inputs], **arguments)
+
+class IndicatorRegistry:
+    """指標の依存関係を管理し、要求された出力に必要な指標のみを1回ずつ計算するクラス"""
+    
+    # 登録されていないMA{期間}・MA{期間}_slopeは要求時に移動平均線・その傾きとして登録
+    MOVING_AVERAGE_PATTERN = re.compile(r'^MA(\d+)$')
+    MOVING_AVERAGE_SLOPE_PATTERN = re.compile(r'^MA(\d+)_slope$')
+    
+    def __init__(self):
+        self._indicators = {}
+        self._producers = {}
+    
+    def register(self, name, inputs, outputs, compute, params=None):
+        """指標を登録（出力名は登録済みの指標・価格列と重複不可）"""
+        if name in self._indicators:
+            raise ValueError(f"指標 {name} は登録済みです")
+        for output in outputs:
+            if output in self._producers or output in PRICE_COLUMNS:
+                raise ValueError(f"出力 {output} は登録済みです")
+        indicator = Indicator(name, inputs, outputs, compute, params)
+        self._indicators[name] = indicator
+        for output in outputs:
+            self._producers[output] = indicator
+        return indicator
+    
+    def get_producer(self, output):
+        """出力を計算する指標を取得（価格列の場合はNone）"""
+        if output in PRICE_COLUMNS:
+            return None
+        if output not in self._producers:
+            match = self.MOVING_AVERAGE_PATTERN.match(output)
+            slope_match = self.MOVING_AVERAGE_SLOPE_PATTERN.match(output)
+            if match is not None:
+                register_moving_average(self, int(match.group(1)))
+            elif slope_match is not None:
+                register_moving_average_slope(self, int(slope_match.group(1)))
+            else:
+                raise KeyError(f"出力 {output} を計算する指標が登録されていません")
+        return self._producers[output]
+    
+    def produces(self, output):
+        """出力を計算できるか（価格列は含まない）"""
+        return (
+            output in self._producers or
+            self.MOVING_AVERAGE_PATTERN.match(output) is not None or
+            self.MOVING_AVERAGE_SLOPE_PATTERN.match(output) is not None
+        )
+    
+    def resolve(self, outputs, available=()):
+        """要求された出力に必要な指標を依存順（入力が先）に並べて返す（各指標は1回のみ、availableの列は計算しない）"""
+        available = set(available)
+        order = []
+        visiting = set()
+        visited = set()
+        
+        def visit(indicator):
+            if indicator.name in visited:
+                return
+            if indicator.name in visiting:
+                raise ValueError(f"指標 {indicator.name} の依存関係が循環しています")
+            visiting.add(indicator.name)
+            for name in indicator.inputs:
+                producer = None if name in available else self.get_producer(name)
+                if producer is not None:
+                    visit(producer)
+            visiting.discard(indicator.name)
+            visited.add(indicator.name)
+            order.append(indicator)
+        
+        for output in outputs:
+            producer = None if output in available else self.get_producer(output)
+            if producer is not None:
+                visit(producer)
+        return order
+    
+    def evaluate(self, inputs, outputs, params=None):
+        """価格などの入力配列（列名 -> 配列）から要求された出力を計算（入力に含まれる列は計算せずに使用、中間値は最後に使われた時点で解放）"""
+        params = params or {}
+        plan = self.resolve(outputs, inputs)
+        
+        # 中間値を最後に使う指標の位置
+        last_use = {}
+        for position, indicator in enumerate(plan):
+            for name in indicator.inputs:
+                last_use[name] = position
+        requested = set(outputs)
+        
+        values = dict(inputs)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for position, indicator in enumerate(plan):
+                values.update(indicator.evaluate(values, params.get(indicator.name)))
+                for name in indicator.inputs:
+                    if last_use[name] == position and name not in requested and name not in inputs:
+                        del values[name]
+        return {output: values[output] for output in outputs}
+
+def _detect_price_scale(values):
+    """先頭の値から価格の刻み10^-kを推定し、10^kを返す（推定できない場合はNone）"""
+    sample = values[:PRICE_SCALE_SAMPLE]
+    sample = sample[~np.isnan(sample)]
+    for decimals in range(MAX_PRICE_DECIMALS + 1):
+        scaled = sample * 10 ** decimals
+        if np.all(np.abs(scaled - np.rint(scaled)) < 1e-6):
+            return 10 ** decimals
+    return None
+
+def _to_units(values):
+    """累積和用の配列に変換（一定の刻みであれば整数にして丸め誤差をなくす、欠損値は0）"""
+    valid = ~np.isnan(values)
+    has_missing = not valid.all()
+    filled = np.where(valid, values, 0.0) if has_missing else values
+    scale = _detect_price_scale(values)
+    if scale is not None and np.abs(filled).max(initial=0.0) * scale < 2 ** 52:
+        scaled = filled * scale
+        units = np.rint(scaled)
+        # 全体が刻みに乗っている場合のみ整数を使用
+        if np.abs(scaled - units).max(initial=0.0) < 1e-6:
+            return units.astype(np.int64), float(scale), (valid if has_missing else None)
+    return filled, 1.0, (valid if has_missing else None)
+
+def _cumsum(values):
+    """先頭に0を付けた累積和（boolは個数を数える）"""
+    cumsum = np.zeros(len(values) + 1, dtype=np.int64 if values.dtype == bool else values.dtype)
+    np.cumsum(values, out=cumsum[1:])
+    return cumsum
+
+def _window_sum(cumsum, window, out):
+    """累積和の差分で窓内の合計を計算（期間に満たない先頭は存在する分の合計）"""
+    n = len(cumsum) - 1
+    head = min(window, n)
+    out[:head] = cumsum[1:head + 1]
+    # バー数が期間以下の場合は差分を取る行がない（先頭の欠損は呼び出し元で設定）
+    if n > window:
+        np.subtract(cumsum[window + 1:], cumsum[1:n - window + 1], out=out[window:])
+    return out
+
+def _rolling_sum(values, window, out):
+    """窓内の合計（整数は累積和の差分で誤差なし、小数は一定間隔で累積和を取り直し誤差を区間内に抑える）"""
+    if values.dtype.kind in 'biu':
+        return _window_sum(_cumsum(values), window, out)
+    n = len(values)
+    for start in range(0, n, ROLLING_ANCHOR_BARS):
+        stop = min(start + ROLLING_ANCHOR_BARS, n)
+        # 区間の先頭の窓が収まる位置から累積和を取り直す
+        anchor = max(0, start - window + 1)
+        local = _cumsum(values[anchor:stop])
+        out[start:stop] = _window_sum(local, window, np.empty(stop - anchor, dtype=local.dtype))[start - anchor:]
+    return out
+
+def _close_units(close):
+    """終値を刻み単位に変換（価格が一定の刻みであれば整数で合計し、同じ窓の合計を完全に一致させる）"""
+    close_units, close_scale, close_valid = _to_units(close)
+    return {'close_units': close_units, 'close_scale': close_scale, 'close_valid': close_valid}
+
+def _close_cumsum(close_units, close_valid):
+    """終値と欠損値の個数の累積和（全期間の移動平均線で共有、終値が小数の場合は区間ごとに取り直すためNone）"""
+    return {
+        'close_cumsum': _cumsum(close_units) if close_units.dtype.kind == 'i' else None,
+        'close_missing_cumsum': None if close_valid is None else _cumsum(~close_valid)
+    }
+
+def _moving_average(close_units, close_cumsum, close_missing_cumsum, close_scale, period, output):
+    """移動平均線（窓内に欠損値を含む場合は欠損）"""
+    n = len(close_units)
+    if close_cumsum is not None:
+        window_sum = _window_sum(close_cumsum, period, np.empty(n, dtype=close_cumsum.dtype))
+    else:
+        window_sum = _rolling_sum(close_units, period, np.empty(n))
+    ma = np.empty(n)
+    np.divide(window_sum, period * close_scale, out=ma)
+    ma[:period - 1] = np.nan
+    if close_missing_cumsum is not None:
+        ma[_window_sum(close_missing_cumsum, period, np.empty(n, dtype=np.int64)) > 0] = np.nan
+    return {output: ma}
+
+def _moving_average_slope(ma, output):
+    """移動平均線の前バーとの差（先頭は欠損）"""
+    slope = np.empty(len(ma))
+    slope[:1] = np.nan
+    np.subtract(ma[1:], ma[:-1], out=slope[1:])
+    return {output: slope}
+
+def _close_diff(close_units, close_valid):
+    """終値の前バーとの差（前の終値がない行は0）"""
+    delta = np.zeros(len(close_units), dtype=close_units.dtype)
+    if close_valid is None:
+        np.subtract(close_units[1:], close_units[:-1], out=delta[1:])
+    else:
+        np.subtract(close_units[1:], close_units[:-1], out=delta[1:], where=close_valid[1:] & close_valid[:-1])
+    return {'close_diff': delta}
+
+def _recursive_smooth(values, period, smoothing, min_periods=None):
+    """Wilder平滑化・指数移動平均（先頭period本の単純平均を初期値とし、以降は線形フィルタで再帰計算）"""
+    if smoothing not in SMOOTHING_METHODS[1:]:
+        raise ValueError(f"平滑化方法が不正です: {smoothing}")
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    smoothed = np.full(n, np.nan)
+    if min_periods is not None:
+        # 期間に満たない先頭は存在する分の単純平均（単純移動平均のmin_periodsと同じ扱い）
+        head = min(period, n)
+        smoothed[min_periods - 1:head] = (np.cumsum(values[:head]) / np.arange(1, head + 1))[min_periods - 1:]
+    if n < period:
+        return smoothed
+    
+    # y[t] = α·x[t] + (1-α)·y[t-1] をscipyの線形フィルタで計算（1バーずつのループを使わない）
+    alpha = 1.0 / period if smoothing == 'wilder' else 2.0 / (period + 1)
+    seed = values[:period].mean()
+    smoothed[period - 1] = seed
+    if n > period:
+        smoothed[period:], _ = lfilter([alpha], [1.0, alpha - 1.0], values[period:], zi=[(1.0 - alpha) * seed])
+    return smoothed
+
+def _rsi(close_diff, period, smoothing='sma'):
+    """RSI（値上がり幅・値下がり幅の平均の比、平均はsmoothingで指定）"""
+    n = len(close_diff)
+    if smoothing == 'sma':
+        gain_sum = _rolling_sum(np.maximum(close_diff, 0), period, np.empty(n, dtype=close_diff.dtype))
+        loss_sum = _rolling_sum(np.maximum(-close_diff, 0), period, np.empty(n, dtype=close_diff.dtype))
+    else:
+        gain_sum = _recursive_smooth(np.maximum(close_diff, 0), period, smoothing)
+        loss_sum = _recursive_smooth(np.maximum(-close_diff, 0), period, smoothing)
+    rsi = np.empty(n)
+    np.divide(gain_sum, loss_sum, out=rsi)
+    rsi += 1.0
+    np.divide(100.0, rsi, out=rsi)
+    np.subtract(100.0, rsi, out=rsi)
+    rsi[:period - 1] = np.nan
+    return {'RSI': rsi}
+
+def _true_range(High, Low, Close):
+    """真の値幅（高値-安値と、前の終値からの高値・安値の幅の最大）"""
+    previous_close = np.empty(len(Close))
+    previous_close[:1] = np.nan
+    previous_close[1:] = Close[:-1]
+    true_range = High - Low
+    np.fmax(true_range, np.abs(High - previous_close), out=true_range)
+    np.fmax(true_range, np.abs(Low - previous_close), out=true_range)
+    return {'true_range': true_range}
+
+def _atr(true_range, period, smoothing='sma'):
+    """ATR（真の値幅の移動平均、期間に満たない先頭は存在する分のみで平均）"""
+    n = len(true_range)
+    if smoothing != 'sma':
+        return {'ATR': _recursive_smooth(true_range, period, smoothing, min_periods=1)}
+    range_units, range_scale, range_valid = _to_units(true_range)
+    range_sum = _rolling_sum(range_units, period, np.empty(n, dtype=range_units.dtype))
+    if range_valid is None:
+        range_counts = np.minimum(np.arange(1, n + 1), period)
+    else:
+        range_counts = _window_sum(_cumsum(range_valid), period, np.empty(n, dtype=np.int64))
+    atr = np.full(n, np.nan)
+    np.divide(range_sum, range_counts * range_scale, out=atr, where=range_counts > 0)
+    return {'ATR': atr}
+
+def _cross_signals(MA25, MA75):
+    """ゴールデンクロス・デッドクロス（先頭行は前の行と異なるものとして扱う）"""
+    above = MA25 > MA75
+    changed = np.empty(len(above), dtype=bool)
+    changed[:1] = True
+    np.not_equal(above[1:], above[:-1], out=changed[1:])
+    return {
+        'MA25_above_MA75': above,
+        'Golden_Cross_25_75': changed & above,
+        'Dead_Cross_25_75': changed & ~above
+    }
+
+def register_moving_average(registry, period):
+    """期間ごとの移動平均線MA{期間}を登録"""
+    output = f'MA{period}'
+    return registry.register(
+        output, ['close_units', 'close_cumsum', 'close_missing_cumsum', 'close_scale'], [output], _moving_average,
+        {'period': period, 'output': output}
+    )
+
+def register_moving_average_slope(registry, period):
+    """期間ごとの移動平均線の傾きMA{期間}_slopeを登録"""
+    output = f'MA{period}_slope'
+    return registry.register(output, [f'MA{period}'], [output], _moving_average_slope, {'output': output})
+
+def register_default_indicators(registry):
+    """移動平均線・RSI・ATR・クロスシグナルと共有する中間値を登録"""
+    registry.register('close_units', ['Close'], ['close_units', 'close_scale', 'close_valid'], _close_units)
+    registry.register('close_cumsum', ['close_units', 'close_valid'], ['close_cumsum', 'close_missing_cumsum'], _close_cumsum)
+    registry.register('close_diff', ['close_units', 'close_valid'], ['close_diff'], _close_diff)
+    registry.register('true_range', ['High', 'Low', 'Close'], ['true_range'], _true_range)
+    for period in [25, 75, 200]:
+        register_moving_average(registry, period)
+    registry.register('RSI', ['close_diff'], ['RSI'], _rsi, {'period': 14, 'smoothing': 'sma'})
+    registry.register('ATR', ['true_range'], ['ATR'], _atr, {'period': 14, 'smoothing': 'sma'})
+    registry.register('cross_signals', ['MA25', 'MA75'], ['MA25_above_MA75', 'Golden_Cross_25_75', 'Dead_Cross_25_75'], _cross_signals)
+    return registry
+
+_indicator_registry = register_default_indicators(IndicatorRegistry())
+
+def get_indicator_registry():
+    """プロセス全体で共有する指標レジストリを取得"""
+    return _indicator_registry
@@ -0,0 +1,242 @@
+import math
+
+from config.settings import INDICATOR_SMOOTHING, MA_SLOPE_TOLERANCE
+from indicator.indicator_registry import SMOOTHING_METHODS, _detect_price_scale
+
+# 短期・中期・長期の移動平均線の列名（バッチ計算の戦略と同じく、期間によらずMA25・MA75・MA200として扱う）
+MOVING_AVERAGE_ROLES = ['MA25', 'MA75', 'MA200']
+
+class RollingWindow:
+    """固定長のリングバッファと窓内の合計（整数なら誤差なし、小数なら一巡ごとに合計を取り直す）"""
+    
+    def __init__(self, period):
+        self.period = period
+        self.values = [0] * period
+        self.position = 0
+        self.count = 0
+        self.total = 0
+    
+    def push(self, value):
+        """値を追加し、窓から外れた値を合計から除く"""
+        removed = self.values[self.position]
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.period
+        self.count = min(self.count + 1, self.period)
+        if isinstance(value, float) and self.position == 0:
+            # 小数の加減算で累積する誤差を一巡ごとに解消
+            self.total = math.fsum(self.values)
+        else:
+            self.total += value - removed
+        return self.total
+    
+    @property
+    def is_full(self):
+        """窓が埋まっているか"""
+        return self.count == self.period
+
+class StreamingMovingAverage:
+    """単純移動平均（1バーあたりO(1)で更新）"""
+    
+    def __init__(self, period, price_scale=None):
+        self.window = RollingWindow(period)
+        self.unit = 1.0 if price_scale is None else float(price_scale)
+        self.value = math.nan
+    
+    def update(self, units):
+        """価格（整数化済み）を追加して移動平均を更新"""
+        total = self.window.push(units)
+        self.value = total / (self.window.period * self.unit) if self.window.is_full else math.nan
+        return self.value
+
+class StreamingSmoother:
+    """RSI・ATRの平均（'sma'は窓の合計、'wilder'・'ema'は先頭period本の単純平均を初期値として再帰計算、1バーあたりO(1)で更新）"""
+    
+    def __init__(self, period, smoothing='sma'):
+        if smoothing not in SMOOTHING_METHODS:
+            raise ValueError(f"平滑化方法が不正です: {smoothing}")
+        self.window = RollingWindow(period)
+        self.smoothing = smoothing
+        self.alpha = 1.0 / period if smoothing == 'wilder' else 2.0 / (period + 1)
+        self.average = None
+    
+    def push(self, value):
+        """値を追加し、窓の合計（単純移動平均、および初期値が決まるまで）または再帰計算した平均を返す"""
+        if self.average is not None:
+            # 指標レジストリと同じく y[t] = α·x[t] + (1-α)·y[t-1]
+            self.average = self.alpha * value + (1.0 - self.alpha) * self.average
+            return self.average
+        total = self.window.push(value)
+        if self.smoothing != 'sma' and self.window.is_full:
+            self.average = total / self.window.period
+            return self.average
+        return total
+    
+    @property
+    def count(self):
+        """push()の値を平均にするための除数（合計の場合は窓内の本数、平均の場合は1）"""
+        return self.window.count if self.average is None else 1
+    
+    @property
+    def is_full(self):
+        """期間分の値がそろったか"""
+        return self.window.is_full
+
+class StreamingRSI:
+    """RSI（値上がり幅・値下がり幅の平均の比、平均はsmoothingで指定、1バーあたりO(1)で更新）"""
+    
+    def __init__(self, period=14, smoothing='sma'):
+        self.gains = StreamingSmoother(period, smoothing)
+        self.losses = StreamingSmoother(period, smoothing)
+        self.previous = None
+        self.value = math.nan
+    
+    def update(self, units):
+        """終値（整数化済み）を追加してRSIを更新"""
+        delta = 0 if self.previous is None else units - self.previous
+        self.previous = units
+        gain_total = self.gains.push(max(delta, 0))
+        loss_total = self.losses.push(max(-delta, 0))
+        if not self.gains.is_full:
+            self.value = math.nan
+        elif loss_total == 0:
+            # 値下がりがなければ100（値上がりもなければ未定義）
+            self.value = math.nan if gain_total == 0 else 100.0
+        else:
+            self.value = 100.0 - 100.0 / (gain_total / loss_total + 1.0)
+        return self.value
+
+class StreamingATR:
+    """ATR（真の値幅の平均、平均はsmoothingで指定、期間に満たない間は存在する分で平均）"""
+    
+    def __init__(self, period=14, price_scale=None, smoothing='sma'):
+        self.window = StreamingSmoother(period, smoothing)
+        # 再帰計算は指標レジストリと同じく整数化せずに価格のまま平均
+        self.price_scale = price_scale if smoothing == 'sma' else None
+        self.unit = 1.0 if self.price_scale is None else float(self.price_scale)
+        self.previous_close = None
+        self.value = math.nan
+    
+    def update(self, high, low, close):
+        """高値・安値・終値を追加してATRを更新"""
+        true_range = high - low
+        if self.previous_close is not None:
+            true_range = max(true_range, abs(high - self.previous_close), abs(low - self.previous_close))
+        self.previous_close = close
+        total = self.window.push(_to_units(true_range, self.price_scale))
+        self.value = total / (self.window.count * self.unit)
+        return self.value
+
+class StreamingIndicators:
+    """移動平均線・RSI・ATR・クロス・パーフェクトオーダーの各条件をバーごとに更新するクラス（ma_periodsは短期・中期・長期の順、RSI・ATRはsmoothingで平均）"""
+    
+    def __init__(self, ma_periods=[25, 75, 200], rsi_period=14, atr_period=14, price_scale=None, n_continued=1,
+                 smoothing=INDICATOR_SMOOTHING):
+        if len(ma_periods) != len(MOVING_AVERAGE_ROLES) or not ma_periods[0] < ma_periods[1] < ma_periods[2]:
+            raise ValueError(f"移動平均線の期間は短期 < 中期 < 長期の順に指定してください: {ma_periods}")
+        self.ma_periods = tuple(ma_periods)
+        self.price_scale = price_scale
+        self.moving_averages = {
+            column: StreamingMovingAverage(period, price_scale)
+            for column, period in zip(MOVING_AVERAGE_ROLES, ma_periods)
+        }
+        self.rsi = StreamingRSI(rsi_period, smoothing)
+        self.atr = StreamingATR(atr_period, price_scale, smoothing)
+        # パーフェクトオーダー継続の判定に必要な直近の成立状況（最低3期間）
+        self.min_continued = max(3, int(n_continued))
+        self.perfect_order_history = RollingWindow(self.min_continued + 1)
+        self.bars = 0
+        self.previous = None
+        self.current = {}
+    
+    @classmethod
+    def from_frame(cls, df, ma_periods=[25, 75, 200], rsi_period=14, atr_period=14, n_continued=1, smoothing=INDICATOR_SMOOTHING):
+        """過去データで初期化（価格の刻みを検出し、全バーを順に反映）"""
+        price_scale = None
+        if not df.empty:
+            price_scale = _detect_price_scale(df[['High', 'Low', 'Close']].to_numpy().ravel())
+        indicators = cls(ma_periods, rsi_period, atr_period, price_scale, n_continued, smoothing)
+        for bar in df[['datetime', 'Open', 'High', 'Low', 'Close']].itertuples(index=False):
+            indicators.update(bar._asdict())
+        return indicators
+    
+    def update(self, bar):
+        """新しいバー（datetime・Open・High・Low・Closeを持つ辞書など）を反映し、最新の値を返す"""
+        high, low, close = float(bar['High']), float(bar['Low']), float(bar['Close'])
+        close_units = _to_units(close, self.price_scale)
+        
+        values = {column: bar[column] for column in ['datetime', 'Open'] if column in bar}
+        values.update({'High': high, 'Low': low, 'Close': close})
+        for column, moving_average in self.moving_averages.items():
+            values[column] = moving_average.update(close_units)
+        values['RSI'] = self.rsi.update(close_units)
+        values['ATR'] = self.atr.update(high, low, close)
+        
+        self._update_cross_signals(values)
+        self._update_perfect_order(values)
+        self._update_trading_signals(values)
+        
+        self.bars += 1
+        self.previous = values
+        self.current = values
+        return self.snapshot()
+    
+    def snapshot(self):
+        """最新のバーの指標・条件（バッチ計算と同じ列名、移動平均線は短期・中期・長期をMA25・MA75・MA200の列）"""
+        return dict(self.current)
+    
+    def _update_cross_signals(self, values):
+        """ゴールデンクロス・デッドクロス（最初のバーは前のバーと異なるものとして扱う）"""
+        above = values['MA25'] > values['MA75']
+        changed = self.previous is None or above != self.previous['MA25_above_MA75']
+        values['MA25_above_MA75'] = above
+        values['Golden_Cross_25_75'] = changed and above
+        values['Dead_Cross_25_75'] = changed and not above
+    
+    def _update_perfect_order(self, values):
+        """MAの傾き・パーフェクトオーダー・価格ブレイクアウト"""
+        previous = self.previous
+        for column in MOVING_AVERAGE_ROLES:
+            slope = math.nan if previous is None else values[column] - previous[column]
+            values[f'{column}_slope'] = slope
+            values[f'{column}_slope_positive'] = slope > abs(values[column]) * MA_SLOPE_TOLERANCE
+        
+        same_slope = (
+            values['MA25_slope_positive'] == values['MA75_slope_positive'] and
+            values['MA75_slope_positive'] == values['MA200_slope_positive']
+        )
+        values['bullish_perfect_order'] = values['MA25'] > values['MA75'] > values['MA200'] and same_slope
+        values['bearish_perfect_order'] = values['MA25'] < values['MA75'] < values['MA200'] and same_slope
+        perfect_order = values['bullish_perfect_order'] or values['bearish_perfect_order']
+        changed = previous is None or perfect_order != previous['perfect_order']
+        values['perfect_order'] = perfect_order
+        values['perfect_order_start'] = changed and perfect_order
+        values['perfect_order_end'] = changed and not perfect_order
+        
+        was_below = previous is not None and previous['Close'] <= previous['MA25']
+        was_above = previous is not None and previous['Close'] >= previous['MA25']
+        values['price_breakout_bullish'] = values['Close'] > values['MA25'] and was_below and values['bullish_perfect_order']
+        values['price_breakout_bearish'] = values['Close'] < values['MA25'] and was_above and values['bearish_perfect_order']
+    
+    def _update_trading_signals(self, values):
+        """RSI条件・パーフェクトオーダー継続・エントリー・決済シグナル"""
+        values['rsi_in_range'] = 30 <= values['RSI'] <= 70
+        continued_count = self.perfect_order_history.push(int(values['perfect_order']))
+        values['perfect_order_continued'] = (
+            self.perfect_order_history.is_full and continued_count == self.perfect_order_history.period
+        )
+        values['entry_signal'] = (
+            (values['price_breakout_bullish'] or values['price_breakout_bearish']) and
+            values['rsi_in_range'] and values['perfect_order_continued']
+        )
+        values['exit_signal_bullish'] = values['Dead_Cross_25_75']
+        values['exit_signal_bearish'] = values['Golden_Cross_25_75']
+        values['exit_signal'] = values['exit_signal_bullish'] or values['exit_signal_bearish']
+
+def _to_units(value, price_scale):
+    """価格を刻み単位の整数に変換（刻みが未指定の場合は小数のまま）"""
+    if price_scale is None:
+        return value
+    units = round(value * price_scale)
+    if abs(value * price_scale - units) >= 1e-6:
+        raise ValueError(f"価格が刻み1/{price_scale}に一致しません: {value}")
+    return units
@@ -1,46 +1,166 @@
 import pandas as pd
 import numpy as np
+from indicator.indicator_cache import get_indicator_cache, dataset_fingerprint
+from indicator.indicator_registry import get_indicator_registry, _to_units, _cumsum, _window_sum, _rolling_sum
+from data_processor import get_timeframe_projection
 
-def calculate_moving_averages(df, periods=[25, 75, 200]):
-    """移動平均線を計算"""
-    df = df.copy()
-    
-    for period in periods:
-        df[f'MA{period}'] = df['Close'].rolling(window=period).mean()
-    
-    return df
+# 各指標の計算で読み込む列
+INDICATOR_INPUT_COLUMNS = {
+    'moving_averages': ['Close'],
+    'rsi': ['Close'],
+    'atr': ['High', 'Low', 'Close'],
+    'cross_signals': ['MA25', 'MA75'],
+    'indicators': ['High', 'Low', 'Close'],
+    'higher_timeframe': ['datetime', 'High', 'Low', 'Close']
+}
+
+def calculate_moving_averages(df, periods=[25, 75, 200], inplace=False):
+    """移動平均線を計算（inplace=Trueの場合はコピーせずに列を追加）"""
+    return _add_indicator_columns(df, INDICATOR_INPUT_COLUMNS['moving_averages'], [f'MA{period}' for period in periods], inplace=inplace)
+
+def calculate_rsi(df, period=14, inplace=False, smoothing='sma'):
+    """RSIを計算（smoothingで平均の方法を指定、inplace=Trueの場合はコピーせずに列を追加）"""
+    params = {'RSI': {'period': period, 'smoothing': smoothing}}
+    return _add_indicator_columns(df, INDICATOR_INPUT_COLUMNS['rsi'], ['RSI'], params, inplace)
 
-def calculate_rsi(df, period=14):
-    """RSIを計算"""
-    df = df.copy()
-    delta = df['Close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(window=period, min_periods=period).mean()
-    avg_loss = loss.rolling(window=period, min_periods=period).mean()
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+def calculate_atr(df, period=14, inplace=False, smoothing='sma'):
+    """ATR（Average True Range）を計算（smoothingで平均の方法を指定、inplace=Trueの場合はコピーせずに列を追加）"""
+    params = {'ATR': {'period': period, 'smoothing': smoothing}}
+    return _add_indicator_columns(df, INDICATOR_INPUT_COLUMNS['atr'], ['ATR'], params, inplace)
+
+def calculate_cross_signals(df, inplace=False):
+    """クロスシグナルを計算（既存のMA25・MA75の列を使用、inplace=Trueの場合はコピーせずに列を追加）"""
+    outputs = get_indicator_registry().get_producer('MA25_above_MA75').outputs
+    return _add_indicator_columns(df, INDICATOR_INPUT_COLUMNS['cross_signals'], outputs, inplace=inplace)
+
+def calculate_technical_indicators(df, ma_periods=[25, 75, 200], rsi_period=14, atr_period=14, inplace=False, outputs=None, smoothing='sma'):
+    """移動平均線・RSI・ATR・クロスシグナルをまとめて計算（outputsを指定した場合はその列と必要な中間値のみ計算）"""
+    if outputs is None:
+        outputs = get_indicator_outputs(ma_periods)
+    params = _indicator_params(rsi_period, atr_period, smoothing)
+    return _add_indicator_columns(df, INDICATOR_INPUT_COLUMNS['indicators'], outputs, params, inplace)
+
+def _add_indicator_columns(df, input_columns, outputs, params=None, inplace=False):
+    """指標レジストリで入力列から出力を計算して列を追加（inplace=Trueの場合はコピーせずに列を追加）"""
+    if not inplace:
+        df = df.copy()
+    inputs = {column: df[column].to_numpy(dtype=np.float64) for column in input_columns}
+    for column, values in get_indicator_registry().evaluate(inputs, outputs, params).items():
+        df[column] = values
     return df
 
-def calculate_atr(df, period=14):
-    """ATR（Average True Range）を計算"""
-    df = df.copy()
-    high_low = df['High'] - df['Low']
-    high_close = np.abs(df['High'] - df['Close'].shift(1))
-    low_close = np.abs(df['Low'] - df['Close'].shift(1))
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    df['ATR'] = tr.rolling(window=period, min_periods=1).mean()
+def _indicator_params(rsi_period, atr_period, smoothing):
+    """指標レジストリに渡すRSI・ATRのパラメータ"""
+    return {'RSI': {'period': rsi_period, 'smoothing': smoothing}, 'ATR': {'period': atr_period, 'smoothing': smoothing}}
+
+def get_indicator_outputs(ma_periods=[25, 75, 200]):
+    """指標計算で追加されるすべての列"""
+    return [f'MA{period}' for period in ma_periods] + ['RSI', 'ATR', 'MA25_above_MA75', 'Golden_Cross_25_75', 'Dead_Cross_25_75']
+
+def calculate_moving_average_matrix(df, periods, dtype=np.float64):
+    """複数期間の移動平均線をまとめて計算（整数化できる価格は1つの累積和を共有、行: バー、列: periodsの順の期間）"""
+    close = df['Close'].to_numpy(dtype=np.float64)
+    n = len(close)
+    close_units, close_scale, close_valid = _to_units(close)
+    # 整数の場合は1つの累積和を全期間で共有、小数の場合は区間ごとに累積和を取り直す
+    close_cumsum = _cumsum(close_units) if close_units.dtype.kind == 'i' else None
+    missing_cumsum = None if close_valid is None else _cumsum(~close_valid)
+    
+    # 列ごとに連続したメモリに書き込む
+    matrix = np.empty((n, len(periods)), dtype=dtype, order='F')
+    window_sum = np.empty(n, dtype=close_units.dtype)
+    for column, period in enumerate(periods):
+        if close_cumsum is not None:
+            _window_sum(close_cumsum, period, window_sum)
+        else:
+            _rolling_sum(close_units, period, window_sum)
+        np.divide(window_sum, period * close_scale, out=matrix[:, column], casting='unsafe')
+        matrix[:period - 1, column] = np.nan
+        if missing_cumsum is not None:
+            matrix[_window_sum(missing_cumsum, period, np.empty(n, dtype=np.int64)) > 0, column] = np.nan
+    return matrix
+
+def calculate_indicators_cached(df, ma_periods=[25, 75, 200], rsi_period=14, atr_period=14, inplace=False, outputs=None, smoothing='sma'):
+    """指標をプロセス共有のキャッシュから取得し、キャッシュにない指標のみ計算して列を追加（outputsで必要な列を指定可能）"""
+    if not inplace:
+        df = df.copy()
+    for column, values in get_cached_indicator_arrays(df, ma_periods, rsi_period, atr_period, outputs, smoothing).items():
+        df[column] = values
     return df
 
-def calculate_cross_signals(df):
-    """クロスシグナルを計算"""
-    df = df.copy()
+def get_cached_indicator_arrays(df, ma_periods=[25, 75, 200], rsi_period=14, atr_period=14, outputs=None, smoothing='sma'):
+    """要求された列の指標をプロセス共有のキャッシュの配列（書き込み不可）として取得（キャッシュにない指標のみ計算）"""
+    if outputs is None:
+        outputs = get_indicator_outputs(ma_periods)
+    
+    # 要求された列を計算する指標ごとにキャッシュを参照
+    registry = get_indicator_registry()
+    params = {'RSI': (rsi_period, smoothing), 'ATR': (atr_period, smoothing)}
+    indicators = {}
+    for column in outputs:
+        producer = registry.get_producer(column)
+        indicators.setdefault(producer.name, producer.outputs)
+    cache = get_indicator_cache()
+    fingerprint = dataset_fingerprint(df)
+    cached = {
+        name: cache.get(fingerprint, name, params.get(name, ()))
+        for name in indicators
+    }
+    
+    missing = [name for name, columns in cached.items() if columns is None]
+    if missing:
+        missing_outputs = [column for name in missing for column in indicators[name]]
+        values = registry.evaluate(
+            {column: df[column].to_numpy(dtype=np.float64) for column in INDICATOR_INPUT_COLUMNS['indicators']},
+            missing_outputs, _indicator_params(rsi_period, atr_period, smoothing)
+        )
+        for name in missing:
+            cached[name] = cache.put(
+                fingerprint, name, params.get(name, ()),
+                {column: values[column] for column in indicators[name]}
+            )
     
-    # 移動平均線の位置関係
-    df['MA25_above_MA75'] = df['MA25'] > df['MA75']
+    return {
+        column: values
+        for columns in cached.values()
+        for column, values in columns.items()
+        if column in outputs
+    }
+
+def calculate_higher_timeframe_indicators(df, timeframe, outputs, rsi_period=14, atr_period=14, inplace=False, smoothing='sma'):
+    """上位足で指標を計算し、各バーの時点で確定済みの上位足の値を{列名}_{時間足}の列として追加"""
+    if not inplace:
+        df = df.copy()
+    
+    # 上位足への対応表は同じデータフレーム・時間足のすべての指標で共有
+    projection = get_timeframe_projection(df, timeframe)
+    values = get_indicator_registry().evaluate(
+        {column: projection.bars[column].to_numpy(dtype=np.float64) for column in INDICATOR_INPUT_COLUMNS['indicators']},
+        outputs, _indicator_params(rsi_period, atr_period, smoothing)
+    )
+    for output, output_values in values.items():
+        df[f'{output}_{timeframe}'] = projection.project(output_values)
+    return df
+
+def iter_technical_indicators(chunks, ma_periods=[25, 75, 200], rsi_period=14, atr_period=14, smoothing='sma'):
+    """チャンクごとにテクニカル指標を計算（前チャンク末尾をウォームアップとして引き継ぐ、全期間で計算した結果と一致）"""
+    # Wilder平滑化・指数移動平均は先頭からのすべてのバーに依存し、有限の末尾の引き継ぎでは再現できない
+    if smoothing != 'sma':
+        raise ValueError(f"チャンクごとの指標計算は単純移動平均（'sma'）のみ対応しています: {smoothing}")
     
-    # クロスオーバー検出
-    df['Golden_Cross_25_75'] = (df['MA25_above_MA75'] != df['MA25_above_MA75'].shift(1)) & df['MA25_above_MA75']
-    df['Dead_Cross_25_75'] = (df['MA25_above_MA75'] != df['MA25_above_MA75'].shift(1)) & ~df['MA25_above_MA75']
+    # 移動平均・RSI・ATRの窓がすべて収まる行数を前チャンクから引き継ぐ
+    warmup_rows = max(max(ma_periods), rsi_period, atr_period) + 1
+    tail = None
     
-    return df 
\ No newline at end of file
+    for chunk in chunks:
+        if tail is None:
+            df = chunk
+            n_warmup = 0
+        else:
+            df = pd.concat([tail, chunk], ignore_index=True)
+            n_warmup = len(tail)
+        
+        df = calculate_technical_indicators(df, ma_periods, rsi_period, atr_period, smoothing=smoothing)
+        
+        tail = df[chunk.columns].iloc[-warmup_rows:]
+        yield df.iloc[n_warmup:].reset_index(drop=True)
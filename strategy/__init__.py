@@ -1,22 +1,26 @@
 from strategy.strategy_factory import StrategyFactory
+from strategy.parameter_sweep import ParameterSweep
+from strategy.walk_forward import WalkForward
+from strategy.monte_carlo import MonteCarloResampler
+from indicator import technical_analysis
 
 # ファクトリーインスタンス
 _strategy_factory = StrategyFactory()
 
-def detect_perfect_order(df):
-    """パーフェクトオーダーを検出"""
+def detect_perfect_order(df, inplace=False, higher_timeframe_slopes=None):
+    """パーフェクトオーダーを検出（higher_timeframe_slopesで上位足のMAの傾きを条件に追加）"""
     detector = _strategy_factory.get_perfect_order_detector()
-    return detector.detect_perfect_order(df)
+    return detector.detect_perfect_order(df, inplace, higher_timeframe_slopes)
 
-def analyze_trading_signals(df, n_continued=1):
+def analyze_trading_signals(df, n_continued=1, inplace=False):
     """取引シグナルを分析"""
     analyzer = _strategy_factory.get_signal_analyzer()
-    return analyzer.analyze_trading_signals(df, n_continued)
+    return analyzer.analyze_trading_signals(df, n_continued, inplace)
 
-def calculate_strategy_performance(df, atr_multiple=2):
-    """戦略のパフォーマンスを計算"""
+def calculate_strategy_performance(df, atr_multiple=2, reference=False):
+    """戦略のパフォーマンスを計算（reference=Trueの場合は1行ずつ処理する従来の方法）"""
     calculator = _strategy_factory.get_performance_calculator()
-    return calculator.calculate_strategy_performance(df)
+    return calculator.calculate_strategy_performance(df, reference)
 
 def get_strategy_statistics(trades_df):
     """戦略統計を取得"""
@@ -24,6 +28,17 @@ def get_strategy_statistics(trades_df):
     return calculator.get_strategy_statistics(trades_df)
 
 def calculate_atr(df, period=14):
-    """ATR（Average True Range）を計算"""
-    calculator = _strategy_factory.get_performance_calculator()
-    return calculator.calculate_atr(df, period) 
\ No newline at end of file
+    """ATR（Average True Range）を計算（指標モジュールの計算を使用）"""
+    return technical_analysis.calculate_atr(df, period)
+
+def run_parameter_sweep(df, grid, max_workers=None):
+    """パラメータの組み合わせごとに戦略を並列で評価し、統計の表を取得"""
+    return ParameterSweep(max_workers).run(df, grid)
+
+def run_walk_forward(df, grid, train_months=12, test_months=3, anchored=False, objective='total_profit_loss', max_workers=None):
+    """学習期間で最適化したパラメータを直後の検証期間で評価し、検証期間の取引をつないだ損益曲線を取得"""
+    return WalkForward(train_months, test_months, anchored, objective, max_workers=max_workers).run(df, grid)
+
+def run_monte_carlo(trades_df, paths=10000, method='bootstrap', seed=None):
+    """取引の損益の並びを再標本化し、最終損益・最大ドローダウン・最大連敗数の分布とパーセンタイルを取得"""
+    return MonteCarloResampler(paths, method, seed).run(trades_df)
\ No newline at end of file
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+# 取引の並べ替え方法（'bootstrap': 復元抽出、'shuffle': 順序の入れ替えのみ）
+RESAMPLE_METHODS = ['bootstrap', 'shuffle']
+# 結果に含める分布
+MONTE_CARLO_METRICS = ['final_profit_loss', 'max_drawdown', 'longest_losing_streak']
+# 表示するパーセンタイル
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+# 1経路・1取引あたりに確保するバイト数（bootstrap: int32の位置、shuffle: 並べ替えのキー・比較の一時配列・uint16の位置）
+INDEX_BYTES = {'bootstrap': 4, 'shuffle': 11}
+
+class MonteCarloResampler:
+    """取引の損益の並びを繰り返し再標本化し、最終損益・最大ドローダウン・最大連敗数の分布を求めるクラス"""
+    
+    def __init__(self, paths=10000, method='bootstrap', seed=None, percentiles=DEFAULT_PERCENTILES, max_chunk_mb=64):
+        if method not in RESAMPLE_METHODS:
+            raise ValueError(f"再標本化の方法が不正です: {method}")
+        self.paths = paths
+        self.method = method
+        self.seed = seed
+        self.percentiles = percentiles
+        self.max_chunk_mb = max_chunk_mb
+    
+    def run(self, trades_df):
+        """経路ごとの分布とパーセンタイルの表（行: 指標、列: 平均・パーセンタイル）を作成"""
+        profit_loss = np.asarray(trades_df['profit_loss'], dtype=np.float64) if not trades_df.empty else np.empty(0)
+        distributions = self.simulate(profit_loss)
+        return {
+            'distributions': distributions,
+            'percentiles': self.summarize(distributions)
+        }
+    
+    def simulate(self, profit_loss):
+        """損益の位置を再標本化した経路の行列（取引数 × 経路数）をチャンクごとに作成し、経路ごとの指標を計算"""
+        n = len(profit_loss)
+        if n == 0:
+            raise ValueError("取引がないため再標本化できません")
+        rng = np.random.default_rng(self.seed)
+        distributions = {
+            'final_profit_loss': np.empty(self.paths),
+            'max_drawdown': np.empty(self.paths),
+            'longest_losing_streak': np.empty(self.paths, dtype=np.int64)
+        }
+        
+        chunk_paths = self._chunk_paths(n)
+        for start in range(0, self.paths, chunk_paths):
+            end = min(start + chunk_paths, self.paths)
+            indices = self._resample(rng, n, end - start)
+            final, drawdown, streak = self._path_metrics(profit_loss, indices)
+            distributions['final_profit_loss'][start:end] = final
+            distributions['max_drawdown'][start:end] = drawdown
+            distributions['longest_losing_streak'][start:end] = streak
+        return distributions
+    
+    def summarize(self, distributions):
+        """指標ごとの平均とパーセンタイル"""
+        rows = {}
+        for name in MONTE_CARLO_METRICS:
+            values = distributions[name]
+            row = {'mean': values.mean()}
+            row.update(zip([f'p{p}' for p in self.percentiles], np.percentile(values, self.percentiles)))
+            rows[name] = row
+        return pd.DataFrame.from_dict(rows, orient='index')
+    
+    def _chunk_paths(self, n):
+        """1チャンクの経路数（位置の行列と作成時の一時配列が上限に収まるように設定）"""
+        return max(1, int(self.max_chunk_mb * 1024 * 1024 // (n * INDEX_BYTES[self.method])))
+    
+    def _resample(self, rng, n, paths):
+        """経路ごとの取引の位置の行列（取引数 × 経路数、各列が1経路）を作成"""
+        if self.method == 'bootstrap':
+            return rng.integers(0, n, size=(n, paths), dtype=np.int32)
+        return self._shuffle_indices(rng, n, paths)
+    
+    def _shuffle_indices(self, rng, n, paths):
+        """経路ごとに取引の順序を入れ替えた位置の行列（乱数のキーの下位ビットに位置を入れ、経路ごとに並べ替えて取り出す）"""
+        bits = max(1, (n - 1).bit_length())
+        # 取引数が多くキーの乱数の部分が同じ値になりやすい場合は、位置の配列を経路ごとに入れ替え
+        if n * n > 2 ** (32 - bits):
+            return rng.permuted(np.broadcast_to(np.arange(n, dtype=np.int32)[:, None], (n, paths)), axis=0)
+        
+        # 経路ごとに連続したキーを並べ替える（位置の列を入れ替えるより連続したメモリを扱える）
+        mask = np.uint32((1 << bits) - 1)
+        keys = rng.bit_generator.random_raw((paths * n + 1) // 2).view(np.uint32)[:paths * n].reshape(paths, n)
+        keys &= ~mask
+        keys |= np.arange(n, dtype=np.uint32)
+        keys.sort(axis=1)
+        # 乱数の部分が同じ値のキーは順序が元の並びで決まるため、該当する経路のみ作り直す
+        tied = ((keys[:, 1:] ^ keys[:, :-1]) <= mask).any(axis=1)
+        keys &= mask
+        for path in np.flatnonzero(tied):
+            keys[path] = rng.permutation(n)
+        return keys.T.astype(np.uint16, order='C')
+    
+    def _path_metrics(self, profit_loss, indices):
+        """経路ごとの最終損益・最大ドローダウン（開始時点を含むそれまでの最大損益からの下落幅、円）・最大連敗数"""
+        # 取引の順に全経路をまとめて更新（損益は位置から1取引分ずつ取り出し、経路の行列を作成しない）
+        width = indices.shape[1]
+        equity = np.zeros(width)
+        peak = np.zeros(width)
+        drawdown = np.zeros(width)
+        current = np.empty(width)
+        values = np.empty(width)
+        streak = np.zeros(width, dtype=np.int64)
+        longest = np.zeros(width, dtype=np.int64)
+        for positions in indices:
+            profit_loss.take(positions, out=values)
+            equity += values
+            np.maximum(peak, equity, out=peak)
+            np.subtract(peak, equity, out=current)
+            np.maximum(drawdown, current, out=drawdown)
+            # 負けなら連敗数を1増やし、負け以外なら0に戻す
+            streak += 1
+            streak *= values < 0
+            np.maximum(longest, streak, out=longest)
+        return equity, drawdown, longest
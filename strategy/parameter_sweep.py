@@ -0,0 +1,194 @@
+import contextlib
+import io
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from config.settings import INDICATOR_SMOOTHING
+from indicator.technical_analysis import calculate_indicators_cached, calculate_cross_signals
+from data_processor.shared_arrays import SharedArrays
+from strategy.perfect_order_detector import PerfectOrderDetector
+from strategy.signal_analyzer import SignalAnalyzer
+from strategy.performance_calculator import PerformanceCalculator
+from strategy.statistics_calculator import StatisticsCalculator
+
+# パラメータと初期値（ma_periodsは短期・中期・長期の順で、戦略ではMA25・MA75・MA200の列として扱う）
+DEFAULT_PARAMETERS = {
+    'ma_periods': (25, 75, 200),
+    'rsi_period': 14,
+    'n_continued': 1,
+    'rsi_band': (30, 70),
+    'leverage': 25,
+    'stop_rule': 'ma200'
+}
+# 指標計算・パーフェクトオーダー検出の結果を共有するパラメータ
+INDICATOR_PARAMETERS = ['ma_periods', 'rsi_period']
+# 結果の表に含める統計
+RESULT_STATISTICS = [
+    'total_trades', 'winning_trades', 'losing_trades', 'win_rate', 'total_profit_loss',
+    'avg_profit_loss', 'max_profit', 'max_loss', 'avg_duration', 'total_return_pct'
+]
+# 戦略が読み込む価格列
+PRICE_COLUMNS = ['datetime', 'Open', 'High', 'Low', 'Close']
+# 共有メモリに書き込むRSIの列名（期間ごと）
+RSI_COLUMN_FORMAT = 'RSI_{}'
+
+class ParameterSweep:
+    """パラメータの組み合わせごとに戦略を評価し、統計を1つの表にまとめるクラス（プロセスプールで並列実行）"""
+    
+    def __init__(self, max_workers=None, tasks_per_worker=4, smoothing=INDICATOR_SMOOTHING):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tasks_per_worker = tasks_per_worker
+        # 指標はアプリと同じ平滑化で計算（指標キャッシュのキーにも含まれる）
+        self.smoothing = smoothing
+    
+    def expand_grid(self, grid):
+        """パラメータごとの候補から組み合わせの一覧を作成（指定のないパラメータは初期値）"""
+        unknown = set(grid) - set(DEFAULT_PARAMETERS)
+        if unknown:
+            raise ValueError(f"不明なパラメータです: {sorted(unknown)}")
+        names = list(DEFAULT_PARAMETERS)
+        candidates = [list(grid.get(name, [DEFAULT_PARAMETERS[name]])) for name in names]
+        configs = [dict(zip(names, values)) for values in itertools.product(*candidates)]
+        for config in configs:
+            short, medium, long = config['ma_periods']
+            if not short < medium < long:
+                raise ValueError(f"移動平均線の期間は短期 < 中期 < 長期の順に指定してください: {config['ma_periods']}")
+        return configs
+    
+    def run(self, df, grid):
+        """組み合わせごとの統計の表（1行1組み合わせ）を作成"""
+        configs = self.expand_grid(grid)
+        tasks = self._split_tasks(configs)
+        
+        # 価格と全組み合わせで使う指標を1回だけ計算して共有メモリに書き込み、ワーカーには列の配置のみを渡す
+        # タスクは指標のパラメータ順に割り当てられ、ワーカーが前のパラメータに戻ることはないため検出済みデータは1つのみ保持
+        task_rows = map_with_dataset(self.calculate_dataset(df, configs), _run_task, tasks, self.max_workers, max_frames=1)
+        results = pd.DataFrame([row for rows in task_rows for row in rows])
+        return results.sort_values('config_id', ignore_index=True)
+    
+    def calculate_dataset(self, df, configs):
+        """価格列と、組み合わせで使うすべての期間の移動平均線・RSI・ATRの列を持つデータフレームを作成"""
+        prices = df[PRICE_COLUMNS].reset_index(drop=True)
+        ma_periods = sorted({period for config in configs for period in config['ma_periods']})
+        rsi_periods = sorted({config['rsi_period'] for config in configs})
+        
+        dataset = calculate_indicators_cached(
+            prices, ma_periods=ma_periods, outputs=[f'MA{period}' for period in ma_periods] + ['ATR'],
+            smoothing=self.smoothing
+        )
+        for rsi_period in rsi_periods:
+            rsi = calculate_indicators_cached(prices, rsi_period=rsi_period, outputs=['RSI'], smoothing=self.smoothing)['RSI']
+            dataset[RSI_COLUMN_FORMAT.format(rsi_period)] = rsi
+        return dataset
+    
+    def _split_tasks(self, configs):
+        """指標のパラメータが同じ組み合わせをまとめ、ワーカー数に応じて分割したタスクを作成"""
+        groups = {}
+        for config_id, config in enumerate(configs):
+            groups.setdefault(indicator_key(config), []).append((config_id, config))
+        
+        # 全体でワーカー数 × tasks_per_worker 程度のタスク数になるよう分割
+        target_tasks = self.max_workers * self.tasks_per_worker
+        chunk_size = max(1, -(-len(configs) // target_tasks))
+        tasks = []
+        for group in groups.values():
+            for start in range(0, len(group), chunk_size):
+                tasks.append(group[start:start + chunk_size])
+        return tasks
+
+def indicator_key(config):
+    """指標計算・パーフェクトオーダー検出の結果を共有する組み合わせのキー"""
+    return tuple(config[name] for name in INDICATOR_PARAMETERS)
+
+def map_with_dataset(dataset, fn, tasks, max_workers, max_frames):
+    """データを共有メモリに書き込み、evaluate_config()でそのデータを参照するワーカーでタスクを実行して結果の一覧を返す（max_framesはワーカーごとに保持する検出済みデータの数）"""
+    with SharedArrays.publish(dataset) as shared:
+        # ワーカー数が1またはタスクが1つの場合は同じプロセスで実行
+        if max_workers == 1 or len(tasks) == 1:
+            _attach_worker_dataset(shared.manifest, max_frames)
+            try:
+                return [fn(task) for task in tasks]
+            finally:
+                _detach_worker_dataset()
+        with ProcessPoolExecutor(max_workers, initializer=_attach_worker_dataset, initargs=(shared.manifest, max_frames)) as executor:
+            return list(executor.map(fn, tasks))
+
+# ワーカーごとの共有メモリのデータと、指標のパラメータごとの検出済みデータ（保持する数の上限）
+_worker_dataset = None
+_worker_frames = {}
+_worker_max_frames = 1
+
+def _attach_worker_dataset(manifest, max_frames=1):
+    """ワーカーから共有メモリのデータを参照"""
+    global _worker_dataset, _worker_max_frames
+    _worker_frames.clear()
+    _worker_max_frames = max(1, max_frames)
+    _worker_dataset = SharedArrays.attach(manifest)
+
+def _detach_worker_dataset():
+    """ワーカーの検出済みデータを破棄して共有メモリを閉じる"""
+    global _worker_dataset
+    _worker_frames.clear()
+    _worker_dataset.close()
+    _worker_dataset = None
+
+def _get_detected_frame(ma_periods, rsi_period):
+    """パーフェクトオーダー検出済みのデータ（指標は共有メモリの列をコピーせずに参照し、検出はワーカー内で指標のパラメータごとに1回のみ）"""
+    key = (tuple(ma_periods), rsi_period)
+    frame = _worker_frames.get(key)
+    if frame is None:
+        short, medium, long = ma_periods
+        # 戦略は短期・中期・長期をMA25・MA75・MA200の列として読み込む
+        roles = {
+            f'MA{short}': 'MA25', f'MA{medium}': 'MA75', f'MA{long}': 'MA200',
+            RSI_COLUMN_FORMAT.format(rsi_period): 'RSI', 'ATR': 'ATR'
+        }
+        frame = _worker_dataset.to_frame(PRICE_COLUMNS + list(roles)).rename(columns=roles, copy=False)
+        calculate_cross_signals(frame, inplace=True)
+        PerfectOrderDetector().detect_perfect_order(frame, inplace=True)
+        while len(_worker_frames) >= _worker_max_frames:
+            _worker_frames.pop(next(iter(_worker_frames)))
+        _worker_frames[key] = frame
+    return frame
+
+def evaluate_config(config, start=0, end=None):
+    """組み合わせの取引と統計（map_with_dataset()のタスク内で呼び出す、start・endで評価する行範囲を指定し、シグナルの判定には直前の行も参照）"""
+    frame = _get_detected_frame(config['ma_periods'], config['rsi_period'])
+    end = len(frame) if end is None else end
+    rsi_lower, rsi_upper = config['rsi_band']
+    analyzer = SignalAnalyzer(rsi_lower, rsi_upper)
+    warmup_start = max(0, start - analyzer.get_lookback_bars(config['n_continued']))
+    with contextlib.redirect_stdout(io.StringIO()):
+        signals = analyzer.analyze_trading_signals(frame.iloc[warmup_start:end], config['n_continued'])
+        trades_df = PerformanceCalculator(leverage=config['leverage'], stop_rule=config['stop_rule']).calculate_strategy_performance(signals.iloc[start - warmup_start:])
+    stats = StatisticsCalculator(leverage=config['leverage']).get_strategy_statistics(trades_df)
+    return trades_df, stats
+
+def config_row(config_id, config):
+    """組をそれぞれの列に分けた1行1組み合わせの形式"""
+    short, medium, long = config['ma_periods']
+    rsi_lower, rsi_upper = config['rsi_band']
+    return {
+        'config_id': config_id,
+        'ma_short': short,
+        'ma_medium': medium,
+        'ma_long': long,
+        'rsi_period': config['rsi_period'],
+        'n_continued': config['n_continued'],
+        'rsi_lower': rsi_lower,
+        'rsi_upper': rsi_upper,
+        'leverage': config['leverage'],
+        'stop_rule': config['stop_rule']
+    }
+
+def _run_task(task):
+    """タスク内の組み合わせを評価して統計の行を返す"""
+    rows = []
+    for config_id, config in task:
+        _, stats = evaluate_config(config)
+        row = config_row(config_id, config)
+        row.update({name: stats.get(name, 0) for name in RESULT_STATISTICS})
+        rows.append(row)
+    return rows
@@ -1,18 +1,33 @@
 import pandas as pd
+from config.settings import MA_SLOPE_TOLERANCE
+from indicator.technical_analysis import calculate_higher_timeframe_indicators
+from data_processor.shared_arrays import SharedArrays
 
 class PerfectOrderDetector:
     """パーフェクトオーダー検出クラス"""
     
-    def detect_perfect_order(self, df):
-        """パーフェクトオーダーを検出"""
-        df = df.copy()
+    # 検出で読み込む列
+    INPUT_COLUMNS = ['Close', 'MA25', 'MA75', 'MA200']
+    # 上位足の条件を使う場合に追加で読み込む列
+    HIGHER_TIMEFRAME_INPUT_COLUMNS = ['datetime', 'High', 'Low', 'Close']
+    
+    def detect_perfect_order(self, df, inplace=False, higher_timeframe_slopes=None):
+        """パーフェクトオーダーを検出（higher_timeframe_slopes=[(時間足, 期間), ...]で上位足のMAの傾きがトレンド方向と一致することを条件に追加、共有メモリのビューも可）"""
+        if isinstance(df, SharedArrays):
+            # 共有メモリの列はコピーせずに参照し、検出結果の列のみ追加
+            df = df.to_frame()
+        elif not inplace:
+            df = df.copy()
         
         # MAの傾きを計算
         df = self._calculate_ma_slopes(df)
         
+        # 上位足のMAの傾きを先読みなしで各バーに対応付け
+        higher_timeframe_columns = self._add_higher_timeframe_slopes(df, higher_timeframe_slopes or [])
+        
         # 強気・弱気パーフェクトオーダーを検出
-        df = self._detect_bullish_perfect_order(df)
-        df = self._detect_bearish_perfect_order(df)
+        df = self._detect_bullish_perfect_order(df, higher_timeframe_columns)
+        df = self._detect_bearish_perfect_order(df, higher_timeframe_columns)
         
         # パーフェクトオーダーの開始・終了を検出
         df = self._detect_perfect_order_changes(df)
@@ -28,29 +43,55 @@ class PerfectOrderDetector:
         df['MA75_slope'] = df['MA75'] - df['MA75'].shift(1)
         df['MA200_slope'] = df['MA200'] - df['MA200'].shift(1)
         
-        df['MA25_slope_positive'] = df['MA25_slope'] > 0
-        df['MA75_slope_positive'] = df['MA75_slope'] > 0
-        df['MA200_slope_positive'] = df['MA200_slope'] > 0
+        # 横ばい（丸め誤差の範囲）の傾きは正とみなさない
+        df['MA25_slope_positive'] = df['MA25_slope'] > df['MA25'].abs() * MA_SLOPE_TOLERANCE
+        df['MA75_slope_positive'] = df['MA75_slope'] > df['MA75'].abs() * MA_SLOPE_TOLERANCE
+        df['MA200_slope_positive'] = df['MA200_slope'] > df['MA200'].abs() * MA_SLOPE_TOLERANCE
         
         return df
     
-    def _detect_bullish_perfect_order(self, df):
+    def _add_higher_timeframe_slopes(self, df, higher_timeframe_slopes):
+        """上位足のMAの傾き列（MA{期間}_slope_{時間足}）を追加し、列名のリストを返す"""
+        if not higher_timeframe_slopes:
+            return []
+        
+        # 同じ時間足の指標はまとめて計算（上位足への対応表を共有）
+        periods_by_timeframe = {}
+        for timeframe, period in higher_timeframe_slopes:
+            periods_by_timeframe.setdefault(timeframe, []).append(period)
+        for timeframe, periods in periods_by_timeframe.items():
+            outputs = [f'MA{period}_slope' for period in periods if f'MA{period}_slope_{timeframe}' not in df.columns]
+            if outputs:
+                calculate_higher_timeframe_indicators(df, timeframe, outputs, inplace=True)
+        
+        return [f'MA{period}_slope_{timeframe}' for timeframe, period in higher_timeframe_slopes]
+    
+    def _higher_timeframe_condition(self, df, higher_timeframe_columns, bullish):
+        """上位足のMAの傾きがすべてトレンド方向と一致しているか（条件がない場合はTrue）"""
+        condition = True
+        for column in higher_timeframe_columns:
+            condition = condition & ((df[column] > 0) if bullish else (df[column] < 0))
+        return condition
+    
+    def _detect_bullish_perfect_order(self, df, higher_timeframe_columns=()):
         """強気パーフェクトオーダーを検出"""
         df['bullish_perfect_order'] = (
             (df['MA25'] > df['MA75']) & 
             (df['MA75'] > df['MA200']) &
             (df['MA25_slope_positive'] == df['MA75_slope_positive']) &
-            (df['MA75_slope_positive'] == df['MA200_slope_positive'])
+            (df['MA75_slope_positive'] == df['MA200_slope_positive']) &
+            self._higher_timeframe_condition(df, higher_timeframe_columns, bullish=True)
         )
         return df
     
-    def _detect_bearish_perfect_order(self, df):
+    def _detect_bearish_perfect_order(self, df, higher_timeframe_columns=()):
         """弱気パーフェクトオーダーを検出"""
         df['bearish_perfect_order'] = (
             (df['MA25'] < df['MA75']) & 
             (df['MA75'] < df['MA200']) &
             (df['MA25_slope_positive'] == df['MA75_slope_positive']) &
-            (df['MA75_slope_positive'] == df['MA200_slope_positive'])
+            (df['MA75_slope_positive'] == df['MA200_slope_positive']) &
+            self._higher_timeframe_condition(df, higher_timeframe_columns, bullish=False)
         )
         return df
     
@@ -1,18 +1,169 @@
 import pandas as pd
 import numpy as np
+from data_processor.shared_arrays import SharedArrays, as_frame
 
 class PerformanceCalculator:
     """戦略パフォーマンス計算クラス"""
     
-    def __init__(self):
-        self.initial_capital = 10000
-        self.leverage = 25
+    # 取引シミュレーションで読み込む列
+    INPUT_COLUMNS = [
+        'datetime', 'Close', 'MA25', 'MA75', 'MA200', 'RSI', 'ATR', 'entry_signal',
+        'bullish_perfect_order', 'bearish_perfect_order', 'exit_signal_bullish', 'exit_signal_bearish'
+    ]
+    # ストップロスの方法（'ma200': 終値が200MAを反対方向に抜けたら決済、'none': クロスのみで決済）
+    STOP_RULES = ['ma200', 'none']
+    
+    def __init__(self, initial_capital=10000, leverage=25, stop_rule='ma200'):
+        if stop_rule not in self.STOP_RULES:
+            raise ValueError(f"ストップロスの方法が不正です: {stop_rule}")
+        self.initial_capital = initial_capital
+        self.leverage = leverage
         self.position_size = self.initial_capital * self.leverage
+        self.stop_rule = stop_rule
         self.profit_multiplier = 2.0  # デフォルト値
     
-    def calculate_strategy_performance(self, df):
-        """戦略のパフォーマンスを計算"""
-        df = df.copy()
+    def calculate_strategy_performance(self, df, reference=False):
+        """戦略のパフォーマンスを計算（データフレーム・共有メモリのビューは読み込みのみ、reference=Trueの場合は1行ずつ処理する従来の方法）"""
+        if reference:
+            trades_df = self._simulate_trades_reference(as_frame(df))
+        else:
+            trades_df = self._simulate_trades(df)
+        
+        # デバッグ情報を表示
+        if not trades_df.empty:
+            rsi_out_of_range = trades_df[(trades_df['entry_rsi'] < 30) | (trades_df['entry_rsi'] > 70)]
+            if not rsi_out_of_range.empty:
+                print(f"⚠️ 警告: RSI 30-70範囲外の取引が{len(rsi_out_of_range)}件あります")
+                print(f"RSI範囲外の取引: {rsi_out_of_range['entry_rsi'].tolist()}")
+            else:
+                print(f"✅ RSI 30-70範囲内の取引のみ: {len(trades_df)}件")
+        
+        return trades_df
+    
+    def _simulate_trades(self, df):
+        """配列上で取引をシミュレーション（各エントリーの次の決済位置を事前計算した配列から取得）"""
+        n = len(df)
+        close = self._column_values(df, 'Close', np.float64)
+        ma200 = self._column_values(df, 'MA200', np.float64)
+        bullish = self._column_values(df, 'bullish_perfect_order', bool)
+        bearish = self._column_values(df, 'bearish_perfect_order', bool)
+        exit_signal_bullish = self._column_values(df, 'exit_signal_bullish', bool)
+        exit_signal_bearish = self._column_values(df, 'exit_signal_bearish', bool)
+        
+        # エントリー候補（終値がある行のみ）
+        entry_candidates = np.flatnonzero(self._column_values(df, 'entry_signal', bool) & ~np.isnan(close))
+        
+        # 決済条件（シグナル優先、なければ200MAストップロス）と、各行以降で最初に決済条件を満たす行
+        with np.errstate(invalid='ignore'):
+            bullish_stop = close < ma200
+            bearish_stop = close > ma200
+        if self.stop_rule == 'none':
+            bullish_stop[:] = False
+            bearish_stop[:] = False
+        next_bullish_exit = self._next_true_positions(exit_signal_bullish | bullish_stop)
+        next_bearish_exit = self._next_true_positions(exit_signal_bearish | bearish_stop)
+        
+        entries = []
+        exits = []
+        position = 0
+        while True:
+            # 決済済みの行より後の最初のエントリー候補
+            candidate = entry_candidates.searchsorted(position)
+            if candidate == len(entry_candidates):
+                break
+            entry = entry_candidates[candidate]
+            if bullish[entry]:
+                exit_position = next_bullish_exit[entry + 1] if entry + 1 < n else n
+            elif bearish[entry]:
+                exit_position = next_bearish_exit[entry + 1] if entry + 1 < n else n
+            else:
+                # トレンドが判定できないポジションは決済されない
+                break
+            if exit_position >= n:
+                break
+            entries.append(entry)
+            exits.append(exit_position)
+            position = exit_position + 1
+        
+        if not entries:
+            return pd.DataFrame()
+        return self._create_trade_table(df, np.array(entries), np.array(exits), bullish, exit_signal_bullish, exit_signal_bearish)
+    
+    def _column_values(self, df, column, dtype=None):
+        """列の値を配列で取得（共有メモリのビューの場合はコピーなし）"""
+        return np.asarray(df[column], dtype=dtype)
+    
+    def _datetimes_at(self, df, positions):
+        """指定した行位置の日時（共有メモリのビューの場合は指定した行のみ変換）"""
+        if isinstance(df, SharedArrays):
+            return pd.Series(df.datetimes(positions=positions))
+        return df['datetime'].iloc[positions].reset_index(drop=True)
+    
+    def _next_true_positions(self, condition):
+        """各行以降で条件を満たす最初の行位置（ない場合は行数）"""
+        n = len(condition)
+        positions = np.where(condition, np.arange(n), n)
+        return np.minimum.accumulate(positions[::-1])[::-1]
+    
+    def _create_trade_table(self, df, entries, exits, bullish, exit_signal_bullish, exit_signal_bearish):
+        """エントリー・決済の行位置から取引記録のデータフレームを作成"""
+        entry_bullish = bullish[entries]
+        entry_price = self._column_values(df, 'Close', np.float64)[entries]
+        exit_price = self._column_values(df, 'Close', np.float64)[exits]
+        entry_date = self._datetimes_at(df, entries)
+        exit_date = self._datetimes_at(df, exits)
+        
+        price_change = exit_price - entry_price
+        price_change_pct = ((exit_price - entry_price) / entry_price) * 100
+        direction = np.where(entry_bullish, price_change, -price_change)
+        direction_pct = np.where(entry_bullish, price_change_pct, -price_change_pct)
+        
+        exit_reason = np.where(
+            entry_bullish,
+            np.where(exit_signal_bullish[exits], 'デッドクロス', '200MAストップロス'),
+            np.where(exit_signal_bearish[exits], 'ゴールデンクロス', '200MAストップロス')
+        )
+        
+        def column_at(column, positions):
+            return self._column_values(df, column)[positions] if column in df else None
+        
+        return pd.DataFrame({
+            'entry_date': entry_date,
+            'exit_date': exit_date,
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'price_change': price_change,
+            'price_change_pct': price_change_pct,
+            'profit_loss': direction * (self.position_size / entry_price),
+            'profit_loss_pct': direction_pct * self.leverage,
+            'exit_reason': exit_reason.astype(object),
+            'duration_days': (exit_date - entry_date).dt.days,
+            'position_size': self.position_size,
+            'leverage': self.leverage,
+            'entry_rsi': column_at('RSI', entries),
+            'exit_rsi': column_at('RSI', exits),
+            'entry_atr': column_at('ATR', entries),
+            'entry_ma25_deviation': self._calculate_ma_deviations(entry_price, column_at('MA25', entries)),
+            'entry_ma75_deviation': self._calculate_ma_deviations(entry_price, column_at('MA75', entries)),
+            'entry_trend': np.where(entry_bullish, 'bullish', 'bearish').astype(object)
+        })
+    
+    def _calculate_ma_deviations(self, prices, ma_values):
+        """MA乖離率を配列でまとめて計算（計算できない行は欠損、すべて計算できない場合はNone）"""
+        if ma_values is None:
+            return None
+        ma_values = ma_values.astype(np.float64)
+        valid = ~np.isnan(prices) & ~np.isnan(ma_values) & (ma_values != 0)
+        deviations = np.full(len(prices), np.nan)
+        np.divide(prices - ma_values, ma_values, out=deviations, where=valid)
+        deviations *= 100
+        if not valid.any():
+            # 1行ずつ処理する方法と同じくNoneの列にする
+            return np.full(len(prices), None, dtype=object)
+        return deviations
+    
+    def _simulate_trades_reference(self, df):
+        """1行ずつ取引をシミュレーション（配列版との一致を確認するための従来の方法）"""
         trades = []
         in_position = False
         entry_price = 0
@@ -57,18 +208,7 @@ class PerformanceCalculator:
                     entry_ma25 = None  # リセット
                     entry_ma75 = None  # リセット
         
-        trades_df = pd.DataFrame(trades)
-        
-        # デバッグ情報を表示
-        if not trades_df.empty:
-            rsi_out_of_range = trades_df[(trades_df['entry_rsi'] < 30) | (trades_df['entry_rsi'] > 70)]
-            if not rsi_out_of_range.empty:
-                print(f"⚠️ 警告: RSI 30-70範囲外の取引が{len(rsi_out_of_range)}件あります")
-                print(f"RSI範囲外の取引: {rsi_out_of_range['entry_rsi'].tolist()}")
-            else:
-                print(f"✅ RSI 30-70範囲内の取引のみ: {len(trades_df)}件")
-        
-        return trades_df
+        return pd.DataFrame(trades)
     
     def _handle_entry(self, row):
         """エントリー処理"""
@@ -98,9 +238,9 @@ class PerformanceCalculator:
         elif entry_trend == 'bearish' and row['exit_signal_bearish']:
             exit_reason = 'ゴールデンクロス'
         # 200MAストップロス
-        elif entry_trend == 'bullish' and row['Close'] < row['MA200']:
+        elif self.stop_rule == 'ma200' and entry_trend == 'bullish' and row['Close'] < row['MA200']:
             exit_reason = '200MAストップロス'
-        elif entry_trend == 'bearish' and row['Close'] > row['MA200']:
+        elif self.stop_rule == 'ma200' and entry_trend == 'bearish' and row['Close'] > row['MA200']:
             exit_reason = '200MAストップロス'
         
         if exit_reason:
@@ -153,13 +293,3 @@ class PerformanceCalculator:
         if pd.notnull(price) and pd.notnull(ma_value) and ma_value != 0:
             return ((price - ma_value) / ma_value) * 100
         return None
-    
-    def calculate_atr(self, df, period=14):
-        """ATR（Average True Range）を計算"""
-        df = df.copy()
-        high_low = df['High'] - df['Low']
-        high_close = np.abs(df['High'] - df['Close'].shift(1))
-        low_close = np.abs(df['Low'] - df['Close'].shift(1))
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        df['ATR'] = tr.rolling(window=period, min_periods=1).mean()
-        return df 
\ No newline at end of file
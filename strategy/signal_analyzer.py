@@ -1,41 +1,58 @@
 import pandas as pd
+from data_processor.shared_arrays import SharedArrays
 
 class SignalAnalyzer:
     """取引シグナル分析クラス"""
     
-    def analyze_trading_signals(self, df, n_continued=1):
-        """取引シグナルを分析"""
-        df = df.copy()
-        
-        # RSI条件を追加
-        df = self._add_rsi_condition(df)
-        
-        # パーフェクトオーダー継続条件を追加
-        df = self._add_perfect_order_continuation(df, n_continued)
-        
-        # エントリーシグナルを生成
-        df = self._generate_entry_signals(df)
-        
-        # 決済シグナルを生成
-        df = self._generate_exit_signals(df)
+    # 分析で読み込む列
+    INPUT_COLUMNS = [
+        'RSI', 'perfect_order', 'bullish_perfect_order', 'bearish_perfect_order',
+        'price_breakout_bullish', 'price_breakout_bearish', 'Golden_Cross_25_75', 'Dead_Cross_25_75'
+    ]
+    
+    def __init__(self, rsi_lower=30, rsi_upper=70):
+        self.rsi_lower = rsi_lower
+        self.rsi_upper = rsi_upper
+    
+    def analyze_trading_signals(self, df, n_continued=1, inplace=False):
+        """取引シグナルを分析（inplace=Trueの場合はコピーせずに列を追加、共有メモリのビューも可）"""
+        if isinstance(df, SharedArrays):
+            # 共有メモリの列はコピーせずに参照し、シグナルの列のみ追加
+            df = df.to_frame()
+        elif not inplace:
+            df = df.copy()
         
-        # デバッグ情報を追加
-        self._add_debug_info(df)
+        # RSI条件・継続条件・エントリーシグナル・決済シグナル・デバッグ情報の順に列を追加
+        for _, _, stage in self.get_stages(n_continued):
+            stage(df)
         
         return df
     
+    def get_stages(self, n_continued=1):
+        """分析の段階（段階名, 依存するパラメータ, 列を直接追加する処理）の一覧"""
+        # n_continuedを使うのは継続条件のみで、エントリーシグナル・デバッグ情報は継続条件の列を通じて依存する
+        return [
+            ('rsi_condition', (), self._add_rsi_condition),
+            ('continuation', ('n_continued',), lambda df: self._add_perfect_order_continuation(df, n_continued)),
+            ('entry_signals', ('n_continued',), self._generate_entry_signals),
+            ('exit_signals', (), self._generate_exit_signals),
+            ('debug', ('n_continued',), self._add_debug_info)
+        ]
+    
     def _add_rsi_condition(self, df):
         """RSI条件を追加"""
-        df['rsi_in_range'] = (df['RSI'] >= 30) & (df['RSI'] <= 70)
+        df['rsi_in_range'] = (df['RSI'] >= self.rsi_lower) & (df['RSI'] <= self.rsi_upper)
         return df
     
+    def get_lookback_bars(self, n_continued):
+        """シグナルの判定で参照する直前の行数（最低3期間の継続を要求）"""
+        return max(3, int(n_continued))
+    
     def _add_perfect_order_continuation(self, df, n_continued):
         """パーフェクトオーダー継続条件を追加"""
         cond = df['perfect_order']
-        n_continued = int(n_continued)  # 浮動小数点数を整数に変換
         
-        # 最低3期間の継続を要求
-        min_continued = max(3, n_continued)
+        min_continued = self.get_lookback_bars(n_continued)
         for i in range(1, min_continued+1):
             cond = cond & df['perfect_order'].shift(i)
         df['perfect_order_continued'] = cond
@@ -82,7 +99,7 @@ class SignalAnalyzer:
         print(f"パーフェクトオーダー（合計）: {perfect_order_count}回")
         print(f"パーフェクトオーダー継続: {perfect_order_continued_count}回")
         print(f"価格ブレイクアウト: {price_breakout_count}回")
-        print(f"RSI 30-70範囲内: {rsi_in_range_count}回")
+        print(f"RSI {self.rsi_lower}-{self.rsi_upper}範囲内: {rsi_in_range_count}回")
         print(f"エントリーシグナル: {entry_signal_count}回")
         print(f"==================")
         
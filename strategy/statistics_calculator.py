@@ -3,9 +3,9 @@ import pandas as pd
 class StatisticsCalculator:
     """統計計算クラス"""
     
-    def __init__(self):
-        self.initial_capital = 10000
-        self.leverage = 25
+    def __init__(self, initial_capital=10000, leverage=25):
+        self.initial_capital = initial_capital
+        self.leverage = leverage
     
     def get_strategy_statistics(self, trades_df):
         """戦略統計を取得"""
@@ -0,0 +1,110 @@
+import os
+
+import pandas as pd
+from strategy.parameter_sweep import ParameterSweep, RESULT_STATISTICS, config_row, evaluate_config, indicator_key, map_with_dataset
+
+# 学習期間で最大化できる統計
+OBJECTIVES = ['total_profit_loss', 'win_rate', 'avg_profit_loss', 'total_return_pct']
+
+class WalkForward:
+    """学習期間でパラメータを最適化し、直後の検証期間で評価することを期間をずらしながら繰り返すクラス（期間ごとに並列実行）"""
+    
+    def __init__(self, train_months=12, test_months=3, anchored=False, objective='total_profit_loss',
+                 initial_capital=10000, max_workers=None):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"最適化の対象が不正です: {objective}")
+        self.train_months = train_months
+        self.test_months = test_months
+        self.anchored = anchored
+        self.objective = objective
+        self.initial_capital = initial_capital
+        self.max_workers = max_workers or os.cpu_count() or 1
+    
+    def split_windows(self, df):
+        """学習・検証期間の一覧（行位置の範囲、anchored=Trueの場合は学習期間の開始をデータの先頭に固定）"""
+        dates = df['datetime'].reset_index(drop=True)
+        if dates.empty:
+            return []
+        first = dates.iloc[0].floor('D')
+        last = dates.iloc[-1]
+        
+        windows = []
+        test_start = first + pd.DateOffset(months=self.train_months)
+        while test_start <= last:
+            test_end = test_start + pd.DateOffset(months=self.test_months)
+            train_start = first if self.anchored else test_start - pd.DateOffset(months=self.train_months)
+            start, split, end = dates.searchsorted([train_start, test_start, test_end])
+            if split < end:
+                windows.append({
+                    'window': len(windows),
+                    'train_start': int(start),
+                    'train_end': int(split),
+                    'test_start': int(split),
+                    'test_end': int(end)
+                })
+            test_start = test_end
+        return windows
+    
+    def run(self, df, grid):
+        """期間ごとの最適なパラメータと検証結果、検証期間の取引をつないだ損益曲線を作成"""
+        configs = list(enumerate(ParameterSweep().expand_grid(grid)))
+        prices = df.reset_index(drop=True)
+        windows = self.split_windows(prices)
+        if not windows:
+            raise ValueError("学習期間と検証期間に分割できるデータがありません")
+        tasks = [(window, configs, self.objective) for window in windows]
+        
+        # 指標（MA200のウォームアップを含む）は全期間で1回だけ計算し、隣り合う期間で共有
+        dataset = ParameterSweep().calculate_dataset(prices, [config for _, config in configs])
+        # 各期間ですべての組み合わせを評価するため、ワーカーは指標のパラメータの種類の数だけ検出済みデータを保持
+        max_frames = len({indicator_key(config) for _, config in configs})
+        results = map_with_dataset(dataset, _run_window, tasks, self.max_workers, max_frames)
+        
+        dates = prices['datetime']
+        rows = []
+        for window, (result, _) in zip(windows, results):
+            row = {
+                'window': window['window'],
+                'train_start': dates.iloc[window['train_start']],
+                'test_start': dates.iloc[window['test_start']],
+                'test_end': dates.iloc[window['test_end'] - 1]
+            }
+            row.update(result)
+            rows.append(row)
+        frames = [trades for _, trades in results if not trades.empty]
+        trades_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return {
+            'windows': pd.DataFrame(rows),
+            'trades': trades_df,
+            'equity': self._equity_curve(trades_df, prices)
+        }
+    
+    def _equity_curve(self, trades_df, df):
+        """検証期間の取引をつないだ損益曲線（決済日時ごとの資産）"""
+        if trades_df.empty:
+            return pd.Series([float(self.initial_capital)], index=[df['datetime'].iloc[0]], name='equity')
+        equity = self.initial_capital + trades_df['profit_loss'].cumsum()
+        return pd.Series(equity.to_numpy(), index=pd.Index(trades_df['exit_date'], name='datetime'), name='equity')
+
+def _run_window(task):
+    """学習期間で全組み合わせを評価して最適なものを選び、検証期間の統計と取引を返す"""
+    window, configs, objective = task
+    best_id = None
+    best_config = None
+    best_score = None
+    for config_id, config in configs:
+        _, stats = evaluate_config(config, window['train_start'], window['train_end'])
+        score = stats.get(objective, 0)
+        # 同じ値の場合は先の組み合わせを優先
+        if best_score is None or score > best_score:
+            best_id, best_config, best_score = config_id, config, score
+    
+    trades_df, stats = evaluate_config(best_config, window['test_start'], window['test_end'])
+    row = config_row(best_id, best_config)
+    row[f'train_{objective}'] = best_score
+    row.update({f'test_{name}': stats.get(name, 0) for name in RESULT_STATISTICS})
+    
+    if not trades_df.empty:
+        trades_df.insert(0, 'window', window['window'])
+        trades_df.insert(1, 'config_id', best_id)
+    return row, trades_df
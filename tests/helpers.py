@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+def random_ohlc(bars, seed=0, decimals=3, freq='15min'):
+    """ランダムウォークのOHLC（0.001刻み、decimals=Noneの場合は丸めない、ベンチマークでも使用）"""
+    rng = np.random.default_rng(seed)
+    
+    def rounded(values):
+        return values if decimals is None else np.round(values, decimals)
+    
+    close = rounded(100 + np.cumsum(rng.normal(0, 0.02, bars)))
+    spread = rounded(np.abs(rng.normal(0, 0.01, bars)))
+    return pd.DataFrame({
+        'datetime': pd.date_range('2024-01-01', periods=bars, freq=freq, tz='UTC+09:00'),
+        'Open': close,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close
+    })
+
+def rolling_indicators(df, ma_periods=[25, 75, 200], rsi_period=14, atr_period=14, smoothing='sma'):
+    """pandasのrolling()による指標の基準値（指標レジストリとの比較・ベンチマーク用）"""
+    from indicator.indicator_registry import _recursive_smooth
+    df = df.copy()
+    for period in ma_periods:
+        df[f'MA{period}'] = df['Close'].rolling(window=period).mean()
+    
+    delta = df['Close'].diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    if smoothing == 'sma':
+        avg_gain = gain.rolling(window=rsi_period, min_periods=rsi_period).mean()
+        avg_loss = loss.rolling(window=rsi_period, min_periods=rsi_period).mean()
+    else:
+        avg_gain = pd.Series(_recursive_smooth(gain.to_numpy(), rsi_period, smoothing), index=df.index)
+        avg_loss = pd.Series(_recursive_smooth(loss.to_numpy(), rsi_period, smoothing), index=df.index)
+    df['RSI'] = 100 - (100 / (1 + avg_gain / avg_loss))
+    
+    high_low = df['High'] - df['Low']
+    high_close = np.abs(df['High'] - df['Close'].shift(1))
+    low_close = np.abs(df['Low'] - df['Close'].shift(1))
+    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    if smoothing == 'sma':
+        df['ATR'] = true_range.rolling(window=atr_period, min_periods=1).mean()
+    else:
+        df['ATR'] = _recursive_smooth(true_range.to_numpy(), atr_period, smoothing, min_periods=1)
+    
+    if 'MA25' in df.columns and 'MA75' in df.columns:
+        df['MA25_above_MA75'] = df['MA25'] > df['MA75']
+        changed = df['MA25_above_MA75'] != df['MA25_above_MA75'].shift(1)
+        df['Golden_Cross_25_75'] = changed & df['MA25_above_MA75']
+        df['Dead_Cross_25_75'] = changed & ~df['MA25_above_MA75']
+    return df
+
+def write_dukascopy_csv(df, path):
+    """datetime・OHLC列をDukascopy形式（日時はGMTオフセット付き、Volume列あり）のCSVに書き出し"""
+    local = df['datetime'].dt.strftime('%d.%m.%Y %H:%M:%S.000 GMT%z')
+    pd.DataFrame({
+        'Local time': local,
+        'Open': df['Open'],
+        'High': df['High'],
+        'Low': df['Low'],
+        'Close': df['Close'],
+        'Volume': 1.0
+    }).to_csv(path, index=False)
+    return path
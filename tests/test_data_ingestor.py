@@ -0,0 +1,54 @@
+import pandas as pd
+from data_processor.column_store import ColumnStore
+from data_processor.data_ingestor import DataIngestor
+from data_processor.fx_data_processor import FXDataProcessor
+from tests.helpers import random_ohlc, write_dukascopy_csv
+
+BARS = 96 * 10
+
+def make_ingestor(tmp_path):
+    """一時ディレクトリにキャッシュを作成する取り込み処理"""
+    return DataIngestor(FXDataProcessor(cache_dir=str(tmp_path / 'cache')))
+
+def test_overlapping_sources_are_deduplicated(tmp_path):
+    """期間が重なるソースのバーは1回のみ取り込み、ストアは時刻順になる"""
+    df = random_ohlc(BARS)
+    first = write_dukascopy_csv(df.iloc[:600], tmp_path / 'first.csv')
+    second = write_dukascopy_csv(df.iloc[500:], tmp_path / 'second.csv')
+    ingestor = make_ingestor(tmp_path)
+    store_dir = str(tmp_path / 'store')
+    
+    result = ingestor.ingest(store_dir, [second, first])
+    stored = ColumnStore(store_dir).to_frame()
+    expected = ingestor.data_processor.load_fx_data(write_dukascopy_csv(df, tmp_path / 'all.csv'), use_cache=False)
+    loaded = sum(len(ingestor.data_processor.load_fx_data(path)) for path in [first, second])
+    assert result['duplicates'] == loaded - len(expected)
+    assert result['appended'] == len(expected)
+    pd.testing.assert_frame_equal(stored, expected)
+
+def test_rewritten_source_appends_only_new_bars(tmp_path):
+    """延長して書き直したソースは最終時刻より新しいバーのみ追記し、変更のないソースは読み込まない"""
+    df = random_ohlc(BARS)
+    first = write_dukascopy_csv(df.iloc[:300], tmp_path / 'first.csv')
+    second = write_dukascopy_csv(df.iloc[300:600], tmp_path / 'second.csv')
+    ingestor = make_ingestor(tmp_path)
+    store_dir = str(tmp_path / 'store')
+    ingestor.ingest(store_dir, [first, second])
+    rows_before = ColumnStore(store_dir).rows
+    
+    write_dukascopy_csv(df.iloc[300:], second)
+    result = ingestor.ingest(store_dir, [first, second])
+    extended = ingestor.data_processor.load_fx_data(second)
+    assert result['skipped'] == [first]
+    assert result['ingested'] == [second]
+    assert result['appended'] == result['rows'] - rows_before
+    assert result['duplicates'] == len(extended) - result['appended']
+    
+    stored = ColumnStore(store_dir).to_frame()
+    expected = ingestor.data_processor.load_fx_data(write_dukascopy_csv(df, tmp_path / 'all.csv'), use_cache=False)
+    pd.testing.assert_frame_equal(stored, expected)
+    
+    # もう一度取り込んでも変更はない
+    result = ingestor.ingest(store_dir, [first, second])
+    assert result['appended'] == 0
+    assert result['skipped'] == [first, second]
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pandas as pd
+from data_processor.data_loader import DataLoader
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures'
+
+def test_each_row_uses_its_own_gmt_offset():
+    """夏時間の切り替え後の行は先頭行ではなく各行のオフセットでUTCに変換される"""
+    loader = DataLoader()
+    df = loader.load_data(FIXTURE_DIR / 'USDJPY_dst_15min.csv')
+    utc = df['datetime'].dt.tz_convert('UTC')
+    assert loader.last_fallback_count == 0
+    assert str(df['datetime'].dt.tz) == 'UTC+01:00'
+    assert utc.iloc[-1] == pd.Timestamp('2024-03-31 02:00', tz='UTC')
+    # 切り替えをまたいでも15分間隔のまま連続する
+    assert (utc.diff().dropna() == pd.Timedelta(minutes=15)).all()
+
+def test_rows_without_offset_fall_back_to_row_parsing():
+    """オフセットのない行や書式の異なる行は行単位の変換で各行のオフセットを適用"""
+    loader = DataLoader()
+    df = pd.DataFrame({
+        'DateTime': ['31.03.2024 01:45:00.000 GMT+0100', '31.03.2024 04:00 GMT+0200', '31.03.2024 04:15:00.000 GMT+02:00'],
+        'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0,
+    })
+    parsed = loader._parse_datetime(df)['DateTime'].dt.tz_convert('UTC')
+    assert loader.last_fallback_count == 1
+    assert list(parsed) == [pd.Timestamp(value, tz='UTC') for value in ['2024-03-31 00:45', '2024-03-31 02:00', '2024-03-31 02:15']]
@@ -0,0 +1,50 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+from data_processor import compact_frame, expand_frame, get_signal_flag
+from data_processor.frame_compactor import SIGNAL_FLAGS, SIGNAL_FLAGS_COLUMN
+from indicator.technical_analysis import calculate_technical_indicators
+from strategy import analyze_trading_signals, detect_perfect_order
+from tests.helpers import random_ohlc
+
+@pytest.fixture(scope='module')
+def processed():
+    """指標・パーフェクトオーダー・シグナル（デバッグ列を含む）まで計算したデータ"""
+    df = detect_perfect_order(calculate_technical_indicators(random_ohlc(5000)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analyze_trading_signals(df, 2)
+
+def test_compact_round_trip_keeps_signal_flags(processed):
+    """ビットマスクから名前で取得した条件・expandで戻した列が元のbool列と一致し、デバッグ列は削除される"""
+    compacted = compact_frame(processed)
+    flags = [name for name in SIGNAL_FLAGS if name in processed.columns]
+    assert set(flags) == set(SIGNAL_FLAGS)
+    assert not any(column in compacted.columns for column in flags)
+    assert any(column.startswith('debug_') for column in processed.columns)
+    assert not any(column.startswith('debug_') for column in compacted.columns)
+    for name in flags:
+        np.testing.assert_array_equal(get_signal_flag(compacted, name).to_numpy(), processed[name].to_numpy(), err_msg=name)
+    
+    expanded = expand_frame(compacted)
+    assert SIGNAL_FLAGS_COLUMN not in expanded.columns
+    for name in flags:
+        assert expanded[name].dtype == bool
+        np.testing.assert_array_equal(expanded[name].to_numpy(), processed[name].to_numpy(), err_msg=name)
+    assert compacted['RSI'].dtype == np.float32
+    np.testing.assert_allclose(compacted['RSI'], processed['RSI'], rtol=1e-6)
+
+def test_compacting_again_keeps_packed_flags(processed):
+    """ビットマスクを持つデータに追加した条件を再度変換しても、既存の条件は引き継がれる"""
+    compacted = compact_frame(processed.drop(columns=['entry_signal']))
+    assert 'entry_signal' not in compacted.attrs[SIGNAL_FLAGS_COLUMN]
+    compacted['entry_signal'] = processed['entry_signal'].to_numpy()
+    recompacted = compact_frame(compacted)
+    for name in ['perfect_order', 'exit_signal', 'entry_signal']:
+        np.testing.assert_array_equal(get_signal_flag(recompacted, name).to_numpy(), processed[name].to_numpy(), err_msg=name)
+
+def test_unknown_flag_raises_key_error(processed):
+    """ビットマスクにも列にもない条件はKeyError"""
+    with pytest.raises(KeyError):
+        get_signal_flag(compact_frame(processed), 'unknown_flag')
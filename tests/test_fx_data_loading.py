@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_processor import get_time_index, compact_frame
+from data_processor.column_store import is_memory_mapped, TIMESTAMP_COLUMN
+from data_processor.fx_data_processor import FXDataProcessor
+from tests.helpers import random_ohlc, write_dukascopy_csv
+
+@pytest.fixture
+def source(tmp_path):
+    """Dukascopy形式のCSV（3日分）とキャッシュを一時ディレクトリに作成する読み込み処理"""
+    file_path = write_dukascopy_csv(random_ohlc(96 * 3), tmp_path / 'USDJPY_2024_15min.csv')
+    return FXDataProcessor(cache_dir=str(tmp_path / 'cache')), str(file_path)
+
+@pytest.mark.parametrize('start, end', [('2024-01-02', '2024-01-02 23:59'), (None, '2024-01-01 12:00'), ('2024-01-03 18:00', None)])
+def test_range_loading_matches_full_frame(source, start, end):
+    """日時範囲の読み込み（メモリマップのビューを参照）が全期間を読み込んで切り出した結果と一致する"""
+    processor, file_path = source
+    df = processor.load_fx_data(file_path, use_cache=False)
+    expected = get_time_index(df).slice(df, start, end).reset_index(drop=True)
+    actual = processor.load_fx_data(file_path, start, end)
+    pd.testing.assert_frame_equal(actual, expected)
+    assert len(actual) == len(processor.load_fx_arrays(file_path, start, end)['Close'])
+
+def test_loaded_frame_references_memory_mapped_columns(source):
+    """読み込んだデータの価格列はストアのビューで、省メモリ形式への変換後も複製されない"""
+    processor, file_path = source
+    df = processor.load_fx_data(file_path, '2024-01-02', '2024-01-02 23:59')
+    for column in ['Open', 'High', 'Low', 'Close']:
+        assert is_memory_mapped(df[column].to_numpy())
+        assert not df[column].to_numpy().flags.writeable
+    compacted = compact_frame(df)
+    assert is_memory_mapped(compacted['Close'].to_numpy())
+    assert compacted['Close'].dtype == np.float64
+
+def test_range_loading_falls_back_to_csv_without_cache(source, monkeypatch):
+    """キャッシュを保存できない場合もCSVを読み込んで範囲を返す"""
+    processor, file_path = source
+    monkeypatch.setattr(processor.data_cache, 'save', lambda file_path, df: False)
+    df = processor.load_fx_data(file_path, '2024-01-02', '2024-01-02 23:59')
+    arrays = processor.load_fx_arrays(file_path, '2024-01-02', '2024-01-02 23:59')
+    assert processor.data_cache.get_store(file_path) is None
+    assert df['datetime'].iloc[0] == pd.Timestamp('2024-01-02 00:00', tz='UTC+09:00')
+    assert df['datetime'].iloc[-1] == pd.Timestamp('2024-01-02 23:45', tz='UTC+09:00')
+    np.testing.assert_array_equal(arrays['Close'], df['Close'].to_numpy())
+    assert len(arrays[TIMESTAMP_COLUMN]) == len(df)
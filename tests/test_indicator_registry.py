@@ -0,0 +1,77 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from indicator.technical_analysis import calculate_technical_indicators, calculate_moving_average_matrix, iter_technical_indicators
+from indicator.technical_analysis import calculate_atr, calculate_cross_signals, calculate_moving_averages, calculate_rsi
+from strategy import analyze_trading_signals, detect_perfect_order
+from tests.helpers import random_ohlc, rolling_indicators
+
+@pytest.mark.parametrize('bars', [1, 50, 150, 199, 200, 201, 250])
+def test_fused_kernel_matches_rolling_for_short_series(bars):
+    """期間より短いデータでも融合カーネルが例外にならず、先頭が欠損のpandasの計算と一致する"""
+    df = random_ohlc(bars)
+    fused = calculate_technical_indicators(df)
+    expected = rolling_indicators(df)
+    for column in ['MA25', 'MA75', 'MA200', 'RSI', 'ATR']:
+        np.testing.assert_allclose(fused[column], expected[column], atol=1e-9, equal_nan=True)
+    assert fused['MA200'].isna().all() == (bars < 200)
+
+@pytest.mark.parametrize('smoothing', ['sma', 'wilder', 'ema'])
+def test_single_indicator_functions_use_registry(smoothing):
+    """個別の指標の関数は指標レジストリで計算し、まとめて計算した結果と一致する"""
+    df = random_ohlc(3000)
+    expected = calculate_technical_indicators(df, smoothing=smoothing)
+    actual = calculate_moving_averages(df)
+    calculate_rsi(actual, inplace=True, smoothing=smoothing)
+    calculate_atr(actual, inplace=True, smoothing=smoothing)
+    calculate_cross_signals(actual, inplace=True)
+    pd.testing.assert_frame_equal(actual, expected[actual.columns])
+    np.testing.assert_allclose(actual['RSI'], rolling_indicators(df, smoothing=smoothing)['RSI'], atol=1e-9, equal_nan=True)
+
+def test_cross_signals_use_existing_moving_average_columns():
+    """クロスシグナルは終値から計算し直さず、既存のMA25・MA75の列（別の期間の値でも可）から計算する"""
+    df = calculate_moving_averages(random_ohlc(3000), [10, 30]).rename(columns={'MA10': 'MA25', 'MA30': 'MA75'})
+    actual = calculate_cross_signals(df)
+    expected = rolling_indicators(df, ma_periods=[])
+    for column in ['MA25_above_MA75', 'Golden_Cross_25_75', 'Dead_Cross_25_75']:
+        np.testing.assert_array_equal(actual[column], expected[column])
+
+@pytest.mark.parametrize('bars', [1, 50, 150, 250])
+def test_moving_average_matrix_with_periods_around_series_length(bars):
+    """データより短い期間・長い期間が混在しても、期間ごとの移動平均線と一致する"""
+    df = random_ohlc(bars)
+    periods = [5, 75, 200]
+    matrix = calculate_moving_average_matrix(df, periods)
+    for column, period in enumerate(periods):
+        expected = df['Close'].rolling(period).mean().to_numpy()
+        np.testing.assert_allclose(matrix[:, column], expected, atol=1e-9, equal_nan=True)
+
+def test_fused_kernel_detects_same_signals_as_rolling():
+    """横ばいのMAの傾き（pandasの計算では丸め誤差で正負になる）も同じく判定し、シグナルが完全に一致する"""
+    df = random_ohlc(50000)
+    frames = [detect_perfect_order(frame) for frame in [calculate_technical_indicators(df), rolling_indicators(df)]]
+    flat = (frames[0]['MA25_slope'] == 0) & (frames[1]['MA25_slope'] != 0)
+    assert flat.any()
+    
+    for column in ['MA25_slope_positive', 'MA75_slope_positive', 'MA200_slope_positive', 'perfect_order']:
+        pd.testing.assert_series_equal(frames[0][column], frames[1][column])
+    with contextlib.redirect_stdout(io.StringIO()):
+        signals = [analyze_trading_signals(frame, 4)['entry_signal'] for frame in frames]
+    pd.testing.assert_series_equal(signals[0], signals[1])
+
+@pytest.mark.parametrize('chunk_rows', [150, 1000])
+def test_chunked_indicators_match_full_computation(chunk_rows):
+    """チャンクごとに計算した指標（窓より短いチャンクを含む）が全期間で計算した結果と一致する"""
+    df = random_ohlc(3000)
+    chunks = (df.iloc[start:start + chunk_rows].reset_index(drop=True) for start in range(0, len(df), chunk_rows))
+    actual = pd.concat(iter_technical_indicators(chunks), ignore_index=True)
+    pd.testing.assert_frame_equal(actual, calculate_technical_indicators(df))
+
+@pytest.mark.parametrize('smoothing', ['wilder', 'ema'])
+def test_chunked_indicators_reject_recursive_smoothing(smoothing):
+    """先頭からのすべてのバーに依存する平滑化はチャンクごとに計算できないため例外"""
+    with pytest.raises(ValueError):
+        next(iter_technical_indicators([random_ohlc(500)], smoothing=smoothing))
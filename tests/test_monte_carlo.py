@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from strategy.monte_carlo import MonteCarloResampler
+
+@pytest.mark.parametrize('trades', [1, 5, 308, 3000])
+def test_shuffle_paths_are_permutations(trades):
+    """順序の入れ替えでは各経路が全取引の並べ替えになる（取引数が多い場合の入れ替えを含む）"""
+    resampler = MonteCarloResampler(method='shuffle')
+    indices = resampler._shuffle_indices(np.random.default_rng(0), trades, 500)
+    assert indices.shape == (trades, 500)
+    np.testing.assert_array_equal(np.sort(indices, axis=0), np.broadcast_to(np.arange(trades)[:, None], (trades, 500)))
+
+def test_shuffle_positions_are_uniform():
+    """各取引が先頭になる割合が取引数によらず等しい"""
+    resampler = MonteCarloResampler(method='shuffle')
+    indices = resampler._shuffle_indices(np.random.default_rng(0), 5, 100000)
+    np.testing.assert_allclose(np.bincount(indices[0], minlength=5) / 100000, 0.2, atol=0.01)
+
+def test_bootstrap_indices_are_int32_within_range():
+    """復元抽出の位置はint32で、取引数の範囲内"""
+    resampler = MonteCarloResampler(method='bootstrap')
+    indices = resampler._resample(np.random.default_rng(0), 308, 1000)
+    assert indices.dtype == np.int32
+    assert indices.min() >= 0 and indices.max() < 308
+
+def test_path_metrics_for_known_order():
+    """既知の並びで最終損益・最大ドローダウン・最大連敗数を計算"""
+    profit_loss = np.array([100.0, -50.0, -30.0, 80.0, -10.0])
+    indices = np.arange(5, dtype=np.int32)[:, None]
+    final, drawdown, streak = MonteCarloResampler()._path_metrics(profit_loss, indices)
+    assert final[0] == 90.0 and drawdown[0] == 80.0 and streak[0] == 2
+
+@pytest.mark.parametrize('method', ['bootstrap', 'shuffle'])
+def test_run_with_small_chunks(method):
+    """チャンクが経路数より小さくても全経路を計算し、順序の入れ替えでは最終損益が一定"""
+    trades_df = pd.DataFrame({'profit_loss': np.random.default_rng(1).normal(0, 100, 308)})
+    result = MonteCarloResampler(paths=5000, method=method, seed=0, max_chunk_mb=1).run(trades_df)
+    distributions = result['distributions']
+    assert len(distributions['max_drawdown']) == 5000
+    assert (distributions['max_drawdown'] >= 0).all()
+    if method == 'shuffle':
+        np.testing.assert_allclose(distributions['final_profit_loss'], trades_df['profit_loss'].sum())
+
+def test_run_without_trades_raises():
+    """取引がない場合は0の分布ではなく例外"""
+    with pytest.raises(ValueError):
+        MonteCarloResampler(paths=10).run(pd.DataFrame())
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from indicator.technical_analysis import calculate_indicators_cached
+from strategy.parameter_sweep import ParameterSweep
+from strategy.perfect_order_detector import PerfectOrderDetector
+from strategy.walk_forward import WalkForward
+from tests.helpers import random_ohlc
+
+@pytest.mark.parametrize('smoothing', ['sma', 'wilder', 'ema'])
+def test_dataset_uses_smoothing(smoothing):
+    """スイープの指標は指定された平滑化で計算し、平滑化ごとに別のキャッシュを使う"""
+    df = random_ohlc(5000)
+    sweep = ParameterSweep(max_workers=1, smoothing=smoothing)
+    dataset = sweep.calculate_dataset(df, sweep.expand_grid({'rsi_period': [14]}))
+    expected = calculate_indicators_cached(df, outputs=['RSI', 'ATR'], smoothing=smoothing)
+    np.testing.assert_array_equal(dataset['RSI_14'], expected['RSI'])
+    np.testing.assert_array_equal(dataset['ATR'], expected['ATR'])
+    if smoothing != 'sma':
+        sma = calculate_indicators_cached(df, outputs=['RSI'], smoothing='sma')
+        assert not np.allclose(dataset['RSI_14'], sma['RSI'], equal_nan=True)
+
+def test_walk_forward_detects_each_indicator_setting_once(monkeypatch):
+    """ウォークフォワードの各期間で、指標のパラメータごとのパーフェクトオーダー検出をやり直さない"""
+    detected = []
+    detect = PerfectOrderDetector.detect_perfect_order
+    
+    def counting_detect(self, df, *args, **kwargs):
+        detected.append(len(df))
+        return detect(self, df, *args, **kwargs)
+    
+    monkeypatch.setattr(PerfectOrderDetector, 'detect_perfect_order', counting_detect)
+    grid = {'ma_periods': [(5, 10, 20), (5, 15, 30), (10, 20, 40)], 'rsi_period': [7, 14]}
+    result = WalkForward(train_months=1, test_months=1, max_workers=1).run(random_ohlc(96 * 120), grid)
+    assert len(result['windows']) >= 3
+    assert len(detected) == 6
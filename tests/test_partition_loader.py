@@ -0,0 +1,17 @@
+from data_processor.partition_loader import _load_partition
+from data_processor.status_messages import record_messages, replay_messages, show_message
+
+def test_worker_returns_messages_instead_of_showing_them(tmp_path):
+    """ワーカーでの読み込みエラーは表示されずに結果とともに返される"""
+    df, messages = _load_partition(str(tmp_path / 'missing.csv'))
+    assert df is None
+    assert [level for level, _ in messages] == ['error']
+    assert 'データ読み込みエラー' in messages[0][1]
+
+def test_replayed_messages_keep_level_and_prefix_file_name():
+    """親プロセスで表示するメッセージは種類を保ち、ファイル名を先頭に付ける"""
+    with record_messages() as outer:
+        with record_messages() as inner:
+            show_message('info', "市場クローズ中データ 3件 を除外しました")
+        replay_messages(inner, "USDJPY_2023_15min.csv: ")
+    assert outer == [('info', "USDJPY_2023_15min.csv: 市場クローズ中データ 3件 を除外しました")]
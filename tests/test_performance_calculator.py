@@ -0,0 +1,34 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+from indicator.technical_analysis import calculate_technical_indicators
+from strategy import analyze_trading_signals, detect_perfect_order
+from strategy.performance_calculator import PerformanceCalculator
+from tests.helpers import random_ohlc
+
+BARS = 10000
+
+@pytest.fixture(scope='module')
+def detected():
+    """USDJPYと同じ価格帯・刻みのランダムウォークにパーフェクトオーダーまで計算したデータ"""
+    df = random_ohlc(BARS, seed=3)
+    df[['Open', 'High', 'Low', 'Close']] = (df[['Open', 'High', 'Low', 'Close']] + 30).round(3)
+    return detect_perfect_order(calculate_technical_indicators(df))
+
+@pytest.mark.parametrize('stop_rule', PerformanceCalculator.STOP_RULES)
+@pytest.mark.parametrize('n_continued', [1, 2, 4])
+def test_vectorized_simulation_matches_reference(detected, stop_rule, n_continued):
+    """配列上の取引シミュレーションが1行ずつ処理する従来の方法と同じ取引を返す"""
+    calculator = PerformanceCalculator(stop_rule=stop_rule)
+    with contextlib.redirect_stdout(io.StringIO()):
+        signals = analyze_trading_signals(detected, n_continued)
+    expected = calculator._simulate_trades_reference(signals)
+    actual = calculator._simulate_trades(signals)
+    assert len(expected) > 10
+    if stop_rule == 'none':
+        assert '200MAストップロス' not in set(expected['exit_reason'])
+    else:
+        assert '200MAストップロス' in set(expected['exit_reason'])
+    pd.testing.assert_frame_equal(actual, expected)
@@ -0,0 +1,54 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+from data_processor import compact_frame, expand_frame
+from indicator.indicator_registry import ROLLING_ANCHOR_BARS, _cumsum, _rolling_sum, _to_units, _window_sum
+from indicator.technical_analysis import calculate_technical_indicators
+from strategy import analyze_trading_signals, detect_perfect_order
+from tests.helpers import random_ohlc
+
+BARS = 200000
+WINDOWS = [25, 75, 200]
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+@pytest.mark.parametrize('window', WINDOWS)
+def test_anchored_sum_error_within_bound_for_off_grid_prices(window):
+    """刻みに乗らない価格でも、取り直した累積和の誤差が区間の長さで決まる上限以内"""
+    df = random_ohlc(BARS, decimals=None)
+    close = df['Close'].to_numpy()
+    expected = df['Close'].rolling(window).mean().to_numpy()[window - 1:]
+    anchored = (_rolling_sum(close, window, np.empty(BARS)) / window)[window - 1:]
+    terms = ROLLING_ANCHOR_BARS + window
+    bound = 2 * terms * terms * np.finfo(np.float64).eps * np.abs(close).max() / window
+    assert np.abs(anchored - expected).max() <= bound
+
+@pytest.mark.parametrize('window', WINDOWS)
+def test_anchored_sum_rounds_to_exact_ticks_on_tick_grid(window):
+    """0.001刻みの価格では、小数で合計した誤差が0.5刻み未満で、丸めると整数の合計と完全に一致する"""
+    close = random_ohlc(BARS)['Close'].to_numpy()
+    units, scale, _ = _to_units(close)
+    assert units.dtype.kind == 'i'
+    exact = _window_sum(_cumsum(units), window, np.empty(BARS, dtype=np.int64))[window - 1:]
+    anchored = (_rolling_sum(close, window, np.empty(BARS)) * scale)[window - 1:]
+    assert np.abs(anchored - exact).max() < 0.5
+    np.testing.assert_array_equal(np.rint(anchored), exact)
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_entry_signals_from_float32_storage_match_float64(seed):
+    """USDJPYと同じ価格帯・刻みのデータで、省メモリ形式（float32の指標・ビットマスクの条件）から計算し直したエントリーシグナルがfloat64の計算と一致する"""
+    df = random_ohlc(BARS, seed)
+    df[PRICE_COLUMNS] = np.round(df[PRICE_COLUMNS] + 30, 3)
+    detected = detect_perfect_order(calculate_technical_indicators(df))
+    stored = expand_frame(compact_frame(detected))
+    assert stored['RSI'].dtype == np.float32
+    rsi_error = np.nanmax(np.abs(stored['RSI'].to_numpy(dtype=np.float64) - detected['RSI'].to_numpy()))
+    assert rsi_error <= np.finfo(np.float32).eps * 100 / 2
+    
+    for n_continued in [1, 4]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = analyze_trading_signals(detected, n_continued)['entry_signal'].to_numpy()
+            actual = analyze_trading_signals(stored, n_continued)['entry_signal'].to_numpy()
+        assert expected.sum() > 0
+        np.testing.assert_array_equal(actual, expected)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from core.analysis_processor import AnalysisProcessor
+from config.settings import INDICATOR_SMOOTHING
+from core.stage_cache import PackedBits, PipelineStageCache
+from indicator.technical_analysis import get_cached_indicator_arrays
+from tests.helpers import random_ohlc
+
+def test_cached_stages_match_fresh_run_after_changing_n_continued():
+    """n_continuedを変更して段階の出力を再利用しても、キャッシュなしの結果と一致する"""
+    df = random_ohlc(20000)
+    processor = AnalysisProcessor()
+    stage_cache = PipelineStageCache()
+    processor.run_pipeline(df, 1, stage_cache)
+    frame, trades_df, _ = processor.run_pipeline(df, 4, stage_cache)
+    expected_frame, expected_trades, _ = processor.run_pipeline(df, 4)
+    
+    assert 'indicators' in stage_cache.reused and 'perfect_order' in stage_cache.reused
+    pd.testing.assert_frame_equal(frame[expected_frame.columns], expected_frame)
+    pd.testing.assert_frame_equal(trades_df, expected_trades)
+
+def test_stage_outputs_are_packed_or_referenced():
+    """bool列はビットマスクで保持し、指標は指標キャッシュの配列を参照、デバッグ情報は保持しない"""
+    df = random_ohlc(20000)
+    processor = AnalysisProcessor()
+    stage_cache = PipelineStageCache()
+    processor.run_pipeline(df, 1, stage_cache)
+    
+    assert 'debug' in stage_cache.recomputed
+    assert all(key[0] != 'debug' for key in stage_cache._entries)
+    for key in [('continuation', ('n_continued', 1)), ('entry_signals', ('n_continued', 1))]:
+        assert all(isinstance(values, PackedBits) for values in stage_cache._entries[key].values())
+    
+    arrays = get_cached_indicator_arrays(df, outputs=processor.get_required_indicators(), smoothing=INDICATOR_SMOOTHING)
+    for column, values in stage_cache._entries[('indicators',)].items():
+        assert values is arrays[column]
+
+def test_packed_bits_round_trip():
+    """ビットマスクから元のbool配列に戻る（8の倍数でない長さを含む）"""
+    values = np.random.default_rng(0).random(1001) < 0.3
+    np.testing.assert_array_equal(PackedBits(values).unpack(), values)
@@ -0,0 +1,50 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from indicator.streaming_indicators import StreamingIndicators
+from indicator.technical_analysis import calculate_cross_signals, calculate_indicators_cached
+from strategy import analyze_trading_signals, detect_perfect_order
+from tests.helpers import random_ohlc
+
+@pytest.mark.parametrize('ma_periods', [(25, 75, 200), (10, 30, 60)])
+def test_streaming_matches_batch_for_ma_periods(ma_periods):
+    """指定した期間の移動平均線で、パーフェクトオーダー・エントリーシグナルがバッチ計算と一致する"""
+    df = random_ohlc(1500)
+    streaming = StreamingIndicators.from_frame(df.iloc[:0], ma_periods, n_continued=4)
+    rows = pd.DataFrame([streaming.update(bar) for bar in df.to_dict('records')])
+    
+    short, medium, long = ma_periods
+    roles = {f'MA{short}': 'MA25', f'MA{medium}': 'MA75', f'MA{long}': 'MA200'}
+    batch = calculate_indicators_cached(df, ma_periods=list(ma_periods), outputs=list(roles) + ['RSI', 'ATR'])
+    batch = calculate_cross_signals(batch.rename(columns=roles))
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch = analyze_trading_signals(detect_perfect_order(batch), 4)
+    
+    np.testing.assert_allclose(rows['MA25'], batch['MA25'], atol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(rows['MA200'], batch['MA200'], atol=1e-9, equal_nan=True)
+    for column in ['MA25_above_MA75', 'perfect_order', 'entry_signal', 'exit_signal']:
+        np.testing.assert_array_equal(rows[column].to_numpy(bool), batch[column].to_numpy(bool), err_msg=column)
+    assert rows['entry_signal'].any()
+
+def test_streaming_rejects_unordered_periods():
+    """短期 < 中期 < 長期の3期間でない場合は例外"""
+    with pytest.raises(ValueError):
+        StreamingIndicators(ma_periods=[75, 25, 200])
+
+@pytest.mark.parametrize('smoothing', ['sma', 'wilder', 'ema'])
+def test_streaming_rsi_atr_match_batch_for_smoothing(smoothing):
+    """RSI・ATRは指定した平滑化で、途中から更新を続けてもバッチ計算と一致する"""
+    df = random_ohlc(1500)
+    streaming = StreamingIndicators.from_frame(df.iloc[:700], smoothing=smoothing)
+    rows = pd.DataFrame([streaming.update(bar) for bar in df.iloc[700:].to_dict('records')])
+    batch = calculate_indicators_cached(df, outputs=['RSI', 'ATR'], smoothing=smoothing).iloc[700:]
+    np.testing.assert_allclose(rows['RSI'], batch['RSI'], rtol=1e-12)
+    np.testing.assert_allclose(rows['ATR'], batch['ATR'], rtol=1e-12)
+
+def test_streaming_rejects_unknown_smoothing():
+    """平滑化方法が不正な場合は例外"""
+    with pytest.raises(ValueError):
+        StreamingIndicators(smoothing='wma')
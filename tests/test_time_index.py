@@ -0,0 +1,24 @@
+import datetime
+
+import pandas as pd
+from data_processor import get_time_index
+from tests.helpers import random_ohlc
+
+def test_day_range_slices_tz_aware_data_with_naive_dates():
+    """日付（タイムゾーンなし）をデータの現地時刻の範囲として比較し、例外にならない"""
+    df = random_ohlc(96 * 3)
+    time_index = get_time_index(df)
+    start, end = time_index.day_range(datetime.date(2024, 1, 2), datetime.date(2024, 1, 2))
+    sliced = time_index.slice(df, start, end)
+    assert str(start.tz) == 'UTC+09:00'
+    assert len(sliced) == 96
+    assert sliced['datetime'].iloc[0] == pd.Timestamp('2024-01-02 00:00', tz='UTC+09:00')
+    assert sliced['datetime'].iloc[-1] == pd.Timestamp('2024-01-02 23:45', tz='UTC+09:00')
+
+def test_localize_converts_between_naive_and_aware():
+    """タイムゾーンのない日時は現地時刻、ある日時はデータのタイムゾーンに変換"""
+    time_index = get_time_index(random_ohlc(10))
+    assert time_index.localize('2024-01-01 09:00') == pd.Timestamp('2024-01-01 09:00', tz='UTC+09:00')
+    assert time_index.localize(pd.Timestamp('2024-01-01 00:00', tz='UTC')) == pd.Timestamp('2024-01-01 09:00', tz='UTC+09:00')
+    naive_index = get_time_index(pd.DataFrame({'datetime': pd.date_range('2024-01-01', periods=3, freq='15min')}))
+    assert naive_index.localize(pd.Timestamp('2024-01-01', tz='UTC+09:00')).tzinfo is None
@@ -0,0 +1,22 @@
+from indicator.technical_analysis import calculate_technical_indicators
+from strategy import detect_perfect_order
+from tests.helpers import random_ohlc
+
+def test_higher_timeframe_slope_with_insufficient_history():
+    """上位足のバー数が期間に満たない場合は例外にならず、傾きは欠損で条件を満たさない"""
+    # 15分足で約4か月（日足は期間200に満たない）
+    df = calculate_technical_indicators(random_ohlc(12000))
+    detected = detect_perfect_order(df, higher_timeframe_slopes=[('1D', 200)])
+    assert detected['MA200_slope_1D'].isna().all()
+    assert not detected['bullish_perfect_order'].any()
+    assert not detected['bearish_perfect_order'].any()
+
+def test_higher_timeframe_slope_is_projected_without_look_ahead():
+    """十分な履歴がある場合、各バーには確定済みの上位足の値のみが対応付けられる"""
+    df = calculate_technical_indicators(random_ohlc(12000))
+    detected = detect_perfect_order(df, higher_timeframe_slopes=[('1D', 5)])
+    slope = detected['MA5_slope_1D']
+    assert slope.notna().any()
+    # 同じ日の間は値が変わらない
+    days = detected['datetime'].dt.floor('1D')
+    assert (slope.groupby(days).nunique(dropna=False) == 1).all()
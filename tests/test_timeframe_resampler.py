@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+from data_processor.timeframe_resampler import TimeframeResampler
+from tests.helpers import random_ohlc
+
+def gapped_ohlc(bars=96 * 10):
+    """市場クローズ中のバーを除いたような欠けのある15分足"""
+    df = random_ohlc(bars)
+    closed = (df['datetime'].dt.dayofweek == 5) | df.index.isin(range(200, 230))
+    return df[~closed].reset_index(drop=True)
+
+@pytest.mark.parametrize('timeframe', ['1h', '4h', '1D'])
+def test_incremental_merge_matches_full_resample(timeframe):
+    """下位足を追加しながら差分集計した上位足が全期間を集計し直した結果と一致する"""
+    df = gapped_ohlc()
+    resampler = TimeframeResampler()
+    # 上位足の途中で区切り、最後の未確定バーが更新されるようにする
+    for end in [101, 350, 351, 600, len(df)]:
+        bars = resampler.get('USDJPY', df.iloc[:end], timeframe)
+    pd.testing.assert_frame_equal(bars, resampler.resample(df, timeframe))
+    assert resampler._cache[('USDJPY', timeframe)]['base_rows'] == len(df)
+
+def test_update_with_new_base_bars_matches_full_resample():
+    """新しい下位足のみ（取り込み済みの時刻と重なる行を含む）で更新した上位足が全期間の集計と一致する"""
+    df = gapped_ohlc()
+    resampler = TimeframeResampler()
+    resampler.get('USDJPY', df.iloc[:333], '4h')
+    resampler.update('USDJPY', df.iloc[300:500], '4h')
+    bars = resampler.update('USDJPY', df.iloc[500:], '4h')
+    pd.testing.assert_frame_equal(bars, resampler.resample(df, '4h'))
+
+def test_cache_evicts_least_recently_used_over_capacity():
+    """容量を超えると最も長く使われていない上位足から削除し、容量より大きい上位足は保存しない"""
+    df = gapped_ohlc()
+    size = int(TimeframeResampler().resample(df, '1h').memory_usage(index=True, deep=True).sum())
+    resampler = TimeframeResampler(max_bytes=size * 2)
+    for dataset_key in ['a', 'b']:
+        resampler.get(dataset_key, df, '1h')
+    resampler.get('a', df, '1h')
+    resampler.get('c', df, '1h')
+    assert list(resampler._cache) == [('a', '1h'), ('c', '1h')]
+    assert resampler.current_bytes == size * 2
+    
+    resampler.get('d', df, '15min')
+    assert ('d', '15min') not in resampler._cache
+    assert resampler.current_bytes <= resampler.max_bytes
+    resampler.clear()
+    assert resampler.current_bytes == 0